@@ -2,6 +2,8 @@ import pandas as pd
 import streamlit as st
 import os
 import sys
+import time
+from functools import partial
 import folium
 from streamlit_folium import folium_static
 import plotly.express as px
@@ -11,8 +13,12 @@ import plotly.graph_objects as go
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Importar módulos de parser
-from parser.cargar_archivos import cargar_archivos_automaticamente, cargar_archivos_manual
-from parser.procesar_datos_optimizado import procesar_datos
+from parser.cargar_archivos import listar_archivos_automaticamente
+from parser.procesar_datos_optimizado import procesar_archivos, procesar_tablas_archivos, TABLAS_RESULTADO
+from parser.cache_procesamiento import resolver_directorio_cache
+from parser.instantanea_resultados import resolver_directorio_instantaneas, guardar_instantanea_en_segundo_plano, cargar_ultima_instantanea
+from parser.dataset_diferido import DatasetDiferido, obtener_tabla
+from parser.reglas_estado import reclasificar_resumen
 
 # Importar módulos de visualización
 from visualizaciones.dashboard_mejorado import mostrar_dashboard_mejorado
@@ -50,6 +56,32 @@ if 'datos_procesados' not in st.session_state:
     st.session_state.chat_history = []
     st.session_state.tema_oscuro = False
 
+# Abrir la última instantánea de los archivos de InformeNokia, si existe, sin volver a procesarlos
+if 'instantanea_revisada' not in st.session_state:
+    st.session_state.instantanea_revisada = True
+    archivos_instantanea = listar_archivos_automaticamente("InformeNokia")
+    
+    if archivos_instantanea and not st.session_state.datos_procesados:
+        instantanea = cargar_ultima_instantanea(resolver_directorio_instantaneas("InformeNokia"), archivos_instantanea)
+        
+        if instantanea is not None:
+            resultados, manifiesto = instantanea
+            (st.session_state.df_servicios, st.session_state.df_puertos, st.session_state.df_chassis,
+             st.session_state.df_versiones, st.session_state.df_mda, st.session_state.df_resumen,
+             st.session_state.df_no_leidos) = resultados
+            # El estado de los equipos se clasifica con las reglas actuales, sin volver a procesar los archivos
+            st.session_state.df_resumen = reclasificar_resumen(st.session_state.df_resumen)
+            # Las descripciones no están en la instantánea: se procesan desde los archivos (o la caché) si una vista las lee
+            st.session_state.dataset = DatasetDiferido(
+                partial(procesar_tablas_archivos, archivos_instantanea, directorio_cache=resolver_directorio_cache("InformeNokia")),
+                dict(zip(TABLAS_RESULTADO, resultados)),
+                st.session_state.df_resumen, st.session_state.df_no_leidos
+            )
+            st.session_state.df_descripciones = st.session_state.dataset.diferida('descripciones')
+            st.session_state.datos_procesados = True
+            st.session_state.fecha_instantanea = manifiesto['fecha']
+            st.session_state.archivos_origen = archivos_instantanea
+
 # Función para aplicar tema oscuro
 def aplicar_tema():
     if st.session_state.tema_oscuro:
@@ -119,6 +151,9 @@ with st.sidebar:
     
     st.header("Carga de Datos")
     
+    if st.session_state.get('fecha_instantanea'):
+        st.info(f"Datos cargados desde la instantánea del {st.session_state.fecha_instantanea}")
+    
     # Opciones de carga
     opcion_carga = st.radio(
         "Seleccione método de carga:",
@@ -136,26 +171,36 @@ with st.sidebar:
             
             if carga_activada:
                 with st.spinner("Cargando archivos de la carpeta InformeNokia..."):
-                    contenido = cargar_archivos_automaticamente("InformeNokia")
+                    archivos = listar_archivos_automaticamente("InformeNokia")
                     
-                    if contenido:
+                    if archivos:
                         st.success(f"Archivos cargados correctamente")
                         
-                        # Procesar datos
+                        # Procesar datos en modo streaming (línea por línea); los archivos sin cambios se leen de la caché.
+                        # Solo se procesan las tablas del resumen: MDA y descripciones se construyen al leerlas
                         with st.spinner("Procesando datos..."):
-                            df_servicios, df_puertos, df_chassis, df_versiones, df_mda, df_resumen, df_no_leidos = procesar_datos(contenido)
+                            t_inicio = time.time()
+                            dataset = procesar_archivos(archivos, directorio_cache=resolver_directorio_cache("InformeNokia"), diferido=True)
+                            
+                            # Guardar la instantánea para abrirla directamente en la próxima sesión; MDA se procesa en el hilo del guardado
+                            guardar_instantanea_en_segundo_plano(dataset, archivos, resolver_directorio_instantaneas("InformeNokia"), time.time() - t_inicio)
                             
-                            # Guardar en session_state
+                            # Guardar en session_state; las tablas diferidas se pasan a las vistas sin construirlas
                             st.session_state.datos_procesados = True
-                            st.session_state.df_servicios = df_servicios
-                            st.session_state.df_puertos = df_puertos
-                            st.session_state.df_chassis = df_chassis
-                            st.session_state.df_versiones = df_versiones
-                            st.session_state.df_mda = df_mda
-                            st.session_state.df_resumen = df_resumen
-                            st.session_state.df_no_leidos = df_no_leidos
+                            st.session_state.dataset = dataset
+                            st.session_state.df_servicios = dataset.df_servicios
+                            st.session_state.df_puertos = dataset.df_puertos
+                            st.session_state.df_descripciones = dataset.diferida('descripciones')
+                            st.session_state.df_chassis = dataset.df_chassis
+                            st.session_state.df_versiones = dataset.df_versiones
+                            st.session_state.df_mda = dataset.diferida('mda')
+                            st.session_state.df_resumen = dataset.df_resumen
+                            st.session_state.df_no_leidos = dataset.df_no_leidos
+                            st.session_state.fecha_instantanea = None
+                            # Archivos de origen para releer el texto de un registro (ver referencias_origen.leer_origenes)
+                            st.session_state.archivos_origen = archivos
                             
-                            st.success(f"Datos procesados correctamente. Se encontraron {len(df_resumen)} equipos.")
+                            st.success(f"Datos procesados correctamente. Se encontraron {len(dataset.df_resumen)} equipos.")
                     else:
                         st.error("No se encontraron archivos en la carpeta InformeNokia")
                         st.session_state.carga_activada = False
@@ -171,25 +216,31 @@ with st.sidebar:
         if archivos_subidos:
             if st.button("Procesar archivos", key="procesar_archivos_btn"):
                 with st.spinner("Procesando archivos subidos..."):
-                    contenido = cargar_archivos_manual(archivos_subidos)
+                    try:
+                        # Procesar datos en modo streaming (línea por línea); MDA y descripciones se procesan al leerlas,
+                        # volviendo a leer los archivos subidos
+                        dataset = procesar_archivos(archivos_subidos, diferido=True)
+                        procesado = True
+                    except Exception as e:
+                        st.error(f"Error al procesar los archivos subidos: {str(e)}")
+                        procesado = False
                     
-                    if contenido:
-                        # Procesar datos
-                        df_servicios, df_puertos, df_chassis, df_versiones, df_mda, df_resumen, df_no_leidos = procesar_datos(contenido)
-                        
+                    if procesado:
                         # Guardar en session_state
                         st.session_state.datos_procesados = True
-                        st.session_state.df_servicios = df_servicios
-                        st.session_state.df_puertos = df_puertos
-                        st.session_state.df_chassis = df_chassis
-                        st.session_state.df_versiones = df_versiones
-                        st.session_state.df_mda = df_mda
-                        st.session_state.df_resumen = df_resumen
-                        st.session_state.df_no_leidos = df_no_leidos
+                        st.session_state.dataset = dataset
+                        st.session_state.df_servicios = dataset.df_servicios
+                        st.session_state.df_puertos = dataset.df_puertos
+                        st.session_state.df_descripciones = dataset.diferida('descripciones')
+                        st.session_state.df_chassis = dataset.df_chassis
+                        st.session_state.df_versiones = dataset.df_versiones
+                        st.session_state.df_mda = dataset.diferida('mda')
+                        st.session_state.df_resumen = dataset.df_resumen
+                        st.session_state.df_no_leidos = dataset.df_no_leidos
+                        st.session_state.fecha_instantanea = None
+                        st.session_state.archivos_origen = archivos_subidos
                         
-                        st.success(f"Datos procesados correctamente. Se encontraron {len(df_resumen)} equipos.")
-                    else:
-                        st.error("Error al procesar los archivos subidos")
+                        st.success(f"Datos procesados correctamente. Se encontraron {len(dataset.df_resumen)} equipos.")
     
     # Carga del archivo Excel o CSV de servicios totales
     st.header("Cargar Servicios Totales")
@@ -278,10 +329,10 @@ with st.sidebar:
                 excel_data = exportar_todo(
                     st.session_state.df_servicios,
                     st.session_state.df_puertos,
-                    st.session_state.df_descripciones,
+                    obtener_tabla(st.session_state.df_descripciones),
                     st.session_state.df_chassis,
                     st.session_state.df_versiones,
-                    st.session_state.df_mda,
+                    obtener_tabla(st.session_state.df_mda),
                     st.session_state.df_resumen
                 )
                 
@@ -410,7 +461,7 @@ if st.session_state.datos_procesados:
         # Actualizar la pestaña seleccionada
         st.session_state.tab_seleccionada = "Asistente IA"
         
-        # Asegurar que df_mda nunca sea None antes de llamar a mostrar_chatbot_ia
+        # Asegurar que df_mda nunca sea None antes de llamar a mostrar_chatbot_ia (puede ser una tabla diferida)
         if 'df_mda' not in st.session_state or st.session_state.df_mda is None:
             st.session_state.df_mda = pd.DataFrame(columns=['target', 'slot', 'mda', 'type', 'admin_state', 'oper_state'])
         
@@ -0,0 +1,184 @@
+"""
+Módulo de caché persistente del procesamiento de archivos NSP.
+Guarda en disco los resultados de cada archivo, identificados por el hash de su contenido,
+para que al volver a cargar una carpeta solo se procesen los archivos nuevos o modificados.
+Los resultados de un archivo no dependen del límite de tiempo por bloque: los archivos con bloques
+en cuarentena no se guardan (ver procesar_datos_optimizado._procesar_archivos_con_cache).
+"""
+
+import os
+import json
+import pickle
+import hashlib
+
+# Variable de entorno para cambiar el directorio de la caché
+VARIABLE_DIRECTORIO_CACHE = 'NSP_DIRECTORIO_CACHE'
+
+# Nombre del directorio de caché dentro de la carpeta de archivos
+NOMBRE_DIRECTORIO_CACHE = '.cache_nsp'
+
+# Archivo con el índice ruta -> (mtime, tamaño, hash)
+NOMBRE_INDICE = 'indice.json'
+
+# Versión del formato de los resultados; cambiarla invalida las entradas existentes
+VERSION_CACHE = 8
+
+# Tamaño de lectura para calcular el hash
+TAMANO_LECTURA_HASH = 1024 * 1024
+
+def resolver_directorio_cache(directorio_archivos, directorio_cache=None):
+    """
+    Determina el directorio de la caché. El parámetro tiene prioridad sobre la variable de entorno;
+    por defecto se usa un subdirectorio oculto de la carpeta de archivos.
+    
+    Args:
+        directorio_archivos (str): Carpeta de los archivos NSP
+        directorio_cache (str, optional): Directorio de la caché
+    
+    Returns:
+        str: Ruta absoluta del directorio de la caché
+    """
+    directorio_cache = directorio_cache or os.environ.get(VARIABLE_DIRECTORIO_CACHE) or os.path.join(directorio_archivos, NOMBRE_DIRECTORIO_CACHE)
+    return os.path.abspath(directorio_cache)
+
+def calcular_hash_archivo(ruta):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo, leyéndolo por trozos.
+    
+    Args:
+        ruta (str): Ruta del archivo
+    
+    Returns:
+        str: Hash en hexadecimal
+    """
+    hash_archivo = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for trozo in iter(lambda: f.read(TAMANO_LECTURA_HASH), b''):
+            hash_archivo.update(trozo)
+    return hash_archivo.hexdigest()
+
+def cargar_indice(directorio_cache):
+    """
+    Carga el índice de la caché.
+    
+    Args:
+        directorio_cache (str): Directorio de la caché
+    
+    Returns:
+        dict: ruta -> {'mtime', 'tamano', 'hash'} (vacío si no existe o no se puede leer)
+    """
+    try:
+        with open(os.path.join(directorio_cache, NOMBRE_INDICE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_indice(directorio_cache, indice):
+    """
+    Guarda el índice de la caché de forma atómica.
+    
+    Args:
+        directorio_cache (str): Directorio de la caché
+        indice (dict): ruta -> {'mtime', 'tamano', 'hash'}
+    """
+    os.makedirs(directorio_cache, exist_ok=True)
+    ruta = os.path.join(directorio_cache, NOMBRE_INDICE)
+    with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=1)
+    os.replace(ruta + '.tmp', ruta)
+
+def obtener_hash(ruta, indice):
+    """
+    Obtiene el hash del contenido de un archivo. Si la fecha de modificación y el tamaño
+    coinciden con el índice, se reutiliza el hash guardado sin leer el archivo.
+    Actualiza la entrada del índice.
+    
+    Args:
+        ruta (str): Ruta del archivo
+        indice (dict): Índice de la caché
+    
+    Returns:
+        str: Hash del contenido
+    """
+    estado = os.stat(ruta)
+    clave = os.path.abspath(ruta)
+    entrada = indice.get(clave)
+    
+    if entrada and entrada['mtime'] == estado.st_mtime_ns and entrada['tamano'] == estado.st_size:
+        return entrada['hash']
+    
+    hash_archivo = calcular_hash_archivo(ruta)
+    indice[clave] = {'mtime': estado.st_mtime_ns, 'tamano': estado.st_size, 'hash': hash_archivo}
+    return hash_archivo
+
+def leer_resultado(directorio_cache, hash_archivo):
+    """
+    Lee los resultados guardados de un archivo.
+    
+    Args:
+        directorio_cache (str): Directorio de la caché
+        hash_archivo (str): Hash del contenido del archivo
+    
+    Returns:
+        Resultados guardados o None si no existen, son de otra versión o no se pueden leer
+    """
+    try:
+        with open(_ruta_resultado(directorio_cache, hash_archivo), 'rb') as f:
+            datos = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    
+    if not isinstance(datos, dict) or datos.get('version') != VERSION_CACHE:
+        return None
+    
+    return datos['resultado']
+
+def guardar_resultado(directorio_cache, hash_archivo, resultado):
+    """
+    Guarda los resultados de un archivo de forma atómica.
+    
+    Args:
+        directorio_cache (str): Directorio de la caché
+        hash_archivo (str): Hash del contenido del archivo
+        resultado: Resultados serializables del archivo
+    """
+    os.makedirs(directorio_cache, exist_ok=True)
+    ruta = _ruta_resultado(directorio_cache, hash_archivo)
+    with open(ruta + '.tmp', 'wb') as f:
+        pickle.dump({'version': VERSION_CACHE, 'resultado': resultado}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta + '.tmp', ruta)
+
+def limpiar_cache(directorio_cache, indice):
+    """
+    Elimina los resultados que ya no corresponden a ningún archivo del índice.
+    
+    Args:
+        directorio_cache (str): Directorio de la caché
+        indice (dict): Índice de la caché
+    
+    Returns:
+        int: Número de resultados eliminados
+    """
+    vigentes = {os.path.basename(_ruta_resultado(directorio_cache, entrada['hash'])) for entrada in indice.values()}
+    eliminados = 0
+    
+    try:
+        nombres = os.listdir(directorio_cache)
+    except OSError:
+        return 0
+    
+    for nombre in nombres:
+        if nombre.endswith('.pkl') and nombre not in vigentes:
+            try:
+                os.remove(os.path.join(directorio_cache, nombre))
+                eliminados += 1
+            except OSError:
+                pass
+    
+    return eliminados
+
+def _ruta_resultado(directorio_cache, hash_archivo):
+    """
+    Ruta del archivo de resultados de un hash.
+    """
+    return os.path.join(directorio_cache, f"{hash_archivo}.pkl")
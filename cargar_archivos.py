@@ -56,3 +56,25 @@ def cargar_archivos_manual(archivos_subidos):
             st.error(f"Error al leer el archivo {archivo.name}: {str(e)}")
     
     return contenido_total
+
+def listar_archivos_automaticamente(directorio="InformeNokia"):
+    """
+    Lista los archivos .txt del directorio especificado sin leer su contenido.
+    Permite procesar los archivos en modo streaming con procesar_archivos.
+    
+    Args:
+        directorio (str): Ruta al directorio que contiene los archivos .txt
+        
+    Returns:
+        list: Rutas ordenadas de los archivos .txt o None si no hay archivos
+    """
+    # Obtener la ruta absoluta del directorio
+    ruta_absoluta = os.path.abspath(directorio)
+    
+    # Buscar todos los archivos .txt en el directorio
+    archivos = sorted(glob.glob(os.path.join(ruta_absoluta, "*.txt")))
+    
+    if not archivos:
+        return None
+    
+    return archivos
@@ -14,10 +14,11 @@ def mostrar_chatbot_ia(df_resumen, df_servicios, df_puertos, df_descripciones, d
         df_resumen (DataFrame): DataFrame con el resumen de equipos
         df_servicios (DataFrame): DataFrame con información de servicios
         df_puertos (DataFrame): DataFrame con información de puertos
-        df_descripciones (DataFrame): DataFrame con información de descripciones de puertos
+        df_descripciones (DataFrame o callable): DataFrame con información de descripciones de puertos,
+            o tabla diferida (ver dataset_diferido.obtener_tabla)
         df_chassis (DataFrame): DataFrame con información de chassis
         df_versiones (DataFrame): DataFrame con información de versiones
-        df_mda (DataFrame): DataFrame con información de tarjetas MDA
+        df_mda (DataFrame o callable): DataFrame con información de tarjetas MDA, o tabla diferida
     """
     st.header("Asistente IA para Consultas de Red")
     
@@ -81,10 +82,11 @@ def procesar_consulta(query, df_resumen, df_servicios, df_puertos, df_descripcio
         df_resumen (DataFrame): DataFrame con el resumen de equipos
         df_servicios (DataFrame): DataFrame con información de servicios
         df_puertos (DataFrame): DataFrame con información de puertos
-        df_descripciones (DataFrame): DataFrame con información de descripciones de puertos
+        df_descripciones (DataFrame o callable): DataFrame con información de descripciones de puertos,
+            o tabla diferida (ver dataset_diferido.obtener_tabla)
         df_chassis (DataFrame): DataFrame con información de chassis
         df_versiones (DataFrame): DataFrame con información de versiones
-        df_mda (DataFrame): DataFrame con información de tarjetas MDA
+        df_mda (DataFrame o callable): DataFrame con información de tarjetas MDA, o tabla diferida
     
     Returns:
         str: Respuesta a la consulta
@@ -243,31 +245,14 @@ def procesar_consulta(query, df_resumen, df_servicios, df_puertos, df_descripcio
             versiones_lista = [f"{row['target']}: {row['timos_version']}" for _, row in versiones.iterrows()]
             return f"Versiones TMOS de los equipos:\n\n" + "\n".join(versiones_lista[:20]) + (f"\n\n... y {len(versiones_lista) - 20} más." if len(versiones_lista) > 20 else "")
     
-    # 7. Consultas sobre equipos por ciudad
-    ciudades = {
-        'barranquilla': 'BAQ',
-        'bogota': ['BGA', 'BOG'],
-        'bogotá': ['BGA', 'BOG'],
-        'cali': ['CAL', 'CLO'],
-        'cartagena': 'CTG',
-        'cucuta': 'CUC',
-        'cúcuta': 'CUC',
-        'ibague': 'IBE',
-        'ibagué': 'IBE',
-        'monteria': 'MON',
-        'montería': 'MON',
-        'popayan': 'PPN',
-        'popayán': 'PPN',
-        'sincelejo': ['SBL', 'SIN'],
-        'bucaramanga': 'BUC'
-    }
+    # 7. Consultas sobre equipos por ciudad (nombres y códigos de la dimensión de ciudades)
+    from parser.extraer_ciudad import codigos_por_nombre, codigos_ciudad
+    
+    ciudades = codigos_por_nombre()
     
     for ciudad, prefijos in ciudades.items():
         if ciudad in query_lower:
-            if isinstance(prefijos, list):
-                equipos_ciudad = df_resumen[df_resumen['ciudad'].isin(prefijos)]
-            else:
-                equipos_ciudad = df_resumen[df_resumen['ciudad'] == prefijos]
+            equipos_ciudad = df_resumen[codigos_ciudad(df_resumen).isin(prefijos)]
             
             if equipos_ciudad.empty:
                 return f"No hay equipos en {ciudad.capitalize()}."
@@ -2,7 +2,7 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from parser.extraer_tipo_equipo import extraer_tipo_equipo
+from parser.extraer_tipo_equipo import clasificar_tipos_equipo
 
 def mostrar_dashboard_mejorado(df_resumen, df_servicios, df_puertos, df_mda, df_versiones=None):
     """
@@ -12,7 +12,7 @@ def mostrar_dashboard_mejorado(df_resumen, df_servicios, df_puertos, df_mda, df_
         df_resumen (DataFrame): DataFrame con el resumen de equipos
         df_servicios (DataFrame): DataFrame con información de servicios
         df_puertos (DataFrame): DataFrame con información de puertos
-        df_mda (DataFrame): DataFrame con información de tarjetas MDA
+        df_mda (DataFrame o callable): DataFrame con información de tarjetas MDA, o tabla diferida (ver dataset_diferido.obtener_tabla)
         df_versiones (DataFrame): DataFrame con información de versiones TiMOS
     """
     st.header("Dashboard General")
@@ -148,15 +148,12 @@ def mostrar_dashboard_mejorado(df_resumen, df_servicios, df_puertos, df_mda, df_
     # Distribución de tipos de equipos - CAMBIADO a gráfico de torta
     st.subheader("Distribución por Tipo de Equipo Nokia")
     
-    # Asegurar que df_resumen tenga una columna tipo_equipo_nokia
+    # Asegurar que df_resumen tenga una columna tipo_equipo_nokia (los resúmenes actuales la traen desde el procesamiento)
     if 'tipo_equipo_nokia' not in df_resumen.columns:
-        # Verificar si hay información de chassis
-        if 'chassis_type' in df_resumen.columns and not df_resumen['chassis_type'].isna().all():
-            # Usar el tipo de chassis para la clasificación
-            df_resumen['tipo_equipo_nokia'] = df_resumen['chassis_type'].apply(lambda x: extraer_modelo_nokia(x) if pd.notna(x) else "No clasificado")
-        elif 'target' in df_resumen.columns:
-            # Fallback a la extracción del nombre del target
-            df_resumen['tipo_equipo_nokia'] = df_resumen['target'].apply(lambda x: extraer_tipo_equipo(x) if pd.notna(x) else "No clasificado")
+        if 'target' in df_resumen.columns:
+            # Clasificar todos los equipos a la vez con el tipo de chassis, si existe, y el nombre del target
+            tipos_chassis = df_resumen['chassis_type'] if 'chassis_type' in df_resumen.columns else None
+            df_resumen['tipo_equipo_nokia'], df_resumen['modelo_nokia'] = clasificar_tipos_equipo(df_resumen['target'], tipos_chassis)
         else:
             # Si no hay target, crear una columna con valor por defecto
             df_resumen['tipo_equipo_nokia'] = "No clasificado"
@@ -0,0 +1,156 @@
+"""
+Módulo con el dataset de procesamiento diferido.
+El resumen y las tablas que necesita se construyen de inmediato; las demás tablas
+(descripciones de puertos, MDA) se procesan y se guardan la primera vez que se accede a ellas,
+o en segundo plano si se solicita la precarga.
+"""
+
+import threading
+import time
+from functools import partial
+
+from parser.procesar_datos_optimizado import TABLAS_BLOQUE
+
+class DatasetDiferido:
+    """
+    Resultados del procesamiento con materialización de tablas bajo demanda.
+    Las tablas pendientes se construyen con la función de procesamiento recibida (sobre los bloques
+    de texto en procesar_datos o sobre los archivos en procesar_archivos), que se conserva hasta que
+    se han construido todas las tablas.
+    
+    Los DataFrames se obtienen con las propiedades df_servicios, df_puertos, df_descripciones,
+    df_chassis, df_versiones, df_mda, df_resumen y df_no_leidos.
+    """
+    
+    def __init__(self, procesar, tablas, df_resumen, df_no_leidos):
+        """
+        Args:
+            procesar (callable): Función que recibe una lista de tablas y devuelve un diccionario
+                tabla -> DataFrame (p. ej. procesar_tablas o procesar_tablas_archivos con sus argumentos fijados)
+            tablas (dict): Tablas ya construidas (nombre de TABLAS_BLOQUE -> DataFrame)
+            df_resumen (DataFrame): Resumen de equipos
+            df_no_leidos (DataFrame): Equipos no leídos
+        """
+        self._procesar = procesar
+        self._tablas = dict(tablas)
+        self._bloqueo = threading.Lock()
+        self.df_resumen = df_resumen
+        self.df_no_leidos = df_no_leidos
+    
+    def tabla(self, nombre):
+        """
+        Obtiene una tabla, procesándola si aún no se ha construido.
+        
+        Args:
+            nombre (str): Nombre de la tabla (ver TABLAS_BLOQUE)
+        
+        Returns:
+            DataFrame: Tabla solicitada
+        """
+        if nombre not in TABLAS_BLOQUE:
+            raise KeyError(f"Tabla no válida: {nombre}")
+        
+        if nombre not in self._tablas:
+            self.materializar([nombre])
+        return self._tablas[nombre]
+    
+    def materializar(self, tablas=None):
+        """
+        Construye las tablas pendientes indicadas con una sola llamada a la función de procesamiento.
+        
+        Args:
+            tablas (list, optional): Tablas a construir. Por defecto, todas las pendientes.
+        """
+        with self._bloqueo:
+            pendientes = [tabla for tabla in (tablas or TABLAS_BLOQUE) if tabla not in self._tablas]
+            if not pendientes:
+                return
+            
+            t_inicio = time.time()
+            self._tablas.update(self._procesar(pendientes))
+            print(f"Tablas diferidas {', '.join(pendientes)} procesadas en {time.time() - t_inicio:.2f} segundos")
+            
+            # Liberar la función (y los bloques de texto que conserva) cuando ya no queda ninguna tabla por construir
+            if not self.pendientes():
+                self._procesar = None
+    
+    def pendientes(self):
+        """
+        Returns:
+            list: Tablas que aún no se han construido
+        """
+        return [tabla for tabla in TABLAS_BLOQUE if tabla not in self._tablas]
+    
+    def precargar(self, tablas=None):
+        """
+        Construye las tablas pendientes en un hilo en segundo plano.
+        Un acceso posterior a una tabla espera a que termine la precarga en curso.
+        
+        Args:
+            tablas (list, optional): Tablas a construir. Por defecto, todas las pendientes.
+        
+        Returns:
+            threading.Thread: Hilo de la precarga
+        """
+        hilo = threading.Thread(target=self.materializar, args=(tablas,), daemon=True)
+        hilo.start()
+        return hilo
+    
+    def diferida(self, nombre):
+        """
+        Referencia a una tabla que se construye cuando se lee, para pasarla a las vistas sin procesarla
+        (ver obtener_tabla).
+        
+        Args:
+            nombre (str): Nombre de la tabla (ver TABLAS_BLOQUE)
+        
+        Returns:
+            callable: Función sin argumentos que devuelve la tabla
+        """
+        return partial(self.tabla, nombre)
+    
+    def como_tupla(self):
+        """
+        Construye todas las tablas devueltas por procesar_datos y procesar_archivos y las devuelve en su mismo orden.
+        
+        Returns:
+            tuple: (servicios, puertos, chassis, versiones, mda, resumen, equipos_no_leidos)
+        """
+        return self.df_servicios, self.df_puertos, self.df_chassis, self.df_versiones, self.df_mda, self.df_resumen, self.df_no_leidos
+    
+    @property
+    def df_servicios(self):
+        return self.tabla('servicios')
+    
+    @property
+    def df_puertos(self):
+        return self.tabla('puertos')
+    
+    @property
+    def df_descripciones(self):
+        return self.tabla('descripciones')
+    
+    @property
+    def df_chassis(self):
+        return self.tabla('chassis')
+    
+    @property
+    def df_versiones(self):
+        return self.tabla('version')
+    
+    @property
+    def df_mda(self):
+        return self.tabla('mda')
+
+def obtener_tabla(tabla):
+    """
+    Obtiene una tabla recibida por una vista, que puede ser una tabla diferida.
+    
+    Args:
+        tabla (DataFrame o callable): DataFrame, o función sin argumentos que lo construye
+            (ver DatasetDiferido.diferida)
+    
+    Returns:
+        DataFrame: Tabla
+    """
+    return tabla() if callable(tabla) else tabla
@@ -0,0 +1,161 @@
+"""
+Módulo para deduplicar bloques de equipo entre archivos antes de procesarlos.
+Cuando se cargan exportaciones que se solapan (corridas NSP19 y NSP24 del mismo script
+o repeticiones del mismo día), cada cuerpo de bloque distinto se procesa una sola vez.
+El cuerpo excluye las líneas de encabezado '#', que cambian entre corridas (fecha, archivo de resultado).
+"""
+
+import hashlib
+
+def hash_cuerpo_bloque(bloque):
+    """
+    Calcula el hash del cuerpo de un bloque: el target y todo lo que sigue a las líneas
+    de encabezado '#', sin espacios finales.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo (comienza con el nombre del target)
+    
+    Returns:
+        str: Hash en hexadecimal (el mismo para el bloque en texto o en bytes)
+    """
+    if isinstance(bloque, str):
+        bloque = bloque.encode('utf-8', errors='ignore')
+    
+    fin_target = bloque.find(b'\n')
+    if fin_target == -1:
+        fin_target = len(bloque)
+    
+    # Saltar las líneas de encabezado, que siguen al target
+    posicion = fin_target + 1
+    while posicion < len(bloque) and bloque.startswith(b'#', posicion):
+        fin_linea = bloque.find(b'\n', posicion)
+        posicion = len(bloque) if fin_linea == -1 else fin_linea + 1
+    
+    hash_bloque = hashlib.blake2b(digest_size=16)
+    hash_bloque.update(bloque[:fin_target])
+    hash_bloque.update(b'\n')
+    hash_bloque.update(bloque[posicion:].rstrip())
+    return hash_bloque.hexdigest()
+
+def nuevo_registro_duplicados():
+    """
+    Crea el registro de cuerpos de bloque vistos durante un procesamiento.
+    
+    Returns:
+        dict: Registro con los cuerpos vistos, sus fuentes y los contadores de bloques y bytes
+    """
+    return {
+        'vistos': {},
+        'fuentes': {},
+        'bloques': 0,
+        'duplicados': 0,
+        'bytes': 0,
+        'bytes_duplicados': 0
+    }
+
+def registrar_bloque(registro, entrada, bloque, posicion):
+    """
+    Registra un bloque y determina si su cuerpo ya se había visto.
+    La entrada de procedencia recibe 'hash_cuerpo', 'longitud_cuerpo' y, si es un duplicado,
+    'duplicado_de' con la posición en el índice del bloque que sí se procesa.
+    
+    Args:
+        registro (dict): Registro de duplicados (ver nuevo_registro_duplicados)
+        entrada (dict): Entrada de procedencia del bloque
+        bloque (str): Texto del bloque
+        posicion (int): Posición de la entrada en el índice de procedencia
+    
+    Returns:
+        bool: True si el bloque debe procesarse (primer cuerpo visto), False si es un duplicado
+    """
+    entrada['hash_cuerpo'] = hash_cuerpo_bloque(bloque)
+    entrada['longitud_cuerpo'] = len(bloque)
+    return registrar_entrada(registro, entrada, posicion)
+
+def registrar_entrada(registro, entrada, posicion):
+    """
+    Registra una entrada de procedencia que ya tiene 'hash_cuerpo' (ver registrar_bloque).
+    Permite deduplicar entre los resultados de varios archivos procesados por separado
+    (ej: leídos de la caché), registrando sus entradas en un mismo registro al fusionarlos.
+    
+    Args:
+        registro (dict): Registro de duplicados
+        entrada (dict): Entrada de procedencia del bloque
+        posicion (int): Posición de la entrada en el índice de procedencia
+    
+    Returns:
+        bool: True si es el primer cuerpo visto, False si es un duplicado
+    """
+    hash_cuerpo = entrada['hash_cuerpo']
+    longitud = entrada.get('longitud_cuerpo') or 0
+    entrada.pop('duplicado_de', None)
+    
+    registro['bloques'] += 1
+    registro['bytes'] += longitud
+    registro['fuentes'].setdefault(hash_cuerpo, []).append(
+        {'archivo': entrada.get('archivo'), 'offset': entrada.get('offset'), 'fuente': entrada.get('fuente')}
+    )
+    
+    if hash_cuerpo in registro['vistos']:
+        entrada['duplicado_de'] = registro['vistos'][hash_cuerpo]
+        registro['duplicados'] += 1
+        registro['bytes_duplicados'] += longitud
+        return False
+    
+    registro['vistos'][hash_cuerpo] = posicion
+    return True
+
+def fuentes_duplicadas(registro):
+    """
+    Obtiene los cuerpos de bloque que aparecen en más de una fuente.
+    
+    Args:
+        registro (dict): Registro de duplicados
+    
+    Returns:
+        dict: hash_cuerpo -> lista de fuentes {'archivo', 'offset', 'fuente'} (la primera es la procesada)
+    """
+    return {hash_cuerpo: fuentes for hash_cuerpo, fuentes in registro['fuentes'].items() if len(fuentes) > 1}
+
+def estadisticas_duplicados(registro, segundos_procesamiento=None):
+    """
+    Calcula el ahorro de la deduplicación. El tiempo evitado se estima con la
+    velocidad de procesamiento medida sobre los bloques que sí se procesaron.
+    
+    Args:
+        registro (dict): Registro de duplicados
+        segundos_procesamiento (float, optional): Tiempo de procesamiento de los bloques únicos
+    
+    Returns:
+        dict: bloques, duplicados, bytes, bytes_evitados y segundos_evitados (estimado, o None)
+    """
+    bytes_procesados = registro['bytes'] - registro['bytes_duplicados']
+    segundos_evitados = None
+    if segundos_procesamiento is not None and bytes_procesados > 0:
+        segundos_evitados = segundos_procesamiento * registro['bytes_duplicados'] / bytes_procesados
+    
+    return {
+        'bloques': registro['bloques'],
+        'duplicados': registro['duplicados'],
+        'bytes': registro['bytes'],
+        'bytes_evitados': registro['bytes_duplicados'],
+        'segundos_evitados': segundos_evitados
+    }
+
+def describir_estadisticas_duplicados(estadisticas):
+    """
+    Describe las estadísticas de deduplicación para los mensajes de progreso.
+    
+    Args:
+        estadisticas (dict): Estadísticas (ver estadisticas_duplicados)
+    
+    Returns:
+        str: Descripción legible
+    """
+    descripcion = (
+        f"Bloques duplicados: {estadisticas['duplicados']} de {estadisticas['bloques']} "
+        f"({estadisticas['bytes_evitados'] / (1024 * 1024):.2f} MB sin procesar"
+    )
+    if estadisticas['segundos_evitados'] is not None:
+        descripcion += f", ~{estadisticas['segundos_evitados']:.2f} segundos evitados"
+    return descripcion + ")"
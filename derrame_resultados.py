@@ -0,0 +1,224 @@
+"""
+Módulo para procesar con un presupuesto de memoria.
+Cuando las tablas acumuladas en el proceso principal superan el presupuesto, se escriben en disco
+como archivos IPC de Arrow (derrame) y sus filas se liberan de la memoria. Al final, cada tabla se
+une desde sus archivos con memory-map, sin cargarlos antes en la memoria del proceso, y el resumen
+se calcula leyendo de los archivos solo las columnas que necesita, un archivo a la vez.
+"""
+
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+from parser.transferencia_arrow import PYARROW_DISPONIBLE, tabla_desde_columnas, concatenar_segmentos, importar_tabla
+
+if PYARROW_DISPONIBLE:
+    import pyarrow as pa
+    import pyarrow.ipc
+
+# Variables de entorno para el presupuesto de memoria (MB) y el directorio de los archivos derramados
+VARIABLE_MEMORIA = 'NSP_MEMORIA_MB'
+VARIABLE_DIRECTORIO_DERRAME = 'NSP_DIRECTORIO_DERRAME'
+
+# Prefijos del directorio de cada procesamiento y de los archivos de cada tabla
+PREFIJO_DIRECTORIO = 'nsp_derrame_'
+PREFIJO_ARCHIVO = 'tabla_'
+
+# Bytes estimados por valor en las columnas acumuladas como listas (referencia y objeto str de Python)
+BYTES_POR_VALOR = 64
+
+def resolver_presupuesto_memoria(presupuesto_mb=None):
+    """
+    Determina el presupuesto de memoria de las tablas acumuladas.
+    El parámetro tiene prioridad sobre la variable de entorno; por defecto no hay presupuesto.
+    
+    Args:
+        presupuesto_mb (float, optional): Memoria máxima en MB; 0 lo desactiva
+    
+    Returns:
+        float: Presupuesto en MB (0 si está desactivado o pyarrow no está instalado)
+    """
+    if presupuesto_mb is None:
+        valor = os.environ.get(VARIABLE_MEMORIA)
+        try:
+            presupuesto_mb = float(valor) if valor else 0
+        except ValueError:
+            raise ValueError(f"Presupuesto de memoria no válido en {VARIABLE_MEMORIA}: {valor}")
+    
+    if presupuesto_mb < 0:
+        raise ValueError(f"El presupuesto de memoria no puede ser negativo: {presupuesto_mb}")
+    
+    if presupuesto_mb and not PYARROW_DISPONIBLE:
+        print("pyarrow no está instalado; el procesamiento no tiene presupuesto de memoria")
+        return 0
+    
+    return presupuesto_mb
+
+def directorio_derrame():
+    """
+    Returns:
+        str: Directorio base de los archivos derramados (en disco, no en memoria compartida)
+    """
+    return os.environ.get(VARIABLE_DIRECTORIO_DERRAME) or tempfile.gettempdir()
+
+def nuevo_derrame(presupuesto_mb):
+    """
+    Crea el registro de derrame de un procesamiento y su directorio temporal.
+    
+    Args:
+        presupuesto_mb (float): Presupuesto de memoria en MB
+    
+    Returns:
+        dict: {'presupuesto': bytes, 'directorio': ruta, 'derrames': n, 'bytes_escritos': n},
+            o None si el presupuesto está desactivado
+    """
+    if not presupuesto_mb:
+        return None
+    
+    return {
+        'presupuesto': presupuesto_mb * 1024 * 1024,
+        'directorio': tempfile.mkdtemp(prefix=PREFIJO_DIRECTORIO, dir=directorio_derrame()),
+        'derrames': 0,
+        'bytes_escritos': 0
+    }
+
+def bytes_en_memoria(tabla):
+    """
+    Estima la memoria que ocupa una tabla acumulada: sus segmentos Arrow y sus columnas en listas.
+    Los archivos ya derramados no se cuentan.
+    
+    Args:
+        tabla (dict): Tabla acumulada ({'columnas', 'filas', 'segmentos'})
+    
+    Returns:
+        int: Bytes estimados
+    """
+    return sum(segmento.nbytes for segmento in tabla['segmentos']) + tabla['filas'] * len(tabla['columnas']) * BYTES_POR_VALOR
+
+def derramar_si_excede(derrame, acumulado, tablas):
+    """
+    Derrama las tablas acumuladas a disco si su memoria estimada supera el presupuesto.
+    
+    Args:
+        derrame (dict): Registro de derrame (ver nuevo_derrame) o None
+        acumulado (dict): Resultados acumulados
+        tablas (list): Nombres de las tablas del acumulado
+    
+    Returns:
+        bool: True si se derramó alguna tabla
+    """
+    if derrame is None:
+        return False
+    if sum(bytes_en_memoria(acumulado[tabla]) for tabla in tablas) <= derrame['presupuesto']:
+        return False
+    
+    derramadas = [tabla for tabla in tablas if derramar_tabla(derrame, tabla, acumulado[tabla])]
+    if derramadas:
+        derrame['derrames'] += 1
+    return bool(derramadas)
+
+def derramar_tabla(derrame, nombre, tabla):
+    """
+    Escribe en disco los segmentos y las filas en listas de una tabla acumulada y los libera.
+    La ruta del archivo se agrega a 'derramados' de la tabla, que precede a los segmentos y listas
+    restantes. Si las listas no se pueden convertir a Arrow (tipos mezclados), solo se derraman
+    los segmentos y las listas se conservan en memoria.
+    
+    Returns:
+        bool: True si se escribió un archivo
+    """
+    segmentos = list(tabla['segmentos'])
+    pendiente = tabla_desde_columnas(tabla['columnas']) if tabla['filas'] else None
+    if pendiente is not None:
+        segmentos.append(pendiente)
+    if not segmentos:
+        return False
+    
+    completa = concatenar_segmentos(segmentos)
+    descriptor, ruta = tempfile.mkstemp(prefix=f"{PREFIJO_ARCHIVO}{nombre}_", suffix='.arrow', dir=derrame['directorio'])
+    os.close(descriptor)
+    with pa.OSFile(ruta, 'wb') as archivo:
+        with pa.ipc.new_file(archivo, completa.schema) as escritor:
+            escritor.write_table(completa)
+    
+    derrame['bytes_escritos'] += os.path.getsize(ruta)
+    tabla.setdefault('derramados', []).append(ruta)
+    tabla['segmentos'] = []
+    if pendiente is not None:
+        tabla['columnas'] = {}
+        tabla['filas'] = 0
+    return True
+
+def abrir_derramados(tabla):
+    """
+    Abre con memory-map los archivos derramados de una tabla, en orden, para unirlos con sus
+    segmentos; los archivos se eliminan del directorio al abrirlos (ver transferencia_arrow.importar_tabla).
+    
+    Returns:
+        list: Tablas de Arrow de los archivos derramados
+    """
+    return [importar_tabla(ruta) for ruta in tabla.pop('derramados', [])]
+
+def leer_partes(tabla, columnas):
+    """
+    Recorre una tabla acumulada por partes (archivos derramados, segmentos y listas), en orden,
+    leyendo solo las columnas indicadas. Los archivos se abren con memory-map y se leen uno a la vez.
+    Las columnas que una parte no tiene se completan con None.
+    
+    Args:
+        tabla (dict): Tabla acumulada
+        columnas (list): Columnas a leer
+    
+    Yields:
+        DataFrame: Columnas de cada parte
+    """
+    def seleccionar(segmento):
+        return pd.DataFrame({
+            columna: segmento.column(columna).to_pandas() if columna in segmento.column_names else pd.Series([None] * segmento.num_rows, dtype=object)
+            for columna in columnas
+        })
+    
+    for ruta in tabla.get('derramados', []):
+        yield seleccionar(pa.ipc.open_file(pa.memory_map(ruta, 'r')).read_all())
+    
+    for segmento in tabla['segmentos']:
+        yield seleccionar(segmento)
+    
+    if tabla['filas']:
+        yield pd.DataFrame({columna: tabla['columnas'].get(columna, [None] * tabla['filas']) for columna in columnas})
+
+def columnas_tabla(tabla):
+    """
+    Obtiene las columnas de una tabla acumulada en todas sus partes, sin leer los valores.
+    
+    Returns:
+        set: Nombres de las columnas
+    """
+    columnas = set(tabla['columnas'])
+    for segmento in tabla['segmentos']:
+        columnas.update(segmento.column_names)
+    for ruta in tabla.get('derramados', []):
+        with pa.memory_map(ruta, 'r') as archivo:
+            columnas.update(pa.ipc.open_file(archivo).schema.names)
+    return columnas
+
+def cerrar_derrame(derrame):
+    """
+    Elimina el directorio de un procesamiento con los archivos derramados que queden
+    (ej: si el procesamiento se interrumpió antes de unir las tablas).
+    """
+    if derrame is not None:
+        shutil.rmtree(derrame['directorio'], ignore_errors=True)
+
+def describir_derrame(derrame):
+    """
+    Describe los derrames de un procesamiento para los mensajes de progreso.
+    
+    Returns:
+        str: Descripción
+    """
+    return (
+        f"Memoria acotada a {derrame['presupuesto'] / (1024 * 1024):g} MB: {derrame['derrames']} derrames a disco "
+        f"({derrame['bytes_escritos'] / (1024 * 1024):.1f} MB en {derrame['directorio']})"
+    )
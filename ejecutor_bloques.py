@@ -0,0 +1,283 @@
+"""
+Módulo para ejecutar el procesamiento de bloques de equipo en lotes.
+Soporta ejecución secuencial, con hilos o con procesos (sin la limitación del GIL).
+"""
+
+import os
+import signal
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Modos de ejecución disponibles
+MODO_SECUENCIAL = 'secuencial'
+MODO_HILOS = 'hilos'
+MODO_PROCESOS = 'procesos'
+MODOS_EJECUCION = [MODO_SECUENCIAL, MODO_HILOS, MODO_PROCESOS]
+
+# Variables de entorno para seleccionar el modo y el número de workers
+VARIABLE_MODO = 'NSP_MODO_PROCESAMIENTO'
+VARIABLE_WORKERS = 'NSP_WORKERS'
+
+# Tamaño máximo de cada lote enviado a un worker
+TAMANO_LOTE_BLOQUES = 50
+TAMANO_LOTE_BYTES = 8 * 1024 * 1024
+
+# Número mínimo de bloques para usar ejecución paralela por defecto
+MINIMO_BLOQUES_PARALELO = 10
+
+# Tiempo máximo de procesamiento de un bloque (segundos) y variable de entorno para cambiarlo (0 lo desactiva)
+LIMITE_BLOQUE_SEGUNDOS = 60
+VARIABLE_LIMITE_BLOQUE = 'NSP_LIMITE_BLOQUE'
+
+# Modos para los que ya se avisó que el límite de tiempo no se aplica (el aviso se muestra una vez por modo)
+_avisos_limite_inactivo = set()
+
+class TiempoBloqueExcedido(Exception):
+    """
+    Se lanza cuando el procesamiento de un bloque supera su tiempo máximo.
+    """
+
+def resolver_modo(modo=None, total_bloques=None):
+    """
+    Determina el modo de ejecución. El parámetro tiene prioridad sobre la variable de entorno.
+    Sin ninguno de los dos, se usan hilos para más de 10 bloques y ejecución secuencial en otro caso.
+    
+    Args:
+        modo (str, optional): 'secuencial', 'hilos' o 'procesos'
+        total_bloques (int, optional): Número de bloques a procesar, si se conoce
+    
+    Returns:
+        str: Modo de ejecución
+    """
+    if modo is None:
+        modo = os.environ.get(VARIABLE_MODO) or None
+    
+    if modo is None:
+        if total_bloques is not None and total_bloques <= MINIMO_BLOQUES_PARALELO:
+            return MODO_SECUENCIAL
+        return MODO_HILOS
+    
+    modo = modo.strip().lower()
+    if modo not in MODOS_EJECUCION:
+        raise ValueError(f"Modo de procesamiento no válido: {modo}. Opciones: {', '.join(MODOS_EJECUCION)}")
+    
+    return modo
+
+def resolver_workers(workers=None):
+    """
+    Determina el número de workers. El parámetro tiene prioridad sobre la variable de entorno.
+    Por defecto se usa el número de núcleos disponibles.
+    
+    Args:
+        workers (int, optional): Número de workers
+    
+    Returns:
+        int: Número de workers (al menos 1)
+    """
+    if workers is None:
+        valor = os.environ.get(VARIABLE_WORKERS)
+        if valor:
+            try:
+                workers = int(valor)
+            except ValueError:
+                raise ValueError(f"Valor no válido para {VARIABLE_WORKERS}: {valor}")
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    return max(1, workers)
+
+def resolver_limite_bloque(limite=None):
+    """
+    Determina el tiempo máximo de procesamiento por bloque. El parámetro tiene prioridad
+    sobre la variable de entorno.
+    
+    Args:
+        limite (float, optional): Segundos por bloque (0 desactiva el límite)
+    
+    Returns:
+        float: Segundos por bloque o None si no hay límite
+    """
+    if limite is None:
+        valor = os.environ.get(VARIABLE_LIMITE_BLOQUE)
+        if valor:
+            try:
+                limite = float(valor)
+            except ValueError:
+                raise ValueError(f"Valor no válido para {VARIABLE_LIMITE_BLOQUE}: {valor}")
+    
+    if limite is None:
+        limite = LIMITE_BLOQUE_SEGUNDOS
+    
+    return limite if limite > 0 else None
+
+def limite_aplicable():
+    """
+    Indica si el límite de tiempo puede aplicarse en el hilo actual. Se usa SIGALRM,
+    disponible solo en el hilo principal de cada proceso (workers en modo procesos,
+    o ejecución secuencial desde el hilo principal) y en sistemas tipo Unix.
+    
+    Returns:
+        bool: True si se puede interrumpir el procesamiento de un bloque
+    """
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+def limite_activo(modo, workers):
+    """
+    Indica si el límite de tiempo por bloque se aplica al ejecutar los lotes con el modo y los workers
+    indicados desde el hilo actual. Con varios workers, solo los procesos lo aplican (cada worker es el
+    hilo principal de su proceso); la ejecución en el hilo actual (modo secuencial o un solo worker) lo
+    aplica solo si es el hilo principal, lo que no ocurre en la aplicación Streamlit.
+    
+    Args:
+        modo (str): 'secuencial', 'hilos' o 'procesos'
+        workers (int): Número de workers
+    
+    Returns:
+        bool: True si los bloques que superan el límite se interrumpen
+    """
+    if modo != MODO_SECUENCIAL and workers > 1:
+        return modo == MODO_PROCESOS and hasattr(signal, 'setitimer')
+    return limite_aplicable()
+
+def avisar_limite_inactivo(limite, modo, workers):
+    """
+    Muestra una vez por modo un aviso si hay un límite de tiempo por bloque que no se aplica
+    con el modo y los workers indicados (ver limite_activo).
+    
+    Args:
+        limite (float): Tiempo máximo por bloque (None si está desactivado)
+        modo (str): 'secuencial', 'hilos' o 'procesos'
+        workers (int): Número de workers
+    """
+    if not limite or modo in _avisos_limite_inactivo or limite_activo(modo, workers):
+        return
+    _avisos_limite_inactivo.add(modo)
+    print(f"Aviso: el límite de {limite:g} segundos por bloque no se aplica en modo '{modo}' desde este hilo "
+          f"(requiere SIGALRM en el hilo principal del proceso); use el modo '{MODO_PROCESOS}' para aplicarlo")
+
+@contextmanager
+def limite_tiempo(segundos):
+    """
+    Interrumpe el código del bloque 'with' con TiempoBloqueExcedido si supera el tiempo indicado.
+    Si el límite no es aplicable en el hilo actual (ver limite_aplicable), no hace nada.
+    
+    Args:
+        segundos (float): Tiempo máximo (None desactiva el límite)
+    """
+    if not segundos or not limite_aplicable():
+        yield
+        return
+    
+    def _alarma(signum, frame):
+        raise TiempoBloqueExcedido()
+    
+    manejador_anterior = signal.signal(signal.SIGALRM, _alarma)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, manejador_anterior)
+
+def crear_lotes(bloques, tamano_lote=TAMANO_LOTE_BLOQUES, max_bytes=TAMANO_LOTE_BYTES, aislar=None):
+    """
+    Agrupa los bloques en lotes, sin consumir el iterable por adelantado.
+    Un lote se cierra al alcanzar el número de bloques o el tamaño máximo.
+    
+    Args:
+        bloques (iterable): Bloques de texto
+        tamano_lote (int): Número máximo de bloques por lote
+        max_bytes (int): Tamaño aproximado máximo (en caracteres) por lote
+        aislar (callable, optional): Indica los bloques que van en un lote propio
+            (ej: fragmentos de un equipo grande, para repartirlos entre los workers)
+    
+    Yields:
+        list: Lote de bloques
+    """
+    lote = []
+    tamano = 0
+    
+    for bloque in bloques:
+        if aislar is not None and aislar(bloque):
+            if lote:
+                yield lote
+                lote = []
+                tamano = 0
+            yield [bloque]
+            continue
+        
+        lote.append(bloque)
+        tamano += len(bloque)
+        
+        if len(lote) >= tamano_lote or tamano >= max_bytes:
+            yield lote
+            lote = []
+            tamano = 0
+    
+    if lote:
+        yield lote
+
+def ejecutar_lotes(funcion, lotes, modo=MODO_SECUENCIAL, workers=1):
+    """
+    Ejecuta la función sobre cada lote y devuelve los resultados en el orden de los lotes,
+    de forma que la fusión posterior sea determinista.
+    Se mantienen como máximo 2 lotes pendientes por worker, para no cargar todos los lotes en memoria.
+    
+    Args:
+        funcion (callable): Función de nivel de módulo (debe poder serializarse en modo procesos)
+        lotes (iterable): Lotes a procesar
+        modo (str): 'secuencial', 'hilos' o 'procesos'
+        workers (int): Número de workers
+    
+    Yields:
+        Resultado de la función para cada lote, en orden
+    """
+    if modo == MODO_SECUENCIAL or workers <= 1:
+        for lote in lotes:
+            yield funcion(lote)
+        return
+    
+    clase_executor = ProcessPoolExecutor if modo == MODO_PROCESOS else ThreadPoolExecutor
+    max_pendientes = workers * 2
+    
+    with clase_executor(max_workers=workers) as executor:
+        pendientes = deque()
+        
+        for lote in lotes:
+            pendientes.append(executor.submit(funcion, lote))
+            
+            if len(pendientes) >= max_pendientes:
+                yield pendientes.popleft().result()
+        
+        while pendientes:
+            yield pendientes.popleft().result()
+
+def ejecutar_lotes_en_orden(funcion, lotes, orden, modo=MODO_SECUENCIAL, workers=1):
+    """
+    Envía los lotes a los workers en el orden indicado (ej: del mayor al menor) y devuelve los
+    resultados en el orden original de los lotes, para que la fusión siga siendo determinista.
+    
+    Args:
+        funcion (callable): Función de nivel de módulo (debe poder serializarse en modo procesos)
+        lotes (list): Lotes a procesar
+        orden (list): Posiciones de los lotes en el orden de envío
+        modo (str): 'secuencial', 'hilos' o 'procesos'
+        workers (int): Número de workers
+    
+    Yields:
+        Resultado de la función para cada lote, en el orden de la lista de lotes
+    """
+    if modo == MODO_SECUENCIAL or workers <= 1:
+        for lote in lotes:
+            yield funcion(lote)
+        return
+    
+    clase_executor = ProcessPoolExecutor if modo == MODO_PROCESOS else ThreadPoolExecutor
+    
+    with clase_executor(max_workers=workers) as executor:
+        futuros = {posicion: executor.submit(funcion, lotes[posicion]) for posicion in orden}
+        for posicion in range(len(lotes)):
+            yield futuros.pop(posicion).result()
@@ -51,7 +51,8 @@ def mostrar_equipos_no_leidos(df_no_leidos):
             'Timeout': 'red',
             'Conexión': 'orange',
             'Autenticación': 'yellow',
-            'Desconocido': 'gray'
+            'Desconocido': 'gray',
+            'Cuarentena': 'purple'
         }
     )
     
@@ -86,19 +87,20 @@ def mostrar_equipos_no_leidos(df_no_leidos):
     
     st.plotly_chart(tabla_fig)
     
-    # Extraer códigos de ciudad de los equipos no leídos
-    from parser.extraer_ciudad import extraer_ciudad_desde_nombre_equipo, normalizar_ciudad
+    # Ciudad de los equipos no leídos (resuelta al crear df_no_leidos; se resuelve aquí solo si falta)
+    from parser.extraer_ciudad import resolver_ciudades
     
-    # Añadir columnas de ciudad
     df_analisis = df_no_leidos.copy()
-    df_analisis['ciudad'] = df_analisis['target'].apply(extraer_ciudad_desde_nombre_equipo)
-    df_analisis['ciudad_normalizada'] = df_analisis['ciudad'].apply(normalizar_ciudad)
+    if 'ciudad_normalizada' not in df_analisis.columns:
+        ciudades = resolver_ciudades(df_analisis['target'])
+        df_analisis['ciudad'] = ciudades['ciudad']
+        df_analisis['ciudad_normalizada'] = ciudades['ciudad_normalizada']
     
     # Agrupar por ciudad normalizada
     if 'ciudad_normalizada' in df_analisis.columns and not df_analisis['ciudad_normalizada'].isna().all():
         st.subheader("Distribución por Ciudad")
         
-        ciudad_stats = df_analisis.groupby('ciudad_normalizada').size().reset_index(name='cantidad')
+        ciudad_stats = df_analisis.groupby('ciudad_normalizada', observed=True).size().reset_index(name='cantidad')
         
         # Crear gráfico de barras para distribución por ciudad
         fig_ciudad = px.bar(
@@ -0,0 +1,335 @@
+"""
+Módulo con los extractores especializados por fuente (NSP19/NSP24).
+Cada fuente registra los diseños de tabla que conoce (primera línea del encabezado y posiciones
+de las columnas) con un patrón anclado que valida de una sola vez todas las filas de la tabla.
+Si una sección tiene una tabla con un encabezado desconocido o filas que no siguen el diseño,
+el extractor especializado no la procesa y se usa el extractor genérico.
+"""
+
+import re
+
+from parser.tabla_ancho_fijo import leer_tablas, columnas_desde_encabezado, CODIFICACION
+
+# Línea que identifica la fuente del bloque: '#Fuente <fuente>', a continuación del target
+# (o de la marca de fragmento); el hash del cuerpo del bloque no incluye las líneas '#'
+MARCA_FUENTE = '#Fuente'
+
+# Columnas de las tablas SR OS, tal como aparecen en la primera línea del encabezado (las mismas de los extractores genéricos)
+NOMBRES_SERVICIOS = ['ServiceId', 'Type', 'Adm', 'Opr', 'CustomerId', 'Service Name']
+NOMBRES_PUERTOS = ['Port', 'Admin', 'Link', 'Port', 'Cfg', 'Oper', 'LAG/']
+
+# Primeras líneas de encabezado conocidas de 'show service service-using' y 'show port', según el ancho de sus columnas
+LINEA_SERVICIOS = 'ServiceId    Type      Adm  Opr  CustomerId Service Name'
+LINEA_SERVICIOS_ANGOSTA = 'ServiceId  Type      Adm  Opr  CustomerId Service Name'
+LINEA_PUERTOS = 'Port        Admin Link Port    Cfg  Oper LAG/ Port Port Port   C/QS/S/XFP/'
+LINEA_PUERTOS_TIPO_ANCHO = 'Port        Admin Link Port    Cfg  Oper LAG/ Port Port Port    C/QS/S/XFP/'
+LINEA_PUERTOS_ID_ANCHO = 'Port          Admin Link Port    Cfg  Oper LAG/ Port Port Port   C/QS/S/XFP/'
+
+# Encabezados de cada fuente. NSP24 administra equipos SR OS 20 o superior, con la columna Port
+# más ancha para los puertos con conector ('1/1/c1/1'); cualquier otro diseño usa el extractor genérico
+ENCABEZADOS_FUENTE = {
+    'NSP19': {
+        'servicios': [LINEA_SERVICIOS, LINEA_SERVICIOS_ANGOSTA],
+        'puertos': [LINEA_PUERTOS, LINEA_PUERTOS_TIPO_ANCHO, LINEA_PUERTOS_ID_ANCHO]
+    },
+    'NSP24': {
+        'servicios': [LINEA_SERVICIOS],
+        'puertos': [LINEA_PUERTOS_ID_ANCHO]
+    }
+}
+
+# Línea de total de la tabla de servicios, que no es una fila
+TOTAL_SERVICIOS = 'Matching Services'
+
+def etiquetar_fuente(bloque, fuente):
+    """
+    Agrega la línea de fuente a continuación del target del bloque, para que los workers
+    elijan el extractor especializado sin recibir el índice de procedencia.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo (comienza con el nombre del target)
+        fuente (str): Fuente del bloque ("NSP19" o "NSP24")
+    
+    Returns:
+        str o bytes: Bloque con la línea de fuente, del mismo tipo que el bloque
+    """
+    if not fuente:
+        return bloque
+    
+    linea = f"\n{MARCA_FUENTE} {fuente}"
+    if isinstance(bloque, bytes):
+        linea = linea.encode(CODIFICACION)
+        fin_target = bloque.find(b'\n')
+    else:
+        fin_target = bloque.find('\n')
+    
+    if fin_target == -1:
+        return bloque + linea
+    return bloque[:fin_target] + linea + bloque[fin_target:]
+
+def fuente_bloque(bloque):
+    """
+    Obtiene la fuente de un bloque etiquetado con etiquetar_fuente.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto o fragmento
+    
+    Returns:
+        str: Fuente o None si el bloque no tiene la línea de fuente
+    """
+    if isinstance(bloque, bytes):
+        marca, salto = MARCA_FUENTE.encode(CODIFICACION), b'\n'
+    else:
+        marca, salto = MARCA_FUENTE, '\n'
+    
+    # La línea de fuente está entre las líneas '#' que siguen al target
+    posicion = bloque.find(salto) + 1
+    while 0 < posicion < len(bloque) and bloque.startswith(marca[:1], posicion):
+        fin_linea = bloque.find(salto, posicion)
+        if fin_linea == -1:
+            fin_linea = len(bloque)
+        if bloque.startswith(marca, posicion):
+            fuente = bloque[posicion + len(marca):fin_linea].strip()
+            return fuente.decode(CODIFICACION) if isinstance(fuente, bytes) else fuente
+        posicion = fin_linea + 1
+    
+    return None
+
+def patron_invasion(inicios):
+    """
+    Construye el patrón anclado que encuentra la primera fila de una tabla que no sigue su diseño:
+    una fila en la que un valor invade la columna siguiente (en algún límite de columna, ni el
+    carácter anterior ni el siguiente son espacios). Es la condición con la que
+    tabla_ancho_fijo.cortar_fila deja de cortar por posición y divide la fila por espacios.
+    
+    Args:
+        inicios (list): Posiciones de inicio de las columnas
+    
+    Returns:
+        re.Pattern: Patrón para buscar sobre las filas unidas por saltos de línea
+    """
+    limites = '|'.join(f'.{{{inicio - 1}}}[^ \\n]{{2}}' for inicio in inicios[1:])
+    return re.compile(f'^(?:{limites})', re.MULTILINE)
+
+def disenos_tabla(encabezados, nombres):
+    """
+    Calcula el diseño de cada encabezado conocido de una tabla.
+    
+    Args:
+        encabezados (list): Primeras líneas de encabezado conocidas
+        nombres (list): Nombres de las columnas tal como aparecen en el encabezado
+    
+    Returns:
+        dict: línea de encabezado -> (posiciones de inicio, patrón de invasión)
+    """
+    disenos = {}
+    for encabezado in encabezados:
+        inicios = columnas_desde_encabezado([encabezado], '', nombres)
+        disenos[encabezado] = (inicios, patron_invasion(inicios))
+    return disenos
+
+def leer_columnas(seccion, disenos):
+    """
+    Lee todas las tablas de una sección con los diseños conocidos, cortando cada columna
+    de todas las filas a la vez. Las filas en bytes se decodifican una sola vez por tabla.
+    
+    Args:
+        seccion (str o bytes): Texto de la sección del comando
+        disenos (dict): Diseños conocidos (ver disenos_tabla)
+    
+    Returns:
+        tuple: (filas, columnas, lineas) con las líneas de datos, una lista de valores por posición
+            (columnas es None si la sección no tiene filas) y el número de cada fila en la sección,
+            o None si alguna tabla no tiene un diseño conocido o sus filas no lo siguen
+    """
+    filas = []
+    columnas = None
+    lineas = []
+    
+    for tabla in leer_tablas(seccion):
+        encabezado = tabla['encabezado'][0]
+        guiones = tabla['guiones']
+        if isinstance(encabezado, bytes):
+            encabezado = encabezado.decode(CODIFICACION, errors='ignore')
+            guiones = guiones.decode(CODIFICACION, errors='ignore')
+        
+        # Con varios segmentos de guiones, el extractor genérico toma las columnas de esa línea
+        diseno = disenos.get(encabezado)
+        if diseno is None or ' ' in guiones:
+            return None
+        inicios, patron = diseno
+        
+        if not tabla['filas']:
+            continue
+        if isinstance(tabla['filas'][0], bytes):
+            texto = b'\n'.join(tabla['filas']).decode(CODIFICACION, errors='ignore')
+        else:
+            texto = '\n'.join(tabla['filas'])
+        if patron.search(texto):
+            return None
+        
+        filas_tabla = texto.split('\n')
+        limites = list(zip(inicios, inicios[1:] + [None]))
+        if columnas is None:
+            columnas = [[] for _ in limites]
+        for valores, (inicio, fin) in zip(columnas, limites):
+            valores.extend([fila[inicio:fin].strip() for fila in filas_tabla])
+        filas.extend(filas_tabla)
+        lineas.extend(range(tabla['linea'], tabla['linea'] + len(filas_tabla)))
+    
+    return filas, columnas, lineas
+
+def extraer_servicios_especializado(seccion, target, disenos, lineas=None):
+    """
+    Extrae los servicios de 'show service service-using' con los diseños conocidos de la fuente.
+    Produce las mismas filas que el extractor genérico (procesar_datos_optimizado.extraer_servicios).
+    
+    Args:
+        seccion (str o bytes): Texto de la sección del comando
+        target (str): Nombre del equipo
+        disenos (dict): Diseños conocidos de la tabla (ver disenos_tabla)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
+    
+    Returns:
+        dict: columna -> lista de valores, o None si la sección requiere el extractor genérico
+    """
+    leidas = leer_columnas(seccion, disenos)
+    if leidas is None:
+        return None
+    filas, columnas, lineas_filas = leidas
+    if not filas:
+        return {'target': []}
+    service_id, service_type, admin_state, oper_state, customer_id, service_name = columnas
+    
+    # Eliminar asterisco al final si existe (indica truncamiento)
+    service_name = [nombre[:-1] if nombre.endswith('*') else nombre for nombre in service_name]
+    
+    # Ignorar líneas que no contienen datos de servicios
+    conservar = [i for i, valor in enumerate(service_id) if valor and TOTAL_SERVICIOS not in filas[i]]
+    columnas = {
+        'service_id': service_id,
+        'type': service_type,
+        'admin_state': admin_state,
+        'oper_state': oper_state,
+        'customer_id': customer_id,
+        'service_name': service_name
+    }
+    return _columnas_filtradas(target, columnas, conservar, len(filas), lineas_filas, lineas)
+
+def extraer_puertos_especializado(seccion, target, disenos, lineas=None):
+    """
+    Extrae los puertos de 'show port' con los diseños conocidos de la fuente.
+    Produce las mismas filas que el extractor genérico (procesar_datos_optimizado.extraer_puertos).
+    
+    Args:
+        seccion (str o bytes): Texto de la sección del comando
+        target (str): Nombre del equipo
+        disenos (dict): Diseños conocidos de la tabla (ver disenos_tabla)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
+    
+    Returns:
+        dict: columna -> lista de valores, o None si la sección requiere el extractor genérico
+    """
+    leidas = leer_columnas(seccion, disenos)
+    if leidas is None:
+        return None
+    filas, columnas, lineas_filas = leidas
+    if not filas:
+        return {'target': []}
+    port_id, admin_state, link, port_state, cfg_mtu, oper_mtu = columnas[:6]
+    
+    conservar = [i for i, valor in enumerate(port_id) if valor]
+    columnas = {
+        'port_id': port_id,
+        'admin_state': [valor or None for valor in admin_state],
+        'link': [valor or None for valor in link],
+        'port_state': [valor or None for valor in port_state],
+        'cfg_mtu': [valor or None for valor in cfg_mtu],
+        'oper_mtu': [valor or None for valor in oper_mtu]
+    }
+    return _columnas_filtradas(target, columnas, conservar, len(filas), lineas_filas, lineas)
+
+def _columnas_filtradas(target, columnas, conservar, total, lineas_filas, lineas=None):
+    """
+    Conserva solo las filas indicadas y agrega la columna del target al inicio.
+    Si se recibe la lista lineas, le agrega el número en la sección de las filas conservadas.
+    """
+    if len(conservar) < total:
+        columnas = {columna: [valores[i] for i in conservar] for columna, valores in columnas.items()}
+    if lineas is not None:
+        lineas.extend(lineas_filas[i] for i in conservar)
+    
+    resultado = {'target': [target] * len(conservar)}
+    resultado.update(columnas)
+    return resultado
+
+# Extractores especializados de cada tabla y diseños conocidos por fuente
+EXTRACTORES_ESPECIALIZADOS = {
+    'servicios': (extraer_servicios_especializado, NOMBRES_SERVICIOS),
+    'puertos': (extraer_puertos_especializado, NOMBRES_PUERTOS)
+}
+DISENOS_FUENTE = {
+    fuente: {tabla: disenos_tabla(lineas, EXTRACTORES_ESPECIALIZADOS[tabla][1]) for tabla, lineas in encabezados.items()}
+    for fuente, encabezados in ENCABEZADOS_FUENTE.items()
+}
+
+def extraer_especializado(fuente, nombre_tabla, seccion, target, lineas=None):
+    """
+    Extrae una tabla con el extractor especializado de la fuente del bloque.
+    
+    Args:
+        fuente (str): Fuente del bloque (ver fuente_bloque)
+        nombre_tabla (str): Tabla a extraer ('servicios' o 'puertos')
+        seccion (str o bytes): Texto de la sección del comando
+        target (str): Nombre del equipo
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
+    
+    Returns:
+        dict: columna -> lista de valores, o None si la fuente no tiene extractor para la tabla
+            o la sección no sigue sus diseños conocidos (se usa el extractor genérico)
+    """
+    disenos = DISENOS_FUENTE.get(fuente, {}).get(nombre_tabla)
+    if disenos is None:
+        return None
+    return EXTRACTORES_ESPECIALIZADOS[nombre_tabla][0](seccion, target, disenos, lineas)
+
+def registrar_extraccion(estadisticas, fuente, nombre_tabla, especializado):
+    """
+    Cuenta una sección extraída con el extractor especializado o con el genérico.
+    
+    Args:
+        estadisticas (dict): (fuente, tabla) -> [secciones especializadas, secciones genéricas]
+        fuente (str): Fuente del bloque (None si el bloque no está etiquetado)
+        nombre_tabla (str): Tabla extraída
+        especializado (bool): True si se usó el extractor especializado
+    """
+    conteo = estadisticas.setdefault((fuente, nombre_tabla), [0, 0])
+    conteo[0 if especializado else 1] += 1
+
+def fusionar_estadisticas(estadisticas, otras):
+    """
+    Suma a las estadísticas las de otro lote (ver registrar_extraccion).
+    """
+    for clave, (especializadas, genericas) in otras.items():
+        conteo = estadisticas.setdefault(clave, [0, 0])
+        conteo[0] += especializadas
+        conteo[1] += genericas
+
+def describir_estadisticas_extractores(estadisticas):
+    """
+    Describe el uso de los extractores especializados y la tasa de uso del genérico, para los mensajes de progreso.
+    
+    Args:
+        estadisticas (dict): Estadísticas de extracción (ver registrar_extraccion)
+    
+    Returns:
+        str: Descripción legible
+    """
+    if not estadisticas:
+        return "Extractores por fuente: sin secciones de servicios o puertos"
+    
+    partes = []
+    for (fuente, nombre_tabla), (especializadas, genericas) in sorted(estadisticas.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+        total = especializadas + genericas
+        partes.append(f"{fuente or 'sin fuente'} {nombre_tabla}: {total} secciones, genérico {genericas} ({genericas / total:.1%})")
+    return "Extractores por fuente: " + '; '.join(partes)
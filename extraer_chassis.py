@@ -1,157 +1,138 @@
 """
 Módulo para extraer información del chassis de los equipos Nokia.
+La sección 'show chassis' se lee una sola vez en un diccionario clave -> valor normalizado,
+del que se obtienen todos los campos del chassis y el tipo de equipo.
 """
 
 import re
 
+# Línea 'Clave : valor' de la salida de 'show chassis' (la clave no contiene ':')
+PATRON_CLAVE_VALOR = re.compile(r'^[ \t]*([^:\n]*[^:\s])[ \t]*:[ \t]*([^\n]*?)[ \t]*$', re.MULTILINE)
+
+# Primer número de un valor de temperatura (ej: '54C', '+41 C')
+PATRON_TEMPERATURA = re.compile(r'([0-9]+(?:\.[0-9]+)?)')
+
+# Claves que abren la subsección de un ventilador o una fuente de alimentación;
+# los 'Status' que siguen pertenecen a ese componente
+CLAVES_CONTEXTO = {
+    'fan_tray_number': 'ventiladores',
+    'power_supply_number': 'fuentes'
+}
+
+# Claves que cierran cualquier subsección de componentes
+CLAVES_FIN_CONTEXTO = {'number_of_fan_trays', 'number_of_power_supplies'}
+
+# Claves aceptadas para cada campo del chassis, en orden de prioridad
+CLAVES_CAMPOS_CHASSIS = {
+    'name': ['name', 'chassis_name', 'system_name', 'host_name', 'hostname'],
+    'type': ['type', 'chassis_type', 'system_type', 'hardware_type', 'model', 'chassis_model', 'system_model'],
+    'serial_number': ['serial_number', 'chassis_serial_number', 'system_serial_number', 'serial', 'chassis_serial', 's/n'],
+    'temperature': ['temperature', 'chassis_temperature', 'system_temperature', 'temp'],
+    'fan_status': ['fan_status'],
+    'power_status': ['power_status'],
+    'critical_led': ['critical_led_state'],
+    'major_led': ['major_led_state'],
+    'minor_led': ['minor_led_state']
+}
+
+# Campos que deben existir para considerar que se encontró información del chassis
+CAMPOS_PRINCIPALES = ['name', 'type', 'serial_number', 'temperature']
+
+def normalizar_clave(clave):
+    """
+    Normaliza una clave de 'show chassis' (minúsculas, espacios como '_').
+    
+    Args:
+        clave (str): Clave tal como aparece en la salida
+    
+    Returns:
+        str: Clave normalizada (ej: 'Critical LED state' -> 'critical_led_state')
+    """
+    return '_'.join(clave.lower().split())
+
+def leer_campos_chassis(seccion):
+    """
+    Lee la sección 'show chassis' en una sola pasada.
+    Cada clave conserva su primer valor; los estados de ventiladores y fuentes de alimentación
+    se acumulan en 'estados_ventiladores' y 'estados_fuentes'.
+    
+    Args:
+        seccion (str): Texto de la sección 'show chassis' (ver indice_secciones)
+    
+    Returns:
+        dict: Clave normalizada -> valor
+    """
+    campos = {'estados_ventiladores': [], 'estados_fuentes': []}
+    contexto = None
+    
+    for match in PATRON_CLAVE_VALOR.finditer(seccion):
+        clave = normalizar_clave(match.group(1))
+        valor = match.group(2)
+        
+        if clave in CLAVES_CONTEXTO:
+            contexto = CLAVES_CONTEXTO[clave]
+        elif clave in CLAVES_FIN_CONTEXTO:
+            contexto = None
+        elif clave == 'status' and contexto:
+            campos['estados_' + contexto].append(valor)
+            continue
+        
+        campos.setdefault(clave, valor)
+    
+    return campos
+
+def estado_componentes(estados):
+    """
+    Resume los estados de un grupo de componentes (ventiladores o fuentes).
+    
+    Args:
+        estados (list): Estados individuales (ej: ['up', 'up'])
+    
+    Returns:
+        str: Primer estado distinto de 'up', 'up' si todos lo están o None si no hay estados
+    """
+    for estado in estados:
+        if estado.lower() != 'up':
+            return estado
+    return estados[0] if estados else None
+
+def info_chassis_desde_campos(campos):
+    """
+    Obtiene la información del chassis a partir de los campos de 'show chassis'.
+    
+    Args:
+        campos (dict): Campos leídos con leer_campos_chassis
+    
+    Returns:
+        dict: Diccionario con la información del chassis o None si no se encuentra
+    """
+    chassis_info = {}
+    for campo, claves in CLAVES_CAMPOS_CHASSIS.items():
+        chassis_info[campo] = next((campos[clave] for clave in claves if campos.get(clave)), None)
+    
+    if chassis_info['temperature'] is not None:
+        temp_match = PATRON_TEMPERATURA.search(chassis_info['temperature'])
+        chassis_info['temperature'] = temp_match.group(1) if temp_match else None
+    
+    if chassis_info['fan_status'] is None:
+        chassis_info['fan_status'] = estado_componentes(campos.get('estados_ventiladores', []))
+    if chassis_info['power_status'] is None:
+        chassis_info['power_status'] = estado_componentes(campos.get('estados_fuentes', []))
+    
+    if not any(chassis_info[campo] for campo in CAMPOS_PRINCIPALES):
+        return None
+    
+    return chassis_info
+
 def extraer_info_chassis(bloque):
     """
-    Extrae la información del chassis del bloque de texto.
+    Extrae la información del chassis del texto de la sección 'show chassis'.
     Compatible con múltiples formatos de NSP.
     
     Args:
-        bloque (str): Bloque de texto del equipo
-        
+        bloque (str): Texto de la sección 'show chassis' del equipo (ver indice_secciones)
+    
     Returns:
         dict: Diccionario con la información del chassis o None si no se encuentra
     """
-    # Inicializar diccionario de información
-    chassis_info = {
-        'name': None,
-        'type': None,
-        'serial_number': None,
-        'temperature': None,
-        'fan_status': None,
-        'power_status': None
-    }
-    
-    # Patrones para buscar información del chassis
-    patrones_name = [
-        r'Name\s*:?\s*([^\n]+)',
-        r'Chassis\s+Name\s*:?\s*([^\n]+)',
-        r'System\s+Name\s*:?\s*([^\n]+)',
-        r'Host\s+Name\s*:?\s*([^\n]+)',
-        r'Hostname\s*:?\s*([^\n]+)',
-    ]
-    
-    patrones_type = [
-        r'Type\s*:?\s*([^\n]+)',
-        r'Chassis\s+Type\s*:?\s*([^\n]+)',
-        r'System\s+Type\s*:?\s*([^\n]+)',
-        r'Hardware\s+Type\s*:?\s*([^\n]+)',
-        r'Model\s*:?\s*([^\n]+)',
-        r'Chassis\s+Model\s*:?\s*([^\n]+)',
-        r'System\s+Model\s*:?\s*([^\n]+)',
-    ]
-    
-    patrones_serial = [
-        r'Serial\s+[Nn]umber\s*:?\s*([^\n]+)',
-        r'Chassis\s+Serial\s+[Nn]umber\s*:?\s*([^\n]+)',
-        r'System\s+Serial\s+[Nn]umber\s*:?\s*([^\n]+)',
-        r'Serial\s*:?\s*([^\n]+)',
-        r'Chassis\s+Serial\s*:?\s*([^\n]+)',
-        r'System\s+Serial\s*:?\s*([^\n]+)',
-        r'S/N\s*:?\s*([^\n]+)',
-        r'Chassis\s+S/N\s*:?\s*([^\n]+)',
-        r'System\s+S/N\s*:?\s*([^\n]+)',
-    ]
-    
-    patrones_temp = [
-        r'Temperature\s*:?\s*([0-9.]+)\s*C',
-        r'Chassis\s+Temperature\s*:?\s*([0-9.]+)\s*C',
-        r'System\s+Temperature\s*:?\s*([0-9.]+)\s*C',
-        r'Temperature\s*:?\s*([0-9.]+)',
-        r'Chassis\s+Temperature\s*:?\s*([0-9.]+)',
-        r'System\s+Temperature\s*:?\s*([0-9.]+)',
-        r'Temp\s*:?\s*([0-9.]+)\s*C',
-        r'Chassis\s+Temp\s*:?\s*([0-9.]+)\s*C',
-        r'System\s+Temp\s*:?\s*([0-9.]+)\s*C',
-        r'Temp\s*:?\s*([0-9.]+)',
-        r'Chassis\s+Temp\s*:?\s*([0-9.]+)',
-        r'System\s+Temp\s*:?\s*([0-9.]+)',
-    ]
-    
-    # Buscar información del chassis usando los patrones
-    for patron in patrones_name:
-        match = re.search(patron, bloque)
-        if match:
-            chassis_info['name'] = match.group(1).strip()
-            break
-    
-    for patron in patrones_type:
-        match = re.search(patron, bloque)
-        if match:
-            chassis_info['type'] = match.group(1).strip()
-            break
-    
-    for patron in patrones_serial:
-        match = re.search(patron, bloque)
-        if match:
-            chassis_info['serial_number'] = match.group(1).strip()
-            break
-    
-    for patron in patrones_temp:
-        match = re.search(patron, bloque)
-        if match:
-            chassis_info['temperature'] = match.group(1).strip()
-            break
-    
-    # Buscar estado de ventiladores
-    fan_match = re.search(r'Fan\s+Status\s*:?\s*([^\n]+)', bloque)
-    if fan_match:
-        chassis_info['fan_status'] = fan_match.group(1).strip()
-    
-    # Buscar estado de alimentación
-    power_match = re.search(r'Power\s+Status\s*:?\s*([^\n]+)', bloque)
-    if power_match:
-        chassis_info['power_status'] = power_match.group(1).strip()
-    
-    # Verificar si se encontró al menos alguna información
-    if chassis_info['name'] or chassis_info['type'] or chassis_info['serial_number'] or chassis_info['temperature']:
-        return chassis_info
-    
-    # Si no se encontró información, intentar con patrones más generales
-    chassis_section = re.search(r'show\s+chassis\s+={3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-    if chassis_section:
-        chassis_text = chassis_section.group(1)
-        
-        # Buscar líneas con información relevante
-        lines = chassis_text.split('\n')
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().lower()
-                value = value.strip()
-                
-                if 'name' in key and not chassis_info['name']:
-                    chassis_info['name'] = value
-                elif 'type' in key and not chassis_info['type']:
-                    chassis_info['type'] = value
-                elif 'serial' in key and not chassis_info['serial_number']:
-                    chassis_info['serial_number'] = value
-                elif 'temp' in key and not chassis_info['temperature']:
-                    # Extraer solo el número de temperatura
-                    temp_match = re.search(r'([0-9.]+)', value)
-                    if temp_match:
-                        chassis_info['temperature'] = temp_match.group(1)
-                elif 'fan' in key and not chassis_info['fan_status']:
-                    chassis_info['fan_status'] = value
-                elif 'power' in key and not chassis_info['power_status']:
-                    chassis_info['power_status'] = value
-    
-    # Verificar si se encontró al menos alguna información
-    if chassis_info['name'] or chassis_info['type'] or chassis_info['serial_number'] or chassis_info['temperature']:
-        return chassis_info
-    
-    # Si no se encontró información, buscar en todo el bloque
-    if not chassis_info['type']:
-        # Intentar extraer tipo de equipo del nombre del target o del contenido
-        model_match = re.search(r'(?:^|\s)(\d{4}(?:\s*[A-Za-z]+(?:-[A-Za-z0-9]+)?))', bloque)
-        if model_match:
-            chassis_info['type'] = model_match.group(1).strip()
-    
-    # Verificar si se encontró al menos alguna información
-    if chassis_info['name'] or chassis_info['type'] or chassis_info['serial_number'] or chassis_info['temperature']:
-        return chassis_info
-    
-    return None
+    return info_chassis_desde_campos(leer_campos_chassis(bloque))
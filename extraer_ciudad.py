@@ -1,9 +1,13 @@
 """
 Módulo para extraer y normalizar nombres de ciudades a partir de nombres de equipos.
 Soporta múltiples formatos y casos especiales de nomenclatura.
+La dimensión de ciudades (código, nombre, departamento, latitud y longitud) se construye una vez
+a partir de EQUIVALENCIAS_CIUDADES y CIUDADES; el resumen guarda solo el código y el nombre de cada
+equipo como columnas categóricas y las vistas obtienen el resto uniéndose a la dimensión.
 """
 
 import re
+import pandas as pd
 
 # Diccionario de equivalencias de códigos de ciudades
 EQUIVALENCIAS_CIUDADES = {
@@ -69,6 +73,76 @@ EQUIVALENCIAS_CIUDADES = {
     'SJG': 'San José del Guaviare',
 }
 
+# Ciudades: nombre -> (departamento, latitud, longitud); sin coordenadas si el nombre no es una ciudad
+CIUDADES = {
+    'Armenia': ('Quindío', 4.5339, -75.6811),
+    'Atlántico': ('Atlántico', None, None),
+    'Barranquilla': ('Atlántico', 10.9639, -74.7964),
+    'Bogotá': ('Bogotá D.C.', 4.7110, -74.0721),
+    'Bucaramanga': ('Santander', 7.1254, -73.1198),
+    'Buenaventura': ('Valle del Cauca', 3.8801, -77.0312),
+    'Cali': ('Valle del Cauca', 3.4516, -76.5320),
+    'Cartagena': ('Bolívar', 10.3932, -75.4832),
+    'Colombia': (None, None, None),
+    'Cúcuta': ('Norte de Santander', 7.8939, -72.5078),
+    'Florencia': ('Caquetá', 1.6144, -75.6062),
+    'Ibagué': ('Tolima', 4.4389, -75.2322),
+    'Inírida': ('Guainía', 3.8653, -67.9239),
+    'Leticia': ('Amazonas', -4.2153, -69.9406),
+    'Manizales': ('Caldas', 5.0703, -75.5138),
+    'Medellín': ('Antioquia', 6.2442, -75.5812),
+    'Mitú': ('Vaupés', 1.2536, -70.2346),
+    'Mocoa': ('Putumayo', 1.1522, -76.6466),
+    'Montería': ('Córdoba', 8.7575, -75.8878),
+    'Nariño': ('Nariño', None, None),
+    'Neiva': ('Huila', 2.9273, -75.2819),
+    'Palmira': ('Valle del Cauca', 3.5394, -76.3036),
+    'Panamá': (None, None, None),
+    'Pasto': ('Nariño', 1.2136, -77.2811),
+    'Pereira': ('Risaralda', 4.8133, -75.6961),
+    'Popayán': ('Cauca', 2.4448, -76.6147),
+    'Puerto Carreño': ('Vichada', 6.1890, -67.4859),
+    'Quibdó': ('Chocó', 5.6947, -76.6611),
+    'Riohacha': ('La Guajira', 11.5444, -72.9072),
+    'San José del Guaviare': ('Guaviare', 2.5729, -72.6459),
+    'Santa Marta': ('Magdalena', 11.2404, -74.1990),
+    'Sincelejo': ('Sucre', 9.3047, -75.3977),
+    'Tunja': ('Boyacá', 5.5353, -73.3678),
+    'Valledupar': ('Cesar', 10.4631, -73.2532),
+    'Villavicencio': ('Meta', 4.1420, -73.6266),
+    'Yopal': ('Casanare', 5.3378, -72.3959),
+}
+
+# Caso especial: equipos WOM sin ciudad en el nombre (en el mapa se ubican en Bogotá como referencia)
+CODIGO_SIN_CIUDAD = 'WOM'
+NOMBRE_SIN_CIUDAD = "Error en hostname, verificar"
+
+# Código de ciudad en el nombre del equipo, en el orden de extraer_ciudad_desde_nombre_equipo:
+# WOM_XXX_..., WOM o WOM_..., XXX_... y XXXNNNN (el nombre ya está en mayúsculas y sin espacios)
+PATRON_CODIGO_CIUDAD = r'^WOM_([^_]{3})(?:_|$)|^(WOM)(?:_|$)|^([^_]{3})_|^([A-Z]{3})\d'
+
+def _construir_dimension_ciudades():
+    """
+    Construye la dimensión de ciudades con un registro por código.
+    
+    Returns:
+        DataFrame: Columnas 'nombre', 'departamento', 'latitud' y 'longitud', indexado por 'codigo'
+    """
+    codigos = dict(EQUIVALENCIAS_CIUDADES)
+    codigos[CODIGO_SIN_CIUDAD] = NOMBRE_SIN_CIUDAD
+    ciudades = dict(CIUDADES)
+    ciudades[NOMBRE_SIN_CIUDAD] = (None,) + CIUDADES['Bogotá'][1:]
+    
+    dimension = pd.DataFrame(
+        [(codigo, nombre) + ciudades[nombre] for codigo, nombre in codigos.items()],
+        columns=['codigo', 'nombre', 'departamento', 'latitud', 'longitud']
+    )
+    dimension[['latitud', 'longitud']] = dimension[['latitud', 'longitud']].astype(float)
+    return dimension.set_index('codigo')
+
+# Dimensión de ciudades: una fila por código, a la que se unen el resumen y las vistas
+DIMENSION_CIUDADES = _construir_dimension_ciudades()
+
 def extraer_ciudad_desde_nombre_equipo(nombre_equipo):
     """
     Extrae el código de ciudad desde el nombre del equipo, soportando múltiples formatos:
@@ -78,7 +152,7 @@ def extraer_ciudad_desde_nombre_equipo(nombre_equipo):
     
     Args:
         nombre_equipo (str): Nombre del equipo
-        
+    
     Returns:
         str: Código de ciudad extraído o None si no se puede extraer
     """
@@ -120,7 +194,7 @@ def normalizar_ciudad(codigo_ciudad):
     
     Args:
         codigo_ciudad (str): Código de ciudad (3 letras)
-        
+    
     Returns:
         str: Nombre completo de la ciudad o mensaje de error para casos especiales
     """
@@ -130,8 +204,80 @@ def normalizar_ciudad(codigo_ciudad):
     codigo_ciudad = codigo_ciudad.strip().upper()
     
     # Caso especial: WOM sin ciudad
-    if codigo_ciudad == 'WOM':
-        return "Error en hostname, verificar"
+    if codigo_ciudad == CODIGO_SIN_CIUDAD:
+        return NOMBRE_SIN_CIUDAD
     
     # Buscar en el diccionario de equivalencias
     return EQUIVALENCIAS_CIUDADES.get(codigo_ciudad, codigo_ciudad)
+
+def resolver_ciudades(targets):
+    """
+    Obtiene el código y el nombre de la ciudad de todos los equipos a la vez, con las mismas reglas
+    que extraer_ciudad_desde_nombre_equipo y normalizar_ciudad.
+    
+    Args:
+        targets (Series): Nombres de los equipos
+    
+    Returns:
+        DataFrame: Columnas categóricas 'ciudad' (código) y 'ciudad_normalizada' (nombre), con el índice de targets
+    """
+    targets = pd.Series(targets)
+    nombres = targets.astype(object).str.strip().str.upper()
+    grupos = nombres.str.extract(PATRON_CODIGO_CIUDAD)
+    codigos = grupos[0].fillna(grupos[1]).fillna(grupos[2]).fillna(grupos[3])
+    
+    # Los códigos sin ciudad en la dimensión se muestran tal cual
+    limpios = codigos.str.strip()
+    normalizados = limpios.map(DIMENSION_CIUDADES['nombre']).fillna(limpios)
+    
+    return pd.DataFrame({
+        'ciudad': codigos.astype('category'),
+        'ciudad_normalizada': normalizados.astype('category')
+    }, index=targets.index)
+
+def codigos_ciudad(df):
+    """
+    Obtiene los códigos de ciudad de un DataFrame con la columna 'ciudad' (resumen) o,
+    si no la tiene, los resuelve desde 'target'.
+    
+    Returns:
+        Series: Código de ciudad de cada fila (None si no se pudo extraer)
+    """
+    if 'ciudad' in df.columns:
+        return df['ciudad']
+    return resolver_ciudades(df['target'])['ciudad']
+
+def unir_dimension_ciudades(df, columnas=None):
+    """
+    Agrega a un DataFrame las columnas de la dimensión de ciudades según su código de ciudad.
+    
+    Args:
+        df (DataFrame): Resumen u otra tabla con 'ciudad' o 'target'
+        columnas (list, optional): Columnas de DIMENSION_CIUDADES a agregar; por defecto todas
+    
+    Returns:
+        DataFrame: Copia de df con las columnas agregadas (nulas para los códigos sin ciudad en la dimensión)
+    """
+    codigos = codigos_ciudad(df).astype(object)
+    df = df.copy()
+    for columna in columnas or DIMENSION_CIUDADES.columns:
+        df[columna] = codigos.map(DIMENSION_CIUDADES[columna])
+    return df
+
+def codigos_por_nombre():
+    """
+    Agrupa los códigos de la dimensión por nombre de ciudad, en minúsculas y con y sin tildes,
+    para buscar ciudades en texto libre.
+    
+    Returns:
+        dict: nombre en minúsculas -> lista de códigos
+    """
+    sin_tildes = str.maketrans('áéíóú', 'aeiou')
+    codigos = {}
+    for codigo, nombre in DIMENSION_CIUDADES['nombre'].items():
+        if codigo == CODIGO_SIN_CIUDAD:
+            continue
+        nombre = nombre.lower()
+        for variante in dict.fromkeys([nombre, nombre.translate(sin_tildes)]):
+            codigos.setdefault(variante, []).append(codigo)
+    return codigos
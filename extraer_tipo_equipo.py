@@ -1,31 +1,94 @@
 """
 Módulo para extraer el tipo de equipo Nokia desde el comando 'show chassis'.
+También clasifica el modelo de todos los equipos a la vez (ver clasificar_tipos_equipo): una sola
+pasada de Series.str.extract sobre el tipo de chassis o de versión y el nombre del target, y un
+diccionario de familias a nombres canónicos.
 """
 
 import re
 
+import pandas as pd
+
+from parser.extraer_chassis import leer_campos_chassis
+from parser.indice_secciones import indexar_secciones, texto_seccion, COMANDO_CHASSIS
+
+# Tipo de equipo válido en el campo Type de 'show chassis': '7' seguido de tres dígitos y el modelo
+PATRON_TIPO_CHASSIS = re.compile(r'(7\d{3}\s+\S+(?:\s+\S+)*)')
+
+# Tipo de equipo sin clasificar
+NO_CLASIFICADO = 'No clasificado'
+
+# Nombre canónico de cada familia de modelos Nokia
+MODELOS_NOKIA = {
+    '7210': '7210 SAS',
+    '7220': '7220 VPLS',
+    '7250': '7250 IXR',
+    '7302': '7302 ISAM',
+    '7330': '7330 ISAM',
+    '7360': '7360 ISAM',
+    '7368': '7368 ISAM',
+    '7450': '7450 ESS',
+    '7510': '7510 SAR',
+    '7520': '7520 SAR',
+    '7705': '7705 SAR',
+    '7710': '7710 SR',
+    '7740': '7740 SR',
+    '7750': '7750 SR',
+    '7950': '7950 XRS'
+}
+
+# Patrones de la familia del modelo en el nombre del target, en orden de prioridad
+PATRONES_TARGET = [
+    # Modelo entre caracteres que no son dígitos (ej: SR12-7750)
+    r'(?:^|[^0-9])(7\d{3})(?:[^0-9]|$)',
+    # Modelo con guión (ej: 7210-SAS)
+    r'(7\d{3})-([A-Za-z]+)',
+    # Modelo con guión bajo (ej: 7210_SAS)
+    r'(7\d{3})_([A-Za-z]+)',
+]
+
+# Patrón combinado sobre 'tipo\ntarget': la familia del tipo si es válido (comienza con '7' y tres dígitos)
+# o, si no, la del target con cada patrón de PATRONES_TARGET en orden (grupos 1 a 4)
+PATRON_FAMILIA = (
+    r'^(7\d{3})'
+    r'|\n(?=.*?(?<!\d)(7\d{3})(?!\d))'
+    r'|\n(?=.*?(7\d{3})-[A-Za-z])'
+    r'|\n(?=.*?(7\d{3})_[A-Za-z])'
+)
+
 def extraer_tipo_equipo_desde_chassis(bloque):
     """
     Extrae el tipo de equipo Nokia desde el bloque de texto del comando 'show chassis'.
     Solo considera válidos los tipos que comienzan con '7' seguido de tres dígitos.
     
     Args:
-        bloque (str): Bloque de texto del equipo
-        
+        bloque (str): Bloque de texto del equipo o texto de su sección 'show chassis'
+    
     Returns:
         str: Tipo de equipo Nokia o None si no se encuentra
     """
-    # Buscar el bloque de información del chassis
-    chassis_match = re.search(r'show\s+chassis\s+={3,}[\s\S]+?Type\s*:\s*([^\n]+)', bloque)
+    # Leer solo la sección 'show chassis'
+    seccion = texto_seccion(bloque, indexar_secciones(bloque), COMANDO_CHASSIS)
     
-    if not chassis_match:
-        return None
+    return tipo_equipo_desde_campos(leer_campos_chassis(seccion))
+
+def tipo_equipo_desde_campos(campos):
+    """
+    Obtiene el tipo de equipo Nokia del campo Type de 'show chassis' ya leído.
+    Solo considera válidos los tipos que comienzan con '7' seguido de tres dígitos.
     
-    # Extraer el tipo de equipo del campo Type
-    tipo_equipo_completo = chassis_match.group(1).strip()
+    Args:
+        campos (dict): Campos de 'show chassis' (ver extraer_chassis.leer_campos_chassis)
+    
+    Returns:
+        str: Tipo de equipo Nokia o None si no se encuentra
+    """
+    tipo_equipo_completo = campos.get('type')
+    if not tipo_equipo_completo:
+        return None
     
     # Verificar que el tipo comience con '7' seguido de tres dígitos (7210, 7750, etc.)
-    tipo_match = re.match(r'(7\d{3}\s+\S+(?:\s+\S+)*)', tipo_equipo_completo)
+    tipo_match = PATRON_TIPO_CHASSIS.match(tipo_equipo_completo)
     
     if tipo_match:
         return tipo_match.group(1).strip()
@@ -40,66 +103,19 @@ def extraer_tipo_equipo(target):
     
     Args:
         target (str): Nombre del equipo
-        
+    
     Returns:
         str: Tipo de equipo Nokia o 'No clasificado' si no se puede determinar
     """
-    # Patrones para extraer tipo de equipo desde el nombre del target
-    patrones = [
-        # Patrón para nombres que contienen el modelo directamente (ej: SR12-7750)
-        r'(?:^|[^0-9])(7\d{3})(?:[^0-9]|$)',
-        # Patrón para nombres que contienen el modelo con guiones (ej: 7210-SAS)
-        r'(7\d{3})-([A-Za-z]+)',
-        # Patrón para nombres que contienen el modelo con guión bajo (ej: 7210_SAS)
-        r'(7\d{3})_([A-Za-z]+)',
-    ]
-    
-    # Buscar tipo de equipo usando los patrones
-    for patron in patrones:
+    # Buscar la familia del modelo usando los patrones y devolver su nombre canónico
+    for patron in PATRONES_TARGET:
         match = re.search(patron, target)
         if match:
             modelo = match.group(1)
-            
-            # Mapeo de modelos a tipos completos
-            if modelo == '7210':
-                return '7210 SAS'
-            elif modelo == '7750':
-                return '7750 SR'
-            elif modelo == '7450':
-                return '7450 ESS'
-            elif modelo == '7705':
-                return '7705 SAR'
-            elif modelo == '7950':
-                return '7950 XRS'
-            elif modelo == '7250':
-                return '7250 IXR'
-            elif modelo == '7710':
-                return '7710 SR'
-            elif modelo == '7950':
-                return '7950 XRS'
-            elif modelo == '7740':
-                return '7740 SR'
-            elif modelo == '7360':
-                return '7360 ISAM'
-            elif modelo == '7368':
-                return '7368 ISAM'
-            elif modelo == '7302':
-                return '7302 ISAM'
-            elif modelo == '7330':
-                return '7330 ISAM'
-            elif modelo == '7220':
-                return '7220 VPLS'
-            elif modelo == '7510':
-                return '7510 SAR'
-            elif modelo == '7520':
-                return '7520 SAR'
-            elif modelo == '7750':
-                return '7750 SR'
-            else:
-                return f'{modelo}'
+            return MODELOS_NOKIA.get(modelo, modelo)
     
     # Si no se encuentra un patrón válido, devolver 'No clasificado'
-    return 'No clasificado'
+    return NO_CLASIFICADO
 
 def validar_tipo_equipo(tipo_equipo):
     """
@@ -107,7 +123,7 @@ def validar_tipo_equipo(tipo_equipo):
     
     Args:
         tipo_equipo (str): Tipo de equipo a validar
-        
+    
     Returns:
         bool: True si es un tipo válido, False en caso contrario
     """
@@ -116,3 +132,39 @@ def validar_tipo_equipo(tipo_equipo):
     
     # Verificar que el tipo comience con '7' seguido de tres dígitos
     return bool(re.match(r'7\d{3}', tipo_equipo))
+
+def clasificar_tipos_equipo(targets, tipos_chassis=None, tipos_version=None):
+    """
+    Clasifica el tipo y el modelo de todos los equipos a la vez.
+    El tipo es el de 'show chassis' o, si no existe, el de la versión si es válido (ver validar_tipo_equipo);
+    si ninguno existe, el nombre canónico del modelo extraído del target (ver extraer_tipo_equipo).
+    El modelo es el nombre canónico de la familia (7210 SAS, 7750 SR, ...) del tipo o del target.
+    
+    Args:
+        targets (Series): Nombres de los equipos
+        tipos_chassis (Series, optional): Tipo de 'show chassis' de cada equipo (nulo si no existe)
+        tipos_version (Series, optional): Tipo extraído de la versión de cada equipo (nulo si no existe)
+    
+    Returns:
+        tuple: (tipo_equipo, modelo) como Series con el índice de targets; el modelo es categórico
+    """
+    nulos = pd.Series(None, index=targets.index, dtype=object)
+    tipos_chassis = nulos if tipos_chassis is None else tipos_chassis.astype(object)
+    tipos_version = nulos if tipos_version is None else tipos_version.astype(object)
+    
+    # Tipo detallado: el de chassis tiene prioridad sobre el de versión, que solo se usa si es válido
+    version_valida = tipos_version.str.match(r'7\d{3}', na=False).astype(bool)
+    detalle = tipos_chassis.where(tipos_chassis.notna() & (tipos_chassis != ''), tipos_version.where(version_valida))
+    
+    # Una sola búsqueda sobre 'tipo\ntarget'; la primera columna con valor es la familia
+    texto = detalle.fillna('').astype(str) + '\n' + targets.fillna('').astype(str)
+    grupos = texto.str.extract(PATRON_FAMILIA)
+    familias = grupos[0]
+    for grupo in grupos.columns[1:]:
+        familias = familias.fillna(grupos[grupo])
+    
+    canonicos = familias.map(MODELOS_NOKIA).fillna(familias)
+    tipo_equipo = detalle.fillna(canonicos).fillna(NO_CLASIFICADO).infer_objects()
+    modelo = canonicos.fillna(NO_CLASIFICADO).astype('category')
+    
+    return tipo_equipo, modelo
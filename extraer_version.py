@@ -4,142 +4,96 @@ Módulo para extraer información de versión TiMOS de los equipos Nokia.
 
 import re
 
+# Formato de versión TiMOS (ej: 8.0.R4, 20.10.R12)
+VERSION = r'(\d+\.\d+\.[A-Z]\d+)'
+
+# Patrones para buscar la versión TiMOS, en orden de prioridad.
+# Se omiten las variantes que nunca pueden ganar a un patrón anterior: las de prefijo
+# 'TiMOS-<letra>-' (las cubre el primer patrón), 'System/Software Version' y
+# '<TiMOS|SROS|SR> ... version' (las cubre '[Vv]ersion') y '<...> Release' (las cubre '[Rr]elease').
+PATRONES_VERSION = [
+    # Patrón estándar para "show version"
+    r'TiMOS-[A-Z]-' + VERSION,
+    # Patrón alternativo que puede aparecer en algunos equipos
+    r'TiMOS-' + VERSION,
+    # Patrón para versiones con formato diferente
+    r'TiMOS.*?' + VERSION,
+    # Patrón para versiones en formato simple
+    r'[Vv]ersion\s*:?\s*' + VERSION,
+    # Patrón para versiones en formato de línea de build
+    r'[Bb]uild\s*:?\s*' + VERSION,
+    # Patrón para versiones en formato de línea de release
+    r'[Rr]elease\s*:?\s*' + VERSION,
+    # Patrones para versiones con prefijo SROS, SR OS, SR o TiMOS sin guión
+    r'[Vv]ersion\s*:?\s*SROS-' + VERSION,
+    r'[Vv]ersion\s*:?\s*SR\s+OS-' + VERSION,
+    r'[Vv]ersion\s*:?\s*SR-' + VERSION,
+    r'[Vv]ersion\s*:?\s*TiMOS\s+' + VERSION,
+    r'[Vv]ersion\s*:?\s*SROS\s+' + VERSION,
+    r'[Vv]ersion\s*:?\s*SR\s+OS\s+' + VERSION,
+    r'[Vv]ersion\s*:?\s*SR\s+' + VERSION,
+]
+
+# Patrones compilados individualmente y combinados en una sola alternancia con un grupo por patrón
+PATRONES_VERSION_COMPILADOS = [re.compile(patron) for patron in PATRONES_VERSION]
+PATRON_VERSION_COMBINADO = re.compile('|'.join(f'(?:{patron})' for patron in PATRONES_VERSION))
+
+# Patrón general para cualquier secuencia de dígitos y puntos que parezca una versión.
+# Solo se aplica dentro de la sección 'show version', nunca sobre el bloque completo.
+PATRON_VERSION_GENERICA = re.compile(r'(\d+\.\d+(?:\.\d+)?(?:\.[A-Z]\d+)?)')
+
+# Eco del comando 'show version' y de cualquier comando siguiente, al inicio de una línea
+INICIO_SECCION_VERSION = '\nshow version'
+INICIO_COMANDO = '\nshow '
+
+def extraer_seccion_version(bloque):
+    """
+    Extrae el texto de la sección 'show version' del bloque, hasta el siguiente comando 'show'.
+    
+    Args:
+        bloque (str): Bloque de texto del equipo
+        
+    Returns:
+        str: Texto de la sección o None si el bloque no contiene 'show version'
+    """
+    inicio = bloque.find(INICIO_SECCION_VERSION)
+    if inicio == -1:
+        return None
+    
+    inicio += len(INICIO_SECCION_VERSION)
+    fin = bloque.find(INICIO_COMANDO, inicio)
+    
+    return bloque[inicio:fin if fin != -1 else len(bloque)]
+
 def extraer_version_timos(bloque):
     """
     Extrae la versión TiMOS completa y la versión principal del bloque de texto.
     Compatible con múltiples formatos de NSP.
+    Solo se recorre la sección 'show version' (o el bloque completo si no la tiene),
+    con una única búsqueda que combina todos los patrones.
     
     Args:
         bloque (str): Bloque de texto del equipo
-        
+    
     Returns:
         tuple: (timos_version_completa, main_version)
     """
-    # Patrones para buscar versión TiMOS en diferentes formatos
-    patrones = [
-        # Patrón estándar para "show version"
-        r'TiMOS-[A-Z]-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón alternativo que puede aparecer en algunos equipos
-        r'TiMOS-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones con formato diferente
-        r'TiMOS.*?(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato simple
-        r'[Vv]ersion\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de sistema
-        r'System\s+[Vv]ersion\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de software
-        r'Software\s+[Vv]ersion\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de TiMOS
-        r'TiMOS.*?version\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SROS
-        r'SROS.*?version\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SR OS
-        r'SR\s+OS.*?version\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SR
-        r'SR.*?version\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión
-        r'[Vv]ersion\s*:?\s*TiMOS-[A-Z]-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión sin prefijo
-        r'[Vv]ersion\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de build
-        r'[Bb]uild\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de release
-        r'[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de software release
-        r'[Ss]oftware\s+[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de TiMOS release
-        r'TiMOS\s+[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SROS release
-        r'SROS\s+[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SR OS release
-        r'SR\s+OS\s+[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de SR release
-        r'SR\s+[Rr]elease\s*:?\s*(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo
-        r'[Vv]ersion\s*:?\s*TiMOS-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SROS
-        r'[Vv]ersion\s*:?\s*SROS-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SR OS
-        r'[Vv]ersion\s*:?\s*SR\s+OS-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SR
-        r'[Vv]ersion\s*:?\s*SR-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS
-        r'[Vv]ersion\s*:?\s*TiMOS\s+(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SROS
-        r'[Vv]ersion\s*:?\s*SROS\s+(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SR OS
-        r'[Vv]ersion\s*:?\s*SR\s+OS\s+(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo SR
-        r'[Vv]ersion\s*:?\s*SR\s+(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-C
-        r'[Vv]ersion\s*:?\s*TiMOS-C-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-B
-        r'[Vv]ersion\s*:?\s*TiMOS-B-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-A
-        r'[Vv]ersion\s*:?\s*TiMOS-A-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-D
-        r'[Vv]ersion\s*:?\s*TiMOS-D-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-L
-        r'[Vv]ersion\s*:?\s*TiMOS-L-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-M
-        r'[Vv]ersion\s*:?\s*TiMOS-M-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-X
-        r'[Vv]ersion\s*:?\s*TiMOS-X-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-U
-        r'[Vv]ersion\s*:?\s*TiMOS-U-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-S
-        r'[Vv]ersion\s*:?\s*TiMOS-S-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-R
-        r'[Vv]ersion\s*:?\s*TiMOS-R-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-T
-        r'[Vv]ersion\s*:?\s*TiMOS-T-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-I
-        r'[Vv]ersion\s*:?\s*TiMOS-I-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-E
-        r'[Vv]ersion\s*:?\s*TiMOS-E-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-F
-        r'[Vv]ersion\s*:?\s*TiMOS-F-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-G
-        r'[Vv]ersion\s*:?\s*TiMOS-G-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-H
-        r'[Vv]ersion\s*:?\s*TiMOS-H-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-J
-        r'[Vv]ersion\s*:?\s*TiMOS-J-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-K
-        r'[Vv]ersion\s*:?\s*TiMOS-K-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-N
-        r'[Vv]ersion\s*:?\s*TiMOS-N-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-O
-        r'[Vv]ersion\s*:?\s*TiMOS-O-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-P
-        r'[Vv]ersion\s*:?\s*TiMOS-P-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-Q
-        r'[Vv]ersion\s*:?\s*TiMOS-Q-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-V
-        r'[Vv]ersion\s*:?\s*TiMOS-V-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-W
-        r'[Vv]ersion\s*:?\s*TiMOS-W-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-Y
-        r'[Vv]ersion\s*:?\s*TiMOS-Y-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón para versiones en formato de línea de versión con prefijo TiMOS-Z
-        r'[Vv]ersion\s*:?\s*TiMOS-Z-(\d+\.\d+\.[A-Z]\d+)',
-        # Patrón más general para capturar cualquier secuencia de dígitos y puntos que parezca una versión
-        r'(\d+\.\d+(?:\.\d+)?(?:\.[A-Z]\d+)?)'
-    ]
+    seccion = extraer_seccion_version(bloque)
+    texto = seccion if seccion is not None else bloque
     
-    # Buscar versión TiMOS usando los patrones
-    timos_version_completa = None
-    for patron in patrones:
-        match = re.search(patron, bloque)
-        if match:
-            timos_version_completa = match.group(1)
-            break
+    timos_version_completa = buscar_version_timos(texto)
+    
+    # El patrón general solo es fiable dentro de la sección 'show version'
+    if not timos_version_completa and seccion is not None:
+        generica_match = PATRON_VERSION_GENERICA.search(seccion)
+        if generica_match:
+            timos_version_completa = generica_match.group(1)
     
     # Si no se encontró versión, devolver None
     if not timos_version_completa:
         return None, None
     
-    # Extraer versión principal (major.minor) si timos_version_completa fue encontrada
+    # Extraer versión principal (major.minor)
     main_version = None
     main_match = re.match(r'(\d+\.\d+)', timos_version_completa)
     if main_match:
@@ -147,28 +101,62 @@ def extraer_version_timos(bloque):
     
     return timos_version_completa, main_version
 
+def buscar_version_timos(texto):
+    """
+    Busca la versión TiMOS con los patrones en orden de prioridad, recorriendo el texto una sola vez.
+    El resultado es el mismo que probar cada patrón con re.search en orden: gana el primer
+    patrón de la lista que tenga alguna coincidencia y, dentro de él, la primera coincidencia.
+    
+    Args:
+        texto (str): Texto donde buscar
+    
+    Returns:
+        str: Versión encontrada o None
+    """
+    mejor_prioridad = None
+    
+    for match in PATRON_VERSION_COMBINADO.finditer(texto):
+        # El grupo con valor indica qué patrón coincidió (un grupo por patrón)
+        prioridad = match.lastindex - 1
+        if mejor_prioridad is None or prioridad < mejor_prioridad:
+            mejor_prioridad = prioridad
+            if prioridad == 0:
+                break
+    
+    if mejor_prioridad is None:
+        return None
+    
+    # Una coincidencia de menor prioridad puede solapar a otra anterior en el texto, por lo que
+    # se confirman individualmente solo los patrones hasta el de mayor prioridad encontrado
+    for patron in PATRONES_VERSION_COMPILADOS[:mejor_prioridad + 1]:
+        match = patron.search(texto)
+        if match:
+            return match.group(1)
+    
+    return None
+
 def extraer_tipo_equipo_desde_version(bloque):
     """
     Extrae el tipo de equipo desde el bloque de versión.
     
     Args:
         bloque (str): Bloque de texto del equipo
-        
+    
     Returns:
         str: Tipo de equipo o None si no se puede determinar
     """
     # Patrones para buscar tipo de equipo en diferentes formatos
     patrones = [
         # Patrón para "for 7750 SR"
-        r'for\s+(\d{4}\s+\w+(?:-\w+)?))',
+        r'for\s+(\d{4}\s+\w+(?:-\w+)?)',
         # Patrón para "Nokia 7750 SR"
-        r'Nokia\s+(\d{4}\s+\w+(?:-\w+)?))',
+        r'Nokia\s+(\d{4}\s+\w+(?:-\w+)?)',
         # Patrón para "7750 SR"
-        r'(\d{4}\s+\w+(?:-\w+)?))',
+        r'(\d{4}\s+\w+(?:-\w+)?)',
         # Patrón para "7750-SR"
-        r'(\d{4}-\w+(?:-\w+)?))',
+        r'(\d{4}-\w+(?:-\w+)?)',
         # Patrón para "7750SR"
-        r'(\d{4}\w+(?:-\w+)?))',
+        r'(\d{4}\w+(?:-\w+)?)',
     ]
     
     # Buscar tipo de equipo usando los patrones
@@ -183,5 +171,3 @@ def extraer_tipo_equipo_desde_version(bloque):
         return modelo_match.group(1)
     
     return None
-
-
@@ -13,7 +13,7 @@ def aplicar_filtros_avanzados(df_resumen, df_servicios, df_puertos, df_chassis,
         df_puertos: DataFrame con información de puertos
         df_chassis: DataFrame con información de chassis
         df_versiones: DataFrame con información de versiones
-        df_mda: DataFrame con información de MDA
+        df_mda: DataFrame con información de MDA, o tabla diferida (ver dataset_diferido.obtener_tabla)
     """
     st.header("Filtros Avanzados")
     
@@ -39,33 +39,15 @@ def aplicar_filtros_avanzados(df_resumen, df_servicios, df_puertos, df_chassis,
     with col1:
         st.subheader("Filtros de Ubicación y Hardware")
         
-        # Mapeo de ciudades
-        mapeo_ciudades = {
-            'BAQ': 'Barranquilla',
-            'BGA': 'Bogotá',
-            'BOG': 'Bogotá',
-            'CAL': 'Cali',
-            'CLO': 'Cali',
-            'CTG': 'Cartagena',
-            'CUC': 'Cúcuta',
-            'IBE': 'Ibagué',
-            'MON': 'Montería',
-            'PPN': 'Popayán',
-            'SBL': 'Sincelejo',
-            'SIN': 'Sincelejo',
-            'BUC': 'Bucaramanga'
-        }
+        # Ciudades de los equipos con nombre en la dimensión de ciudades
+        from parser.extraer_ciudad import DIMENSION_CIUDADES, codigos_ciudad
         
-        # Extraer prefijos de ciudad de los equipos
-        prefijos_ciudad = []
-        for equipo in df_resumen['target']:
-            prefijo = equipo.split('_')[0]
-            if prefijo in mapeo_ciudades:
-                prefijos_ciudad.append(prefijo)
+        nombres_ciudades = DIMENSION_CIUDADES['nombre']
+        codigos_equipos = codigos_ciudad(df_resumen).dropna().astype(object)
         
         # Obtener ciudades únicas y ordenadas
-        ciudades_unicas = sorted(list(set(prefijos_ciudad)))
-        ciudades_nombres = [f"{c} ({mapeo_ciudades[c]})" for c in ciudades_unicas]
+        ciudades_unicas = sorted(set(codigos_equipos[codigos_equipos.isin(nombres_ciudades.index)]))
+        ciudades_nombres = [f"{c} ({nombres_ciudades[c]})" for c in ciudades_unicas]
         
         # Filtro de ciudad
         st.session_state.filtro_ciudad = st.multiselect(
@@ -202,8 +184,8 @@ def aplicar_filtros_avanzados(df_resumen, df_servicios, df_puertos, df_chassis,
         # Filtrar por ciudad
         if st.session_state.filtro_ciudad:
             # Extraer solo los códigos de ciudad del filtro (BAQ, BOG, etc.)
-            codigos_ciudad = [c.split(' ')[0] for c in st.session_state.filtro_ciudad]
-            mask_ciudad = df_filtrado['target'].apply(lambda x: x.split('_')[0] in codigos_ciudad)
+            codigos_ciudad_filtro = [c.split(' ')[0] for c in st.session_state.filtro_ciudad]
+            mask_ciudad = codigos_ciudad(df_filtrado).isin(codigos_ciudad_filtro)
             df_filtrado = df_filtrado[mask_ciudad]
         
         # Filtrar por tipo de equipo
@@ -262,15 +244,12 @@ def aplicar_filtros_avanzados(df_resumen, df_servicios, df_puertos, df_chassis,
             with col_viz1:
                 # Gráfico de distribución por ciudad
                 if 'target' in df_filtrado.columns:
-                    # Extraer prefijos de ciudad
-                    df_filtrado['ciudad'] = df_filtrado['target'].apply(lambda x: x.split('_')[0])
-                    
-                    # Contar equipos por ciudad
-                    ciudad_counts = df_filtrado['ciudad'].value_counts().reset_index()
+                    # Contar equipos por código de ciudad
+                    ciudad_counts = codigos_ciudad(df_filtrado).astype(object).value_counts().reset_index()
                     ciudad_counts.columns = ['Ciudad', 'Cantidad']
                     
                     # Mapear códigos a nombres completos
-                    ciudad_counts['Nombre'] = ciudad_counts['Ciudad'].map(mapeo_ciudades)
+                    ciudad_counts['Nombre'] = ciudad_counts['Ciudad'].map(nombres_ciudades)
                     ciudad_counts['Ciudad_Nombre'] = ciudad_counts['Ciudad'] + ' (' + ciudad_counts['Nombre'] + ')'
                     
                     # Crear gráfico
@@ -0,0 +1,224 @@
+"""
+Módulo para dividir los bloques de equipos muy grandes (routers PE/core con decenas de miles
+de servicios o miles de puertos) en fragmentos que se procesan en paralelo.
+Las secciones que superan el umbral de líneas se cortan por rangos de filas; cada fragmento
+repite el encabezado de su tabla para que los extractores lo lean igual que la sección completa.
+Los fragmentos se envían en orden, por lo que al fusionarlos las filas quedan en el orden original.
+"""
+
+import os
+from itertools import accumulate
+from math import ceil
+
+from parser.deduplicar_bloques import hash_cuerpo_bloque
+from parser.indice_secciones import indexar_secciones, COMANDO_SERVICIOS, COMANDO_PUERTOS, COMANDO_DESCRIPCIONES
+from parser.tabla_ancho_fijo import PATRON_LINEA_GUIONES, PATRON_LINEA_IGUALES
+from parser.referencias_origen import nuevo_localizador, quitar_origen, anclas_tramos, linea_origen
+
+# Número de líneas de una sección a partir del cual se fragmenta y variable de entorno para cambiarlo (0 lo desactiva)
+UMBRAL_LINEAS_SECCION = 5000
+VARIABLE_UMBRAL_FRAGMENTO = 'NSP_UMBRAL_FRAGMENTO'
+
+# Secciones que pueden fragmentarse: tablas de una fila por servicio o puerto
+COMANDOS_FRAGMENTABLES = [COMANDO_SERVICIOS, COMANDO_PUERTOS, COMANDO_DESCRIPCIONES]
+
+# Línea que identifica un fragmento: '#Fragmento <hash del bloque original> <número>'
+MARCA_FRAGMENTO = '#Fragmento'
+
+# Delimitador que precede al encabezado repetido en cada fragmento
+LINEA_IGUALES = '=' * 79
+
+def resolver_umbral_fragmento(umbral=None):
+    """
+    Determina el umbral de líneas para fragmentar una sección. El parámetro tiene prioridad
+    sobre la variable de entorno.
+    
+    Args:
+        umbral (int, optional): Número de líneas (0 desactiva la fragmentación)
+    
+    Returns:
+        int: Número de líneas o None si no se fragmenta
+    """
+    if umbral is None:
+        valor = os.environ.get(VARIABLE_UMBRAL_FRAGMENTO)
+        if valor:
+            try:
+                umbral = int(valor)
+            except ValueError:
+                raise ValueError(f"Valor no válido para {VARIABLE_UMBRAL_FRAGMENTO}: {valor}")
+    
+    if umbral is None:
+        umbral = UMBRAL_LINEAS_SECCION
+    
+    return umbral if umbral > 0 else None
+
+def es_fragmento(bloque):
+    """
+    Indica si un bloque es un fragmento de un bloque mayor.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto
+    
+    Returns:
+        bool: True si la línea siguiente al target es la marca de fragmento
+    """
+    # Los fragmentos siempre son texto (ver fragmentar_bloques)
+    if isinstance(bloque, bytes):
+        return False
+    fin_target = bloque.find('\n')
+    return fin_target != -1 and bloque.startswith(MARCA_FRAGMENTO, fin_target + 1)
+
+def hash_bloque_origen(bloque):
+    """
+    Obtiene el hash del cuerpo del bloque original: el de la marca si es un fragmento
+    o el del propio bloque en otro caso (ver deduplicar_bloques.hash_cuerpo_bloque).
+    
+    Args:
+        bloque (str o bytes): Bloque de texto o fragmento
+    
+    Returns:
+        str: Hash en hexadecimal
+    """
+    if es_fragmento(bloque):
+        inicio_marca = bloque.find('\n') + 1
+        fin_marca = bloque.find('\n', inicio_marca)
+        return bloque[inicio_marca:fin_marca].split()[1]
+    return hash_cuerpo_bloque(bloque)
+
+def puntos_de_corte(lineas, umbral):
+    """
+    Elige las líneas donde se corta una sección. Solo se corta en el inicio de una fila de datos
+    (no en encabezados ni en líneas de continuación), de forma que ningún registro quede partido.
+    
+    Args:
+        lineas (list): Líneas de la sección (la primera es el eco del comando)
+        umbral (int): Número máximo aproximado de líneas por fragmento
+    
+    Returns:
+        list: (línea de corte, líneas del encabezado de la tabla en ese punto) para cada corte
+    """
+    tamano_fragmento = ceil(len(lineas) / ceil(len(lineas) / umbral))
+    cortes = []
+    ultimo_corte = 0
+    inicio_encabezado = 0
+    encabezado = None
+    en_filas = False
+    
+    # Mismo recorrido que tabla_ancho_fijo.leer_tablas, para que el encabezado repetido sea el que lee el extractor
+    for i, linea in enumerate(lineas):
+        linea = linea.rstrip()
+        
+        if en_filas:
+            if linea.strip() and not PATRON_LINEA_GUIONES.match(linea) and not PATRON_LINEA_IGUALES.match(linea):
+                if i - ultimo_corte >= tamano_fragmento and not linea[0].isspace():
+                    cortes.append((i, encabezado))
+                    ultimo_corte = i
+                continue
+            
+            # Fin de las filas: la línea se evalúa como posible inicio de otra tabla
+            en_filas = False
+            inicio_encabezado = i
+        
+        if PATRON_LINEA_IGUALES.match(linea):
+            inicio_encabezado = i + 1
+        elif PATRON_LINEA_GUIONES.match(linea) and i > inicio_encabezado:
+            encabezado = [linea_encabezado.rstrip() for linea_encabezado in lineas[inicio_encabezado:i] if linea_encabezado.strip()] + [linea]
+            en_filas = True
+    
+    return cortes
+
+def fragmentar_bloque(bloque, umbral=UMBRAL_LINEAS_SECCION):
+    """
+    Divide un bloque cuyas secciones fragmentables superan el umbral de líneas.
+    El primer elemento es el resto del bloque (las secciones grandes quedan solo con el eco del comando);
+    le siguen los fragmentos de cada sección, en orden. Todos llevan la marca de fragmento con el
+    hash del bloque original, para ubicarlo en el índice de procedencia si alguno queda en cuarentena,
+    y las líneas '#' que siguen al target en el bloque original (ej: la fuente, ver extractores_fuente).
+    Si el bloque tiene línea de origen, cada parte lleva la suya, con las anclas de sus líneas en el archivo
+    (ver referencias_origen).
+    
+    Args:
+        bloque (str): Bloque de texto del equipo (comienza con el nombre del target)
+        umbral (int): Número de líneas a partir del cual se fragmenta una sección
+    
+    Returns:
+        list: [bloque] si no hay secciones grandes; si no, [resto, fragmento, ...]
+    """
+    secciones = indexar_secciones(bloque)
+    grandes = sorted(
+        secciones[comando] for comando in COMANDOS_FRAGMENTABLES
+        if comando in secciones and bloque.count('\n', *secciones[comando]) > umbral
+    )
+    if not grandes:
+        return [bloque]
+    
+    fin_target = bloque.find('\n')
+    target = bloque[:fin_target]
+    marca = f"{MARCA_FRAGMENTO} {hash_cuerpo_bloque(bloque)}"
+    localizador = nuevo_localizador(bloque)
+    
+    # Líneas de encabezado del bloque, que se repiten en cada fragmento (salvo la de origen, que es propia de cada parte)
+    fin_encabezado = fin_target + 1
+    while bloque.startswith('#', fin_encabezado):
+        fin_linea = bloque.find('\n', fin_encabezado)
+        fin_encabezado = len(bloque) if fin_linea == -1 else fin_linea + 1
+    encabezado_bloque = quitar_origen(bloque[:fin_encabezado])[fin_target + 1:]
+    
+    def origen(tramos):
+        # Línea de origen de una parte: los tramos se numeran desde la línea siguiente a ella
+        if localizador is None:
+            return ''
+        return linea_origen(localizador['id_archivo'], localizador['retornos'], anclas_tramos(localizador, tramos)) + '\n'
+    
+    partes_resto = [encabezado_bloque]
+    tramos_resto = []
+    linea_resto = encabezado_bloque.count('\n') + 1
+    fragmentos = []
+    posicion = fin_encabezado
+    
+    for inicio, fin in grandes:
+        lineas = bloque[inicio:fin].split('\n')
+        eco = lineas[0]
+        
+        # El resto conserva el eco del comando, para que la sección siga siendo la primera aparición
+        partes_resto.extend([bloque[posicion:inicio], eco, '\n'])
+        tramos_resto.append((linea_resto, posicion, inicio + len(eco) + 1))
+        linea_resto += bloque.count('\n', posicion, inicio) + 1
+        posicion = fin
+        
+        # Posición de cada línea de la sección en el bloque, para ubicar las filas de cada fragmento
+        inicios_lineas = list(accumulate((len(linea) + 1 for linea in lineas), initial=inicio))
+        
+        limites = [(0, None)] + puntos_de_corte(lineas, umbral) + [(len(lineas), None)]
+        for (desde, encabezado), (hasta, _) in zip(limites, limites[1:]):
+            cuerpo = lineas[desde:hasta] if encabezado is None else [eco, LINEA_IGUALES] + encabezado + lineas[desde:hasta]
+            linea_filas = encabezado_bloque.count('\n') + 1 + (0 if encabezado is None else 2 + len(encabezado))
+            origen_fragmento = origen([(linea_filas, inicios_lineas[desde], inicios_lineas[hasta] - 1)])
+            fragmentos.append(f"{target}\n{marca} {len(fragmentos) + 1}\n{origen_fragmento}{encabezado_bloque}" + '\n'.join(cuerpo))
+    
+    partes_resto.append(bloque[posicion:])
+    tramos_resto.append((linea_resto, posicion, len(bloque)))
+    return [''.join([target, '\n', marca, ' 0\n', origen(tramos_resto)] + partes_resto)] + fragmentos
+
+def fragmentar_bloques(bloques, umbral=None):
+    """
+    Reemplaza cada bloque con secciones grandes por su resto y sus fragmentos, sin consumir
+    el iterable por adelantado. Los bloques en bytes que superan el umbral se decodifican
+    antes de fragmentarlos, por lo que sus fragmentos son texto; si no son UTF-8 válido, el texto
+    ya no mide lo mismo que el archivo y las partes no llevan línea de origen.
+    
+    Args:
+        bloques (iterable): Bloques de texto (str o bytes)
+        umbral (int, optional): Umbral de líneas (ver resolver_umbral_fragmento); None no fragmenta
+    
+    Yields:
+        str o bytes: Bloques y fragmentos, en orden
+    """
+    for bloque in bloques:
+        if umbral and bloque.count(b'\n' if isinstance(bloque, bytes) else '\n') > umbral:
+            if isinstance(bloque, bytes):
+                texto = bloque.decode('utf-8', errors='ignore')
+                bloque = texto if len(texto.encode('utf-8')) == len(bloque) else quitar_origen(texto)
+            yield from fragmentar_bloque(bloque, umbral)
+        else:
+            yield bloque
@@ -5,13 +5,15 @@ Módulo para identificar y reportar equipos no leídos por errores de conexión.
 import re
 import pandas as pd
 
+from parser.extraer_ciudad import resolver_ciudades
+
 def identificar_equipos_no_leidos(contenido):
     """
     Identifica equipos que no pudieron ser leídos debido a errores de conexión u otros problemas.
     
     Args:
         contenido (str): Contenido concatenado de todos los archivos
-        
+    
     Returns:
         list: Lista de diccionarios con información de equipos no leídos
     """
@@ -33,31 +35,73 @@ def identificar_equipos_no_leidos(contenido):
         if error_match:
             error_detallado = error_match.group(1).strip()
         
-        # Determinar tipo de error
-        tipo_error = "Desconocido"
-        if "timeout" in error.lower() or (error_detallado and "timeout" in error_detallado.lower()):
-            tipo_error = "Timeout"
-        elif "connection" in error.lower() or (error_detallado and "connection" in error_detallado.lower()):
-            tipo_error = "Conexión"
-        elif "authentication" in error.lower() or (error_detallado and "authentication" in error_detallado.lower()):
-            tipo_error = "Autenticación"
-        
         equipos_no_leidos.append({
             'target': target,
             'error': error,
             'error_detallado': error_detallado,
-            'tipo_error': tipo_error
+            'tipo_error': clasificar_tipo_error(error, error_detallado)
         })
     
     return equipos_no_leidos
 
+def identificar_equipos_no_leidos_desde_eventos(eventos):
+    """
+    Identifica equipos no leídos a partir de los eventos del tokenizador NSP,
+    sin recorrer el contenido completo con expresiones regulares.
+    
+    Args:
+        eventos (iterable): Eventos (tipo, datos) emitidos por parser.tokenizador_nsp
+    
+    Returns:
+        list: Lista de diccionarios con información de equipos no leídos
+    """
+    from parser.tokenizador_nsp import EVENTO_ERROR
+    
+    return [dict(datos) for tipo, datos in eventos if tipo == EVENTO_ERROR]
+
+def identificar_equipos_no_leidos_desde_indice(procedencia):
+    """
+    Identifica equipos no leídos a partir del índice de procedencia construido al dividir
+    los bloques, sin volver a recorrer el contenido.
+    
+    Args:
+        procedencia (list): Entradas del índice de procedencia (parser.indice_procedencia)
+    
+    Returns:
+        list: Lista de diccionarios con información de equipos no leídos
+    """
+    return [dict(entrada['error']) for entrada in procedencia if entrada.get('error')]
+
+def clasificar_tipo_error(error, error_detallado=None):
+    """
+    Determina el tipo de error de conexión a partir del mensaje de error.
+    
+    Args:
+        error (str): Mensaje de error del bloque
+        error_detallado (str, optional): Detalle adicional del error
+    
+    Returns:
+        str: Tipo de error ("Timeout", "Conexión", "Autenticación" o "Desconocido")
+    """
+    error = (error or '').lower()
+    error_detallado = (error_detallado or '').lower()
+    
+    if "timeout" in error or "timeout" in error_detallado:
+        return "Timeout"
+    elif "connection" in error or "connection" in error_detallado or "unreachable" in error:
+        return "Conexión"
+    elif "authentication" in error or "authentication" in error_detallado or "cannot login" in error:
+        return "Autenticación"
+    
+    return "Desconocido"
+
 def generar_resumen_equipos_no_leidos(equipos_no_leidos):
     """
     Genera un resumen de los equipos no leídos agrupados por tipo de error.
     
     Args:
         equipos_no_leidos (list): Lista de diccionarios con información de equipos no leídos
-        
+    
     Returns:
         dict: Diccionario con resumen de equipos no leídos
     """
@@ -88,11 +132,15 @@ def crear_dataframe_equipos_no_leidos(equipos_no_leidos):
     
     Args:
         equipos_no_leidos (list): Lista de diccionarios con información de equipos no leídos
-        
+    
     Returns:
-        DataFrame: DataFrame con información de equipos no leídos
+        DataFrame: DataFrame con información de equipos no leídos y su ciudad ('ciudad', 'ciudad_normalizada')
     """
     if not equipos_no_leidos:
         return pd.DataFrame(columns=['target', 'tipo_error', 'error'])
     
-    return pd.DataFrame(equipos_no_leidos)
+    df_no_leidos = pd.DataFrame(equipos_no_leidos)
+    ciudades = resolver_ciudades(df_no_leidos['target'])
+    df_no_leidos['ciudad'] = ciudades['ciudad']
+    df_no_leidos['ciudad_normalizada'] = ciudades['ciudad_normalizada']
+    return df_no_leidos
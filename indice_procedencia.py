@@ -0,0 +1,192 @@
+"""
+Módulo para construir el índice de procedencia de los equipos.
+Relaciona cada target con su archivo de origen, posición, fuente (NSP19/NSP24) y script,
+y se construye en la misma pasada en que se dividen los bloques.
+"""
+
+import re
+import pandas as pd
+
+from parser.tokenizador_nsp import (
+    nuevo_encabezado, actualizar_encabezado, datos_error, determinar_fuente, detectar_fuente_contenido,
+    LIMITE_DETALLE_ERROR
+)
+from parser.indice_secciones import PATRON_COMANDO, PATRON_COMANDO_BYTES
+
+# Patrón de encabezado de bloque (el mismo usado para dividir el contenido)
+PATRON_BLOQUES = re.compile(r'#\s*Script Name:[^\n]+\s+Script Version:[^\n]+\s+Target:')
+
+# Columnas del índice de procedencia
+COLUMNAS_PROCEDENCIA = ['target', 'fuente', 'archivo', 'offset', 'script_name', 'script_version', 'status', 'saved_result']
+
+# Clasificación de los bloques al dividirlos: solo los bloques 'ok' pasan por los extractores
+ESTADO_BLOQUE_OK = 'ok'
+ESTADO_BLOQUE_ERROR = 'error'
+ESTADO_BLOQUE_VACIO = 'vacio'
+
+# Bloques descartados por superar el tiempo máximo de procesamiento (ver ejecutor_bloques)
+ESTADO_BLOQUE_CUARENTENA = 'cuarentena'
+
+# Columnas de procedencia que se agregan al resumen de equipos
+COLUMNAS_PROCEDENCIA_RESUMEN = ['archivo', 'offset', 'script_name', 'script_version', 'status']
+
+def dividir_bloques_con_procedencia(contenido, archivo=None):
+    """
+    Divide el contenido en bloques de equipo y construye el índice de procedencia en una sola pasada.
+    Los bloques son idénticos a los que produce re.split con el patrón de encabezado.
+    La fuente por defecto se determina una sola vez para todo el contenido.
+    
+    Args:
+        contenido (str): Contenido de uno o varios archivos
+        archivo (str, optional): Nombre del archivo de origen, si se conoce
+    
+    Returns:
+        tuple: (bloques, procedencia) con la lista de bloques de texto y una entrada de
+            procedencia (dict) por bloque, en el mismo orden; cada entrada incluye 'estado_bloque'
+    """
+    fuente_contenido = detectar_fuente_contenido(contenido)
+    
+    bloques = []
+    procedencia = []
+    
+    encabezados = list(PATRON_BLOQUES.finditer(contenido))
+    
+    for i, encabezado_match in enumerate(encabezados):
+        inicio = encabezado_match.end()
+        fin = encabezados[i + 1].start() if i + 1 < len(encabezados) else len(contenido)
+        bloque = contenido[inicio:fin]
+        
+        entrada = _entrada_desde_bloque(bloque, encabezado_match, archivo, fuente_contenido)
+        if entrada is None:
+            continue
+        
+        entrada['estado_bloque'] = clasificar_bloque(entrada, bloque)
+        bloques.append(bloque)
+        procedencia.append(entrada)
+    
+    return bloques, procedencia
+
+def entrada_procedencia(info):
+    """
+    Crea una entrada del índice a partir de la información de bloque del tokenizador.
+    
+    Args:
+        info (dict): Información de inicio de bloque emitida por el tokenizador
+    
+    Returns:
+        dict: Entrada de procedencia (incluye 'error' si el equipo no fue leído, y el archivo
+            y la longitud del bloque para referenciarlo, ver referencias_origen)
+    """
+    entrada = {columna: info.get(columna) for columna in COLUMNAS_PROCEDENCIA}
+    if info.get('id_archivo') is not None:
+        entrada['id_archivo'] = info['id_archivo']
+        entrada['longitud'] = info.get('longitud')
+    if info.get('error'):
+        entrada['error'] = info['error']
+    return entrada
+
+def clasificar_bloque(entrada, bloque):
+    """
+    Clasifica un bloque una sola vez, al dividirlo: con error (equipo no leído),
+    vacío (sin ningún comando 'show') o correcto.
+    
+    Args:
+        entrada (dict): Entrada de procedencia del bloque
+        bloque (str o bytes): Texto del bloque
+    
+    Returns:
+        str: ESTADO_BLOQUE_ERROR, ESTADO_BLOQUE_VACIO o ESTADO_BLOQUE_OK
+    """
+    if entrada.get('error'):
+        return ESTADO_BLOQUE_ERROR
+    if not (PATRON_COMANDO_BYTES if isinstance(bloque, bytes) else PATRON_COMANDO).search(bloque):
+        return ESTADO_BLOQUE_VACIO
+    return ESTADO_BLOQUE_OK
+
+def contar_estados_bloque(procedencia):
+    """
+    Cuenta los bloques del índice por estado.
+    
+    Args:
+        procedencia (list): Entradas del índice de procedencia
+    
+    Returns:
+        dict: estado -> número de bloques
+    """
+    conteo = {ESTADO_BLOQUE_OK: 0, ESTADO_BLOQUE_ERROR: 0, ESTADO_BLOQUE_VACIO: 0}
+    for entrada in procedencia:
+        estado = entrada.get('estado_bloque', ESTADO_BLOQUE_OK)
+        conteo[estado] = conteo.get(estado, 0) + 1
+    return conteo
+
+def targets_con_fuente_desde_indice(procedencia):
+    """
+    Obtiene la lista ordenada de pares (target, fuente) únicos del índice.
+    
+    Args:
+        procedencia (list): Entradas del índice de procedencia
+    
+    Returns:
+        list: Lista ordenada de tuplas (target, fuente)
+    """
+    return sorted({(entrada['target'], entrada['fuente']) for entrada in procedencia})
+
+def indexar_por_target(procedencia):
+    """
+    Agrupa las entradas del índice por target.
+    
+    Args:
+        procedencia (list): Entradas del índice de procedencia
+    
+    Returns:
+        dict: target -> lista de entradas (un target puede aparecer en varios archivos)
+    """
+    indice = {}
+    for entrada in procedencia:
+        indice.setdefault(entrada['target'], []).append(entrada)
+    return indice
+
+def crear_dataframe_procedencia(procedencia):
+    """
+    Crea un DataFrame con el índice de procedencia.
+    
+    Args:
+        procedencia (list): Entradas del índice de procedencia
+    
+    Returns:
+        DataFrame: Una fila por bloque con las columnas de COLUMNAS_PROCEDENCIA
+    """
+    if not procedencia:
+        return pd.DataFrame(columns=COLUMNAS_PROCEDENCIA)
+    
+    return pd.DataFrame([{columna: entrada.get(columna) for columna in COLUMNAS_PROCEDENCIA} for entrada in procedencia])
+
+def _entrada_desde_bloque(bloque, encabezado_match, archivo, fuente_contenido):
+    """
+    Lee el encabezado de un bloque (líneas '#' iniciales) y crea su entrada de procedencia.
+    """
+    target_match = re.match(r'^([^\s#]+)', bloque)
+    if not target_match:
+        return None
+    
+    encabezado = nuevo_encabezado(encabezado_match.group(0) + target_match.group(1), archivo, encabezado_match.start())
+    
+    # Recorrer solo las líneas del encabezado, no el bloque completo
+    posicion = bloque.find('\n') + 1 or len(bloque)
+    while posicion < len(bloque) and bloque.startswith('#', posicion):
+        fin_linea = bloque.find('\n', posicion)
+        if fin_linea == -1:
+            fin_linea = len(bloque)
+        actualizar_encabezado(encabezado, bloque[posicion:fin_linea])
+        posicion = fin_linea + 1
+    
+    encabezado['fuente'] = determinar_fuente(encabezado['saved_result'], fuente_contenido)
+    
+    entrada = {columna: encabezado[columna] for columna in COLUMNAS_PROCEDENCIA}
+    
+    texto_posterior = '\n'.join(encabezado['lineas_error'][1:]) + '\n' + bloque[posicion:posicion + LIMITE_DETALLE_ERROR]
+    error = datos_error(encabezado, texto_posterior)
+    if error:
+        entrada['error'] = error
+    
+    return entrada
@@ -0,0 +1,72 @@
+"""
+Módulo para indexar las secciones de comandos ('show ...') de un bloque de equipo.
+El bloque se recorre una sola vez y cada extractor recibe solo el texto de su comando,
+en lugar de buscar su encabezado con una expresión regular sobre el bloque completo.
+Los bloques pueden ser texto (str) o bytes sin decodificar (lectura en modo bytes).
+"""
+
+import re
+
+# Eco de un comando al inicio de una línea (ej: 'show port', 'show service service-using')
+PATRON_COMANDO = re.compile(r'^show[ \t]+[^\n]*?(?=[ \t]*$)', re.MULTILINE)
+PATRON_COMANDO_BYTES = re.compile(rb'^show[ \t]+[^\n]*?(?=[ \t]*$)', re.MULTILINE)
+
+# Comandos leídos por los extractores
+COMANDO_SERVICIOS = 'show service service-using'
+COMANDO_PUERTOS = 'show port'
+COMANDO_DESCRIPCIONES = 'show port description'
+COMANDO_CHASSIS = 'show chassis'
+COMANDO_VERSION = 'show version'
+COMANDO_CARD_DETAIL = 'show card detail'
+COMANDO_MDA = 'show mda'
+COMANDO_MDA_DETAIL = 'show mda detail'
+
+def normalizar_comando(comando):
+    """
+    Normaliza el texto de un comando (minúsculas y espacios simples).
+    
+    Args:
+        comando (str o bytes): Texto del comando
+    
+    Returns:
+        str: Comando normalizado
+    """
+    if isinstance(comando, bytes):
+        comando = comando.decode('utf-8', errors='ignore')
+    return ' '.join(comando.lower().split())
+
+def indexar_secciones(bloque):
+    """
+    Encuentra todos los comandos del bloque en una sola pasada.
+    Cada sección va desde el eco de su comando hasta el eco del comando siguiente
+    (o el final del bloque). Si un comando se repite, se conserva su primera aparición.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo
+    
+    Returns:
+        dict: comando normalizado -> (inicio, fin) en el bloque
+    """
+    secciones = {}
+    patron = PATRON_COMANDO_BYTES if isinstance(bloque, bytes) else PATRON_COMANDO
+    inicios = [(match.start(), normalizar_comando(match.group(0))) for match in patron.finditer(bloque)]
+    
+    for i, (inicio, comando) in enumerate(inicios):
+        fin = inicios[i + 1][0] if i + 1 < len(inicios) else len(bloque)
+        secciones.setdefault(comando, (inicio, fin))
+    
+    return secciones
+
+def texto_seccion(bloque, secciones, *comandos):
+    """
+    Obtiene el texto de las secciones indicadas, en el orden en que se piden.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo
+        secciones (dict): Índice de secciones del bloque (ver indexar_secciones)
+        *comandos (str): Comandos cuyas secciones se quieren obtener
+    
+    Returns:
+        str o bytes: Texto de las secciones encontradas (vacío si no existe ninguna), del mismo tipo que el bloque
+    """
+    return bloque[:0].join(bloque[secciones[comando][0]:secciones[comando][1]] for comando in comandos if comando in secciones)
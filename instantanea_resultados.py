@@ -0,0 +1,379 @@
+"""
+Módulo de instantáneas de los resultados procesados.
+Guarda los DataFrames del procesamiento en formato columnar (Feather/Arrow IPC o Parquet)
+junto con un manifiesto (archivos de origen, hashes, tiempo de procesamiento y versión),
+para que la aplicación pueda abrir la última instantánea al iniciar sin volver a procesar los archivos.
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from parser.cache_procesamiento import calcular_hash_archivo
+
+# Variable de entorno para cambiar el directorio de las instantáneas
+VARIABLE_DIRECTORIO_INSTANTANEAS = 'NSP_DIRECTORIO_INSTANTANEAS'
+
+# Nombre del directorio de instantáneas dentro de la carpeta de archivos
+NOMBRE_DIRECTORIO_INSTANTANEAS = '.instantaneas_nsp'
+
+# Archivo con el manifiesto de cada instantánea
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+# Versión del formato de las instantáneas; cambiarla invalida las existentes
+VERSION_INSTANTANEA = 1
+
+# Número de instantáneas que se conservan
+MAXIMO_INSTANTANEAS = 3
+
+# Tablas de la instantánea, en el orden de la tupla que devuelve procesar_archivos
+TABLAS_INSTANTANEA = ['servicios', 'puertos', 'chassis', 'versiones', 'mda', 'resumen', 'no_leidos']
+
+# Extensión de los archivos de cada formato
+EXTENSIONES_FORMATO = {
+    'feather': '.feather',
+    'parquet': '.parquet',
+    'pickle': '.pkl'
+}
+
+def resolver_directorio_instantaneas(directorio_archivos, directorio_instantaneas=None):
+    """
+    Determina el directorio de las instantáneas. El parámetro tiene prioridad sobre la variable de entorno;
+    por defecto se usa un subdirectorio oculto de la carpeta de archivos.
+    
+    Args:
+        directorio_archivos (str): Carpeta de los archivos NSP
+        directorio_instantaneas (str, optional): Directorio de las instantáneas
+    
+    Returns:
+        str: Ruta absoluta del directorio de las instantáneas
+    """
+    directorio_instantaneas = (
+        directorio_instantaneas
+        or os.environ.get(VARIABLE_DIRECTORIO_INSTANTANEAS)
+        or os.path.join(directorio_archivos, NOMBRE_DIRECTORIO_INSTANTANEAS)
+    )
+    return os.path.abspath(directorio_instantaneas)
+
+def formato_disponible(formato=None):
+    """
+    Determina el formato de escritura. Feather y Parquet requieren pyarrow;
+    si no está instalado se usa pickle (sin lectura mapeada en memoria).
+    
+    Args:
+        formato (str, optional): Formato preferido ('feather' o 'parquet'). Por defecto, 'feather'.
+    
+    Returns:
+        str: Formato a utilizar ('feather', 'parquet' o 'pickle')
+    """
+    formato = formato or 'feather'
+    if formato not in EXTENSIONES_FORMATO:
+        raise ValueError(f"Formato de instantánea no válido: {formato}")
+    
+    if formato != 'pickle':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return 'pickle'
+    
+    return formato
+
+def describir_archivos(archivos):
+    """
+    Describe los archivos de origen para el manifiesto.
+    
+    Args:
+        archivos (list): Rutas de los archivos procesados
+    
+    Returns:
+        list: Una entrada {'ruta', 'tamano', 'mtime', 'hash'} por archivo
+    """
+    descripcion = []
+    for ruta in archivos:
+        estado = os.stat(ruta)
+        descripcion.append({
+            'ruta': os.path.abspath(ruta),
+            'tamano': estado.st_size,
+            'mtime': estado.st_mtime_ns,
+            'hash': calcular_hash_archivo(ruta)
+        })
+    return descripcion
+
+def guardar_instantanea(resultados, archivos, directorio_instantaneas, tiempo_procesamiento=None, formato=None):
+    """
+    Guarda los resultados del procesamiento como una nueva instantánea.
+    La instantánea se escribe en un directorio temporal y se publica con un renombrado,
+    de modo que nunca se lee una instantánea a medio escribir; si la escritura falla, el
+    directorio temporal se elimina.
+    
+    Args:
+        resultados (tuple): DataFrames en el orden de TABLAS_INSTANTANEA
+        archivos (list): Rutas de los archivos de origen
+        directorio_instantaneas (str): Directorio de las instantáneas
+        tiempo_procesamiento (float, optional): Segundos que tomó el procesamiento
+        formato (str, optional): 'feather' (por defecto) o 'parquet'
+    
+    Returns:
+        str: Ruta del directorio de la instantánea creada
+    """
+    formato = formato_disponible(formato)
+    nombre = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    ruta_temporal = os.path.join(directorio_instantaneas, f".{nombre}.tmp")
+    os.makedirs(ruta_temporal, exist_ok=True)
+    
+    manifiesto = {
+        'version': VERSION_INSTANTANEA,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'tiempo_procesamiento': tiempo_procesamiento,
+        'formato': formato,
+        'archivos': describir_archivos(archivos),
+        'tablas': {}
+    }
+    
+    try:
+        for tabla, df in zip(TABLAS_INSTANTANEA, resultados):
+            df = df.reset_index(drop=True)
+            formato_tabla = _escribir_tabla(df, os.path.join(ruta_temporal, tabla), formato)
+            manifiesto['tablas'][tabla] = {
+                'archivo': tabla + EXTENSIONES_FORMATO[formato_tabla],
+                'formato': formato_tabla,
+                'filas': len(df),
+                'columnas': [str(columna) for columna in df.columns]
+            }
+        
+        with open(os.path.join(ruta_temporal, NOMBRE_MANIFIESTO), 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, indent=1)
+    except BaseException:
+        shutil.rmtree(ruta_temporal, ignore_errors=True)
+        raise
+    
+    ruta_instantanea = os.path.join(directorio_instantaneas, nombre)
+    os.replace(ruta_temporal, ruta_instantanea)
+    
+    limpiar_instantaneas(directorio_instantaneas)
+    
+    return ruta_instantanea
+
+def guardar_instantanea_en_segundo_plano(dataset, archivos, directorio_instantaneas, tiempo_procesamiento=None, formato=None):
+    """
+    Guarda la instantánea de un DatasetDiferido en un hilo en segundo plano. Las tablas de la
+    instantánea que aún no se han construido (MDA) se procesan en ese hilo; un acceso a ellas
+    mientras tanto espera a que terminen (ver DatasetDiferido.materializar). Los errores de escritura
+    y de conversión a Arrow (ArrowInvalid es un ValueError y ArrowTypeError un TypeError) se reportan
+    como en la lectura, sin interrumpir la aplicación.
+    
+    Args:
+        dataset (DatasetDiferido): Resultados del procesamiento diferido
+        archivos (list): Rutas de los archivos de origen
+        directorio_instantaneas (str): Directorio de las instantáneas
+        tiempo_procesamiento (float, optional): Segundos que tomó el procesamiento
+        formato (str, optional): 'feather' (por defecto) o 'parquet'
+    
+    Returns:
+        threading.Thread: Hilo del guardado
+    """
+    def guardar():
+        try:
+            guardar_instantanea(dataset.como_tupla(), archivos, directorio_instantaneas, tiempo_procesamiento, formato)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"No se pudo guardar la instantánea de los datos: {str(e)}")
+    
+    hilo = threading.Thread(target=guardar, daemon=True)
+    hilo.start()
+    return hilo
+
+def listar_instantaneas(directorio_instantaneas):
+    """
+    Lista las instantáneas publicadas, de la más reciente a la más antigua.
+    
+    Args:
+        directorio_instantaneas (str): Directorio de las instantáneas
+    
+    Returns:
+        list: Rutas de los directorios de las instantáneas
+    """
+    try:
+        nombres = os.listdir(directorio_instantaneas)
+    except OSError:
+        return []
+    
+    rutas = [
+        os.path.join(directorio_instantaneas, nombre)
+        for nombre in sorted(nombres, reverse=True)
+        if not nombre.startswith('.') and os.path.isfile(os.path.join(directorio_instantaneas, nombre, NOMBRE_MANIFIESTO))
+    ]
+    return rutas
+
+def leer_manifiesto(ruta_instantanea):
+    """
+    Lee el manifiesto de una instantánea.
+    
+    Args:
+        ruta_instantanea (str): Directorio de la instantánea
+    
+    Returns:
+        dict: Manifiesto o None si no existe, no se puede leer o es de otra versión
+    """
+    try:
+        with open(os.path.join(ruta_instantanea, NOMBRE_MANIFIESTO), 'r', encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(manifiesto, dict) or manifiesto.get('version') != VERSION_INSTANTANEA:
+        return None
+    
+    return manifiesto
+
+def instantanea_vigente(manifiesto, archivos):
+    """
+    Comprueba si una instantánea corresponde a los archivos actuales.
+    El hash solo se recalcula cuando cambian la fecha de modificación o el tamaño.
+    
+    Args:
+        manifiesto (dict): Manifiesto de la instantánea
+        archivos (list): Rutas de los archivos actuales
+    
+    Returns:
+        bool: True si los archivos son los mismos y su contenido no ha cambiado
+    """
+    origen = {entrada['ruta']: entrada for entrada in manifiesto['archivos']}
+    actuales = [os.path.abspath(ruta) for ruta in archivos]
+    
+    if set(actuales) != set(origen):
+        return False
+    
+    for ruta in actuales:
+        entrada = origen[ruta]
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            return False
+        
+        if entrada['mtime'] == estado.st_mtime_ns and entrada['tamano'] == estado.st_size:
+            continue
+        if calcular_hash_archivo(ruta) != entrada['hash']:
+            return False
+    
+    return True
+
+def cargar_instantanea(ruta_instantanea, tablas=None):
+    """
+    Carga los DataFrames de una instantánea. Los archivos Feather y Parquet se abren
+    mapeados en memoria, por lo que el tiempo de carga no depende del tamaño de los archivos NSP.
+    
+    Args:
+        ruta_instantanea (str): Directorio de la instantánea
+        tablas (list, optional): Tablas a cargar. Por defecto, todas.
+    
+    Returns:
+        tuple: (resultados, manifiesto) con los DataFrames en el orden de TABLAS_INSTANTANEA
+            (None en las tablas no solicitadas), o None si la instantánea no es válida
+    """
+    manifiesto = leer_manifiesto(ruta_instantanea)
+    if manifiesto is None:
+        return None
+    
+    tablas = tablas or TABLAS_INSTANTANEA
+    resultados = []
+    
+    for tabla in TABLAS_INSTANTANEA:
+        if tabla not in tablas:
+            resultados.append(None)
+            continue
+        
+        datos_tabla = manifiesto['tablas'].get(tabla)
+        if datos_tabla is None:
+            return None
+        
+        try:
+            df = _leer_tabla(os.path.join(ruta_instantanea, datos_tabla['archivo']), datos_tabla['formato'])
+        except (OSError, ValueError, ImportError) as e:
+            print(f"No se pudo leer la tabla {tabla} de la instantánea {ruta_instantanea}: {str(e)}")
+            return None
+        
+        resultados.append(df)
+    
+    return tuple(resultados), manifiesto
+
+def cargar_ultima_instantanea(directorio_instantaneas, archivos=None):
+    """
+    Carga la instantánea más reciente. Si se indican los archivos actuales,
+    solo se acepta una instantánea que corresponda a ellos.
+    
+    Args:
+        directorio_instantaneas (str): Directorio de las instantáneas
+        archivos (list, optional): Rutas de los archivos actuales
+    
+    Returns:
+        tuple: (resultados, manifiesto) o None si no hay una instantánea válida
+    """
+    t_inicio = time.time()
+    
+    for ruta_instantanea in listar_instantaneas(directorio_instantaneas):
+        manifiesto = leer_manifiesto(ruta_instantanea)
+        if manifiesto is None:
+            continue
+        if archivos is not None and not instantanea_vigente(manifiesto, archivos):
+            continue
+        
+        cargada = cargar_instantanea(ruta_instantanea)
+        if cargada is not None:
+            print(f"Instantánea {os.path.basename(ruta_instantanea)} cargada en {time.time() - t_inicio:.2f} segundos")
+            return cargada
+    
+    return None
+
+def limpiar_instantaneas(directorio_instantaneas, maximo=MAXIMO_INSTANTANEAS):
+    """
+    Elimina las instantáneas más antiguas, conservando las 'maximo' más recientes.
+    
+    Args:
+        directorio_instantaneas (str): Directorio de las instantáneas
+        maximo (int): Número de instantáneas que se conservan
+    
+    Returns:
+        int: Número de instantáneas eliminadas
+    """
+    eliminadas = 0
+    for ruta_instantanea in listar_instantaneas(directorio_instantaneas)[maximo:]:
+        shutil.rmtree(ruta_instantanea, ignore_errors=True)
+        eliminadas += 1
+    return eliminadas
+
+def _escribir_tabla(df, ruta_base, formato):
+    """
+    Escribe una tabla en el formato indicado. Si Arrow no puede representar alguna
+    columna (tipos mezclados), la tabla se guarda con pickle.
+    
+    Returns:
+        str: Formato con el que se escribió la tabla
+    """
+    try:
+        if formato == 'feather':
+            df.to_feather(ruta_base + EXTENSIONES_FORMATO['feather'])
+            return 'feather'
+        if formato == 'parquet':
+            df.to_parquet(ruta_base + EXTENSIONES_FORMATO['parquet'], index=False)
+            return 'parquet'
+    except (ValueError, TypeError) as e:
+        print(f"No se pudo guardar {os.path.basename(ruta_base)} en formato {formato}, se usa pickle: {str(e)}")
+    
+    df.to_pickle(ruta_base + EXTENSIONES_FORMATO['pickle'])
+    return 'pickle'
+
+def _leer_tabla(ruta, formato):
+    """
+    Lee una tabla de la instantánea, mapeada en memoria cuando el formato lo permite.
+    """
+    if formato == 'feather':
+        from pyarrow import feather
+        return feather.read_table(ruta, memory_map=True).to_pandas()
+    if formato == 'parquet':
+        return pd.read_parquet(ruta, memory_map=True)
+    return pd.read_pickle(ruta)
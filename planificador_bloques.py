@@ -0,0 +1,187 @@
+"""
+Módulo para planificar el procesamiento de los bloques de equipo.
+Antes de procesar se mide la entrada (bytes totales y distribución del tamaño de los bloques),
+se estima el tiempo de cada modo de ejecución y se elige el menor. Los lotes se envían de mayor
+a menor (planificación LPT) para que los equipos grandes no queden rezagados al final.
+"""
+
+import os
+import multiprocessing
+from math import ceil
+
+from parser.ejecutor_bloques import (
+    MODO_SECUENCIAL, MODO_HILOS, MODO_PROCESOS, VARIABLE_MODO, TAMANO_LOTE_BLOQUES, resolver_modo, resolver_workers
+)
+
+# Velocidad de procesamiento estimada de un worker (bytes de bloque por segundo)
+VELOCIDAD_BYTES_SEGUNDO = 10 * 1024 * 1024
+
+# Fracción del trabajo que los hilos adelantan en paralelo: los extractores y el motor de
+# expresiones regulares retienen el GIL, solo se solapan la lectura y las secciones de pandas
+FRACCION_PARALELA_HILOS = 0.1
+
+# Costo fijo de crear el pool de workers (segundos); con 'spawn' cada proceso vuelve a importar pandas
+COSTO_INICIO_HILOS = 0.01
+COSTO_INICIO_PROCESOS_FORK = 0.1
+COSTO_INICIO_PROCESOS_SPAWN = 1.5
+
+# Costo de enviar un byte de bloque a un proceso y recibir sus resultados (serialización)
+COSTO_BYTE_PROCESOS = 1 / (200 * 1024 * 1024)
+
+# Lotes por worker buscados al dividir la entrada, para que el reparto LPT quede equilibrado
+LOTES_POR_WORKER = 4
+
+def medir_bloques(tamanos):
+    """
+    Mide la distribución del tamaño de los bloques.
+    
+    Args:
+        tamanos (list): Tamaño de cada bloque (caracteres)
+    
+    Returns:
+        dict: bloques, bytes, mediana, p90 y maximo
+    """
+    ordenados = sorted(tamanos)
+    if not ordenados:
+        return {'bloques': 0, 'bytes': 0, 'mediana': 0, 'p90': 0, 'maximo': 0}
+    
+    return {
+        'bloques': len(ordenados),
+        'bytes': sum(ordenados),
+        'mediana': ordenados[len(ordenados) // 2],
+        'p90': ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.9))],
+        'maximo': ordenados[-1]
+    }
+
+def costo_inicio_procesos():
+    """
+    Returns:
+        float: Costo estimado de crear el pool de procesos según el método de inicio de la plataforma
+    """
+    return COSTO_INICIO_PROCESOS_FORK if multiprocessing.get_start_method() == 'fork' else COSTO_INICIO_PROCESOS_SPAWN
+
+def estimar_segundos(medidas, modo, workers):
+    """
+    Estima el tiempo de procesamiento de la entrada en un modo de ejecución.
+    En paralelo, el tiempo no puede ser menor que el del bloque más grande.
+    
+    Args:
+        medidas (dict): Medidas de la entrada (ver medir_bloques)
+        modo (str): 'secuencial', 'hilos' o 'procesos'
+        workers (int): Número de workers
+    
+    Returns:
+        float: Segundos estimados
+    """
+    secuencial = medidas['bytes'] / VELOCIDAD_BYTES_SEGUNDO
+    bloque_mayor = medidas['maximo'] / VELOCIDAD_BYTES_SEGUNDO
+    
+    if modo == MODO_SECUENCIAL or workers <= 1:
+        return secuencial
+    
+    if modo == MODO_HILOS:
+        efectivos = 1 + (workers - 1) * FRACCION_PARALELA_HILOS
+        return COSTO_INICIO_HILOS + max(secuencial / efectivos, bloque_mayor)
+    
+    return costo_inicio_procesos() + medidas['bytes'] * COSTO_BYTE_PROCESOS + max(secuencial / workers, bloque_mayor)
+
+def planificar(tamanos=None, modo=None, workers=None, total_bytes=None):
+    """
+    Elige el modo de ejecución, el número de workers y el tamaño de los lotes.
+    Si el modo se indica (parámetro o variable de entorno NSP_MODO_PROCESAMIENTO), se respeta
+    y solo se estima su tiempo; si no, se elige el modo con menor tiempo estimado.
+    
+    Args:
+        tamanos (list, optional): Tamaño de cada bloque (caracteres)
+        modo (str, optional): Modo de ejecución forzado
+        workers (int, optional): Número máximo de workers (ver ejecutor_bloques.resolver_workers)
+        total_bytes (int, optional): Tamaño total de la entrada, si no se conocen los bloques
+            (ej: archivos leídos en streaming); se usa solo para elegir el modo
+    
+    Returns:
+        dict: modo, workers, tamano_lote, bytes_aislar, segundos_estimados, estimaciones (modo -> segundos),
+            motivo y las medidas de la entrada (ver medir_bloques)
+    """
+    medidas = medir_bloques(tamanos or [])
+    if total_bytes is not None and not tamanos:
+        medidas['bytes'] = total_bytes
+    
+    workers = resolver_workers(workers)
+    if medidas['bloques']:
+        workers = min(workers, medidas['bloques'])
+    
+    estimaciones = {
+        modo_estimado: estimar_segundos(medidas, modo_estimado, workers)
+        for modo_estimado in (MODO_SECUENCIAL, MODO_HILOS, MODO_PROCESOS)
+    }
+    
+    if modo is not None or os.environ.get(VARIABLE_MODO):
+        modo = resolver_modo(modo)
+        motivo = 'modo indicado'
+    else:
+        modo = min(estimaciones, key=estimaciones.get)
+        motivo = 'menor tiempo estimado'
+    
+    if modo == MODO_SECUENCIAL:
+        workers = 1
+    
+    # Lotes más pequeños cuanto más workers, y los bloques que por sí solos son una parte grande
+    # del trabajo van en un lote propio
+    tamano_lote = TAMANO_LOTE_BLOQUES
+    bytes_aislar = None
+    if workers > 1 and medidas['bloques']:
+        tamano_lote = max(1, min(TAMANO_LOTE_BLOQUES, ceil(medidas['bloques'] / (workers * LOTES_POR_WORKER))))
+        bytes_aislar = max(1, medidas['bytes'] // (workers * LOTES_POR_WORKER))
+    
+    plan = dict(medidas)
+    plan.update({
+        'modo': modo,
+        'workers': workers,
+        'tamano_lote': tamano_lote,
+        'bytes_aislar': bytes_aislar,
+        'segundos_estimados': estimaciones[modo],
+        'estimaciones': estimaciones,
+        'motivo': motivo
+    })
+    return plan
+
+def orden_lpt(lotes):
+    """
+    Ordena los lotes de mayor a menor tamaño (planificación LPT, 'longest processing time first').
+    
+    Args:
+        lotes (list): Lotes de bloques de texto
+    
+    Returns:
+        list: Posiciones de los lotes, del mayor al menor
+    """
+    tamanos = [sum(len(bloque) for bloque in lote) for lote in lotes]
+    return sorted(range(len(lotes)), key=lambda posicion: -tamanos[posicion])
+
+def describir_plan(plan, segundos_reales=None):
+    """
+    Describe el plan de ejecución y, si se conoce, el tiempo real, para los mensajes de progreso.
+    
+    Args:
+        plan (dict): Plan de ejecución (ver planificar)
+        segundos_reales (float, optional): Tiempo real del procesamiento
+    
+    Returns:
+        str: Descripción legible
+    """
+    descripcion = (
+        f"Plan de ejecución: {plan['modo']} con {plan['workers']} workers ({plan['motivo']}); "
+        f"{plan['bytes'] / (1024 * 1024):.2f} MB"
+    )
+    if plan['bloques']:
+        descripcion += (
+            f" en {plan['bloques']} bloques (mediana {plan['mediana'] / 1024:.1f} KB, "
+            f"p90 {plan['p90'] / 1024:.1f} KB, máximo {plan['maximo'] / 1024:.1f} KB)"
+        )
+    
+    estimaciones = ', '.join(f"{modo} {segundos:.2f}" for modo, segundos in plan['estimaciones'].items())
+    descripcion += f"; estimado {plan['segundos_estimados']:.2f} s ({estimaciones})"
+    
+    if segundos_reales is not None:
+        descripcion += f", real {segundos_reales:.2f} s"
+    return descripcion
@@ -25,7 +25,7 @@ def mostrar_por_ciudad(df_resumen):
         return
     
     # Agrupar por ciudad
-    ciudades_stats = df_con_ciudad.groupby('ciudad').agg({
+    ciudades_stats = df_con_ciudad.groupby('ciudad', observed=True).agg({
         'target': 'count',
         'total_servicios': 'sum',
         'total_puertos': 'sum',
@@ -24,11 +24,11 @@ def mostrar_por_ciudad_mejorado(df_resumen):
         st.warning("No se encontraron datos de ciudad en los equipos analizados.")
         return
     
-    # Usar la función de normalización de ciudades del módulo extraer_ciudad
-    from parser.extraer_ciudad import normalizar_ciudad
-    
-    # Aplicar normalización de ciudades
-    df_con_ciudad['ciudad_normalizada'] = df_con_ciudad['ciudad'].apply(normalizar_ciudad)
+    # Nombre de la ciudad: viene del resumen; para resúmenes sin la columna se toma de la dimensión de ciudades
+    if 'ciudad_normalizada' not in df_con_ciudad.columns:
+        from parser.extraer_ciudad import unir_dimension_ciudades
+        df_con_ciudad = unir_dimension_ciudades(df_con_ciudad, ['nombre']).rename(columns={'nombre': 'ciudad_normalizada'})
+        df_con_ciudad['ciudad_normalizada'] = df_con_ciudad['ciudad_normalizada'].fillna(df_con_ciudad['ciudad'])
     
     # Calcular puertos sin usar (si no existe la columna)
     if 'puertos_unused' not in df_con_ciudad.columns:
@@ -36,7 +36,7 @@ def mostrar_por_ciudad_mejorado(df_resumen):
         df_con_ciudad['puertos_unused'] = df_con_ciudad['total_puertos'] - (df_con_ciudad['puertos_up'] + df_con_ciudad['puertos_down'])
     
     # Agrupar por ciudad normalizada
-    ciudades_stats = df_con_ciudad.groupby('ciudad_normalizada').agg({
+    ciudades_stats = df_con_ciudad.groupby('ciudad_normalizada', observed=True).agg({
         'target': 'count',
         'total_servicios': 'sum',
         'total_puertos': 'sum',
@@ -2,6 +2,7 @@ import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
+from parser.dataset_diferido import obtener_tabla
 
 def mostrar_por_equipo(df_resumen, df_servicios, df_puertos, df_descripciones, df_chassis, df_versiones, df_mda):
     """
@@ -11,10 +12,11 @@ def mostrar_por_equipo(df_resumen, df_servicios, df_puertos, df_descripciones, d
         df_resumen (DataFrame): DataFrame con el resumen de equipos
         df_servicios (DataFrame): DataFrame con información de servicios
         df_puertos (DataFrame): DataFrame con información de puertos
-        df_descripciones (DataFrame): DataFrame con información de descripciones de puertos
+        df_descripciones (DataFrame o callable): DataFrame con información de descripciones de puertos,
+            o tabla diferida que se construye al seleccionar un equipo (ver dataset_diferido.obtener_tabla)
         df_chassis (DataFrame): DataFrame con información de chasis
         df_versiones (DataFrame): DataFrame con información de versiones
-        df_mda (DataFrame): DataFrame con información de tarjetas MDA
+        df_mda (DataFrame o callable): DataFrame con información de tarjetas MDA, o tabla diferida
     """
     st.header("Vista por Equipo")
     
@@ -30,6 +32,10 @@ def mostrar_por_equipo(df_resumen, df_servicios, df_puertos, df_descripciones, d
         st.info("Seleccione un equipo para ver sus detalles.")
         return
     
+    # Las tablas diferidas se construyen solo cuando se muestra un equipo
+    df_descripciones = obtener_tabla(df_descripciones)
+    df_mda = obtener_tabla(df_mda)
+    
     # Filtrar datos del equipo seleccionado
     resumen_equipo = df_resumen[df_resumen['target'] == equipo_seleccionado].iloc[0] if not df_resumen[df_resumen['target'] == equipo_seleccionado].empty else None
     servicios_equipo = df_servicios[df_servicios['target'] == equipo_seleccionado] if not df_servicios.empty else pd.DataFrame()
@@ -1,16 +1,88 @@
+import os
 import re
 import pandas as pd
 import numpy as np
 from io import StringIO
 import time
 import gc
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from parser.extraer_ciudad import extraer_ciudad_desde_nombre_equipo, normalizar_ciudad
+from functools import partial
+from itertools import compress
+from parser.extraer_ciudad import resolver_ciudades
 from parser.extraer_version import extraer_version_timos, extraer_tipo_equipo_desde_version
-from parser.extraer_chassis import extraer_info_chassis
-from parser.extraer_tipo_equipo import extraer_tipo_equipo_desde_chassis, extraer_tipo_equipo, validar_tipo_equipo
+from parser.extraer_chassis import leer_campos_chassis, info_chassis_desde_campos
+from parser.extraer_tipo_equipo import extraer_tipo_equipo_desde_chassis, tipo_equipo_desde_campos, clasificar_tipos_equipo
+from parser.tokenizador_nsp import tokenizar_archivos, ensamblar_bloques, dividir_bloques_bytes, resolver_lectura, LECTURA_BYTES
+from parser.indice_secciones import (
+    indexar_secciones, texto_seccion, COMANDO_SERVICIOS, COMANDO_PUERTOS, COMANDO_DESCRIPCIONES,
+    COMANDO_CHASSIS, COMANDO_VERSION, COMANDO_CARD_DETAIL, COMANDO_MDA, COMANDO_MDA_DETAIL
+)
+from parser.tabla_ancho_fijo import leer_tablas, columnas_desde_encabezado, cortar_fila
+from parser.cache_procesamiento import cargar_indice, guardar_indice, obtener_hash, leer_resultado, guardar_resultado, limpiar_cache
+from parser.fragmentar_bloques import resolver_umbral_fragmento, fragmentar_bloques, es_fragmento, hash_bloque_origen
+from parser.deduplicar_bloques import (
+    nuevo_registro_duplicados, registrar_bloque, registrar_entrada, estadisticas_duplicados, describir_estadisticas_duplicados
+)
+from parser.ejecutor_bloques import (
+    resolver_limite_bloque, crear_lotes, ejecutar_lotes, ejecutar_lotes_en_orden, limite_tiempo, avisar_limite_inactivo, TiempoBloqueExcedido, MODO_PROCESOS
+)
+from parser.transferencia_arrow import (
+    resolver_transferencia, exportar_tabla, importar_tabla, tabla_desde_columnas, columnas_desde_tabla, concatenar_segmentos,
+    eliminar_archivos_pendientes, memoria_maxima_mb, reemplazar_valores, filtrar_filas, TRANSFERENCIA_ARROW
+)
+from parser.planificador_bloques import planificar, orden_lpt, describir_plan
+from parser.extractores_fuente import (
+    etiquetar_fuente, fuente_bloque, extraer_especializado, registrar_extraccion, fusionar_estadisticas,
+    describir_estadisticas_extractores, TOTAL_SERVICIOS
+)
+from parser.referencias_origen import nuevo_localizador, referencias_lineas, referencia_seccion, entrada_referencia
+from parser.reglas_estado import clasificar_estados
+from parser.derrame_resultados import (
+    resolver_presupuesto_memoria, nuevo_derrame, derramar_si_excede, abrir_derramados, leer_partes, columnas_tabla, cerrar_derrame, describir_derrame
+)
+from parser.indice_procedencia import (
+    dividir_bloques_con_procedencia, entrada_procedencia, clasificar_bloque, contar_estados_bloque, targets_con_fuente_desde_indice,
+    COLUMNAS_PROCEDENCIA_RESUMEN, ESTADO_BLOQUE_OK, ESTADO_BLOQUE_CUARENTENA
+)
 
-def procesar_datos(contenido):
+# Tablas producidas por cada bloque de equipo, en el orden en que se devuelven
+TABLAS_BLOQUE = ['servicios', 'puertos', 'descripciones', 'chassis', 'version', 'mda']
+
+# Tablas necesarias para el resumen; en modo diferido son las únicas que se procesan de inmediato
+TABLAS_RESUMEN = ['servicios', 'puertos', 'chassis', 'version']
+
+# Tablas que se devuelven en modo inmediato; las descripciones solo se construyen en modo diferido, al acceder a ellas
+TABLAS_RESULTADO = ['servicios', 'puertos', 'chassis', 'version', 'mda']
+
+# Columnas de las tablas SR OS, tal como aparecen en la primera línea del encabezado
+ENCABEZADO_SERVICIOS = ['ServiceId', 'Type', 'Adm', 'Opr', 'CustomerId', 'Service Name']
+ENCABEZADO_PUERTOS = ['Port', 'Admin', 'Link', 'Port', 'Cfg', 'Oper', 'LAG/']
+ENCABEZADO_DESCRIPCIONES = ['Port', 'Description']
+ENCABEZADO_MDA = ['Slot', 'Mda', 'Provisioned', 'Admin', 'Operational']
+ENCABEZADO_CARD = ['Slot', 'Provisioned', 'Equipped', 'Admin', 'Operational']
+
+# Slot (ej: 1, A) y estado administrativo válidos en las filas de las tablas de MDA
+PATRON_SLOT = re.compile(r'^\w+$')
+PATRON_ESTADO_MDA = re.compile(r'^(?:up|down)$', re.IGNORECASE)
+
+# Nombre del equipo al inicio del bloque (en texto o en bytes, según el modo de lectura)
+PATRON_TARGET_BLOQUE = re.compile(r'^([^\s#]+)')
+PATRON_TARGET_BLOQUE_BYTES = re.compile(rb'^([^\s#]+)')
+
+# Columnas numéricas de cada tabla; se convierten una sola vez al construir el DataFrame final
+COLUMNAS_NUMERICAS = {
+    'servicios': ['service_id', 'customer_id'],
+    'puertos': ['cfg_mtu', 'oper_mtu']
+}
+
+# Al reintentar un bloque en cuarentena se multiplica su tiempo máximo y se omite la versión,
+# cuyos patrones genéricos son los más costosos con texto de error o trazas
+FACTOR_LIMITE_REINTENTO = 5
+TABLAS_REINTENTO = ['servicios', 'puertos', 'descripciones', 'chassis', 'mda']
+
+# Contadores de puertos por equipo incluidos en el resumen
+COLUMNAS_CONTEO_PUERTOS = ['total_puertos', 'puertos_up', 'puertos_down', 'puertos_unused', 'puertos_admin_up_oper_down']
+
+def procesar_datos(contenido, modo=None, workers=None, diferido=False, precargar=False, limite_bloque=None, reintentar_cuarentena=False, umbral_fragmento=None, memoria_maxima=None):
     """
     Procesa el contenido de los archivos NSP y extrae la información relevante.
     Versión optimizada para mejor rendimiento con grandes volúmenes de datos.
@@ -18,198 +90,1050 @@ def procesar_datos(contenido):
     
     Args:
         contenido (str): Contenido concatenado de todos los archivos
-        
+        modo (str, optional): Modo de ejecución ('secuencial', 'hilos' o 'procesos').
+            Si no se indica, se usa la variable de entorno NSP_MODO_PROCESAMIENTO.
+        workers (int, optional): Número de workers. Si no se indica, se usa la variable
+            de entorno NSP_WORKERS o el número de núcleos.
+        diferido (bool): Si es True, solo se procesan las tablas del resumen y se devuelve un
+            DatasetDiferido que procesa las demás (descripciones, MDA) al acceder a ellas.
+        precargar (bool): En modo diferido, procesar las tablas restantes en segundo plano.
+        limite_bloque (float, optional): Tiempo máximo por bloque en segundos. Si no se indica, se usa
+            la variable de entorno NSP_LIMITE_BLOQUE o 60; 0 lo desactiva. Los bloques que lo superan
+            quedan en cuarentena y se reportan en los equipos no leídos. El límite usa SIGALRM y solo se
+            aplica en modo 'procesos' o en la ejecución secuencial desde el hilo principal; en modo 'hilos'
+            o fuera del hilo principal (ej: la aplicación Streamlit) no se aplica y se muestra un aviso.
+        reintentar_cuarentena (bool): Reintentar los bloques en cuarentena con un límite mayor y sin
+            extraer la versión.
+        umbral_fragmento (int, optional): Líneas a partir de las cuales una sección de servicios, puertos
+            o descripciones se divide en fragmentos que se procesan en paralelo. Si no se indica, se usa
+            la variable de entorno NSP_UMBRAL_FRAGMENTO o 5000; 0 desactiva la fragmentación.
+        memoria_maxima (float, optional): Memoria máxima en MB de las tablas acumuladas; al superarla, las tablas
+            se derraman a disco como archivos Arrow y se unen al final (ver derrame_resultados). Si no se indica,
+            se usa la variable de entorno NSP_MEMORIA_MB; sin ella (o con 0) no hay límite.
+    
     Returns:
-        tuple: Tupla con los DataFrames (servicios, puertos, descripciones, chassis, versiones, mda, resumen, equipos_no_leidos)
+        tuple: Tupla con los DataFrames (servicios, puertos, chassis, versiones, mda, resumen, equipos_no_leidos),
+            o DatasetDiferido si diferido es True
     """
-    # Identificar equipos no leídos por errores de conexión
-    from parser.identificar_no_leidos import identificar_equipos_no_leidos, crear_dataframe_equipos_no_leidos
-    equipos_no_leidos = identificar_equipos_no_leidos(contenido)
-    df_no_leidos = crear_dataframe_equipos_no_leidos(equipos_no_leidos)
+    from parser.identificar_no_leidos import identificar_equipos_no_leidos_desde_indice, crear_dataframe_equipos_no_leidos
     
-    # PASO 1: Extraer TODOS los targets únicos del contenido con su fuente
-    print("Extrayendo todos los targets únicos con fuente...")
-    targets_con_fuente = extraer_todos_los_targets_con_fuente(contenido)
-    print(f"Total de targets únicos con fuente encontrados: {len(targets_con_fuente)}")
+    # Dividir el contenido por bloques de equipo y construir el índice de procedencia en la misma pasada
+    t_inicio = time.time()
+    bloques_equipo, procedencia = dividir_bloques_con_procedencia(contenido)
     
-    # Obtener lista de targets únicos para procesamiento
-    targets_unicos = [target for target, _ in targets_con_fuente]
+    # Solo los bloques correctos pasan por los extractores; los bloques con error van directo a equipos no leídos
+    # y los cuerpos repetidos entre exportaciones se procesan una sola vez. Cada bloque lleva su fuente
+    # para que los workers usen el extractor especializado
+    registro_duplicados = nuevo_registro_duplicados()
+    bloques_equipo = [
+        etiquetar_fuente(bloque, entrada['fuente']) for posicion, (bloque, entrada) in enumerate(zip(bloques_equipo, procedencia))
+        if entrada['estado_bloque'] == ESTADO_BLOQUE_OK and registrar_bloque(registro_duplicados, entrada, bloque, posicion)
+    ]
     
-    # Inicializar DataFrames vacíos con tipos de datos predefinidos para optimizar memoria
-    df_servicios = pd.DataFrame()
-    df_puertos = pd.DataFrame()
-    df_descripciones = pd.DataFrame()
-    df_chassis = pd.DataFrame()
-    df_versiones = pd.DataFrame()
-    df_mda = pd.DataFrame()
+    print(f"Tiempo de división en bloques: {time.time() - t_inicio:.2f} segundos")
+    print(f"Número de bloques a procesar: {len(bloques_equipo)} ({_describir_estados_bloque(procedencia)})")
+    
+    # Extraer TODOS los targets únicos con su fuente desde el índice
+    targets_con_fuente = targets_con_fuente_desde_indice(procedencia)
+    print(f"Total de targets únicos con fuente encontrados: {len(targets_con_fuente)}")
     
-    # Dividir el contenido por bloques de equipo - Compatible con NSP 19 y NSP 24
+    # Procesar los bloques por lotes según el plan de ejecución; los resultados se fusionan en el orden de los bloques
+    limite_bloque = resolver_limite_bloque(limite_bloque)
+    umbral_fragmento = resolver_umbral_fragmento(umbral_fragmento)
     t_inicio = time.time()
     
-    # MEJORADO: Patrón más flexible para detectar encabezados de todos los formatos NSP
-    patron_bloques = r'#\s*Script Name:[^\n]+\s+Script Version:[^\n]+\s+Target:'
-    bloques_equipo = re.split(patron_bloques, contenido)
+    tablas = TABLAS_RESUMEN if diferido else TABLAS_RESULTADO
+    derrame = nuevo_derrame(resolver_presupuesto_memoria(memoria_maxima))
+    # Los archivos derramados se eliminan aunque el procesamiento se interrumpa
+    try:
+        acumulado, plan = _procesar_planificado(bloques_equipo, tablas, modo, workers, limite_bloque, umbral_fragmento, derrame)
+        
+        print(describir_plan(plan, time.time() - t_inicio))
+        if derrame:
+            print(describir_derrame(derrame))
+        print(describir_estadisticas_duplicados(estadisticas_duplicados(registro_duplicados, time.time() - t_inicio)))
+        print(describir_estadisticas_extractores(acumulado['extractores']))
+        
+        # Registrar los bloques en cuarentena en el índice y, si se pide, reintentarlos
+        _resolver_cuarentena(acumulado, procedencia, limite_bloque, reintentar_cuarentena, tablas)
+        
+        # Identificar equipos no leídos (errores de conexión y bloques en cuarentena) desde el índice
+        equipos_no_leidos = identificar_equipos_no_leidos_desde_indice(procedencia)
+        df_no_leidos = crear_dataframe_equipos_no_leidos(equipos_no_leidos)
+        
+        if diferido:
+            from parser.dataset_diferido import DatasetDiferido
+            
+            # Los bloques se conservan hasta que se procesen las tablas diferidas
+            tablas_resumen = {tabla: _construir_dataframe(tabla, acumulado[tabla]) for tabla in TABLAS_RESUMEN}
+            df_resumen = generar_resumen_completo_con_fuente(
+                targets_con_fuente, tablas_resumen['servicios'], tablas_resumen['puertos'], tablas_resumen['chassis'], tablas_resumen['version'],
+                tipos_chassis=acumulado['tipos_chassis'], procedencia=procedencia
+            )
+            print(f"Total de equipos en resumen: {len(df_resumen)}")
+            
+            # Las tablas diferidas se planifican de nuevo al procesarlas, con el modo y los workers indicados
+            procesar = partial(procesar_tablas, bloques_equipo, modo=modo, workers=workers, umbral_fragmento=umbral_fragmento or 0)
+            dataset = DatasetDiferido(procesar, tablas_resumen, df_resumen, df_no_leidos)
+            if precargar:
+                dataset.precargar()
+            return dataset
+        
+        # Liberar los bloques de texto antes del resumen: el tipo de chassis ya se obtuvo al procesarlos
+        del bloques_equipo
+        
+        # Contar servicios y puertos desde las tablas derramadas, antes de unirlas
+        conteos = _conteos_resumen(acumulado)
+        
+        # Concatenar resultados en DataFrames
+        resultados = _concatenar_acumulado(acumulado, tablas)
+        
+        # Generar DataFrame de resumen basado en TODOS los targets con fuente
+        t_inicio = time.time()
+        df_resumen = generar_resumen_completo_con_fuente(
+            targets_con_fuente, resultados['servicios'], resultados['puertos'], resultados['chassis'], resultados['version'],
+            tipos_chassis=acumulado['tipos_chassis'], procedencia=procedencia, conteos=conteos
+        )
+        print(f"Tiempo de generación de resumen: {time.time() - t_inicio:.2f} segundos")
+        print(f"Total de equipos en resumen: {len(df_resumen)}")
+        
+        return resultados['servicios'], resultados['puertos'], resultados['chassis'], resultados['version'], resultados['mda'], df_resumen, df_no_leidos
+    finally:
+        cerrar_derrame(derrame)
+
+def procesar_archivos(archivos, modo=None, workers=None, directorio_cache=None, limite_bloque=None, reintentar_cuarentena=False, umbral_fragmento=None, lectura=None, memoria_maxima=None, diferido=False, precargar=False):
+    """
+    Procesa archivos NSP en modo streaming, leyendo cada archivo línea por línea.
+    Solo los lotes de bloques en proceso viven en memoria a la vez, por lo que el consumo
+    de memoria no depende del tamaño total de los archivos.
+    En lectura 'bytes', los archivos se mapean en memoria y los bloques no se decodifican:
+    los extractores cortan las filas sobre los bytes y solo decodifican los campos.
+    
+    Args:
+        archivos (list): Rutas a los archivos .txt o archivos binarios subidos
+        modo (str, optional): Modo de ejecución ('secuencial', 'hilos' o 'procesos').
+            Si no se indica, se usa la variable de entorno NSP_MODO_PROCESAMIENTO.
+        workers (int, optional): Número de workers. Si no se indica, se usa la variable
+            de entorno NSP_WORKERS o el número de núcleos.
+        directorio_cache (str, optional): Directorio de la caché de resultados por archivo.
+            Si se indica, solo se procesan los archivos (rutas) nuevos o modificados y el resto
+            se lee de la caché (ver cache_procesamiento).
+        limite_bloque (float, optional): Tiempo máximo por bloque en segundos (ver procesar_datos). Solo se
+            aplica en modo 'procesos' o en la ejecución secuencial desde el hilo principal; si no se aplica,
+            se muestra un aviso.
+        reintentar_cuarentena (bool): Reintentar los bloques en cuarentena (ver procesar_datos)
+        umbral_fragmento (int, optional): Líneas a partir de las cuales se fragmenta una sección (ver procesar_datos)
+        lectura (str, optional): 'texto' o 'bytes'. Si no se indica, se usa la variable de entorno
+            NSP_LECTURA (por defecto, 'texto'); los resultados son los mismos en ambos modos.
+        memoria_maxima (float, optional): Memoria máxima en MB de las tablas acumuladas (ver procesar_datos)
+        diferido (bool): Si es True, solo se procesan las tablas del resumen y se devuelve un
+            DatasetDiferido que procesa las demás (descripciones, MDA) al acceder a ellas, leyendo
+            de nuevo los archivos (o la caché) solo con sus extractores.
+        precargar (bool): En modo diferido, procesar las tablas restantes en segundo plano.
     
-    # Eliminar el primer elemento si está vacío
-    if bloques_equipo and not bloques_equipo[0].strip():
-        bloques_equipo.pop(0)
+    Returns:
+        tuple: Tupla con los DataFrames (servicios, puertos, chassis, versiones, mda, resumen, equipos_no_leidos),
+            o DatasetDiferido si diferido es True
+    """
+    # Los bloques se leen en streaming: el plan se basa en el tamaño de los archivos y los lotes se envían en orden
+    plan = planificar(modo=modo, workers=workers, total_bytes=_tamano_archivos(archivos))
+    modo, workers = plan['modo'], plan['workers']
+    limite_bloque = resolver_limite_bloque(limite_bloque)
+    umbral_fragmento = resolver_umbral_fragmento(umbral_fragmento)
+    lectura = resolver_lectura(lectura)
+    derrame = nuevo_derrame(resolver_presupuesto_memoria(memoria_maxima))
+    tablas = TABLAS_RESUMEN if diferido else TABLAS_RESULTADO
+    t_inicio = time.time()
     
-    print(f"Tiempo de división en bloques: {time.time() - t_inicio:.2f} segundos")
-    print(f"Número de bloques a procesar: {len(bloques_equipo)}")
-    
-    # Listas para almacenar resultados de cada equipo
-    servicios_list = []
-    puertos_list = []
-    descripciones_list = []
-    chassis_list = []
-    versiones_list = []
-    mda_list = []
-    
-    # Función para procesar un bloque de equipo
-    def procesar_bloque(bloque):
-        if not bloque.strip():
-            return None
-        
-        # Extraer el nombre del target - Compatible con ambos formatos
-        target_match = re.match(r'^([^\s#]+)', bloque)
-        if not target_match:
-            return None
+    # Los archivos derramados se eliminan aunque el procesamiento se interrumpa
+    try:
+        acumulado, procedencia = _acumular_archivos(archivos, tablas, modo, workers, directorio_cache, limite_bloque, reintentar_cuarentena, umbral_fragmento, lectura, derrame)
         
-        target = target_match.group(1)
+        print(describir_plan(plan, time.time() - t_inicio))
+        if derrame:
+            print(describir_derrame(derrame))
+        print(describir_estadisticas_extractores(acumulado['extractores']))
+        print(f"Número de bloques: {len(procedencia)} ({_describir_estados_bloque(procedencia)})")
         
-        # Procesar cada comando en el bloque
-        servicios = extraer_servicios(bloque, target)
-        puertos = extraer_puertos(bloque, target)
-        descripciones = extraer_descripciones_puertos(bloque, target)
-        chassis_info = extraer_chassis(bloque, target)
-        version = extraer_version(bloque, target)
-        mda_info = extraer_mda(bloque, target)
+        resultados, df_resumen, df_no_leidos = _generar_resultados(acumulado, procedencia, tablas)
+    finally:
+        cerrar_derrame(derrame)
+    
+    if diferido:
+        from parser.dataset_diferido import DatasetDiferido
         
-        return {
-            'target': target,
-            'servicios': servicios,
-            'puertos': puertos,
-            'descripciones': descripciones,
-            'chassis': chassis_info,
-            'version': version,
-            'mda': mda_info
-        }
+        # Las tablas diferidas se construyen con una nueva pasada sobre los archivos, con la misma configuración
+        procesar = partial(
+            procesar_tablas_archivos, archivos, modo=modo, workers=workers, directorio_cache=directorio_cache, limite_bloque=limite_bloque,
+            reintentar_cuarentena=reintentar_cuarentena, umbral_fragmento=umbral_fragmento, lectura=lectura, memoria_maxima=memoria_maxima
+        )
+        dataset = DatasetDiferido(procesar, resultados, df_resumen, df_no_leidos)
+        if precargar:
+            dataset.precargar()
+        return dataset
+    
+    return resultados['servicios'], resultados['puertos'], resultados['chassis'], resultados['version'], resultados['mda'], df_resumen, df_no_leidos
+
+def procesar_tablas_archivos(archivos, tablas, modo=None, workers=None, directorio_cache=None, limite_bloque=None, reintentar_cuarentena=False, umbral_fragmento=None, lectura=None, memoria_maxima=None):
+    """
+    Procesa los archivos solo con los extractores de las tablas indicadas. Los bloques se deduplican
+    y se fusionan igual que en procesar_archivos, por lo que las filas coinciden con las del procesamiento completo.
+    Lo usa DatasetDiferido para construir las tablas que no se procesaron de inmediato.
     
-    # Procesar bloques en paralelo para equipos con muchos datos
-    if len(bloques_equipo) > 10:
-        t_inicio = time.time()
+    Args:
+        archivos (list): Rutas a los archivos .txt o archivos binarios subidos
+        tablas (list): Tablas a extraer (nombres de TABLAS_BLOQUE)
+        Los demás argumentos son los de procesar_archivos.
+    
+    Returns:
+        dict: tabla -> DataFrame
+    """
+    plan = planificar(modo=modo, workers=workers, total_bytes=_tamano_archivos(archivos))
+    derrame = nuevo_derrame(resolver_presupuesto_memoria(memoria_maxima))
+    t_inicio = time.time()
+    
+    try:
+        acumulado, _ = _acumular_archivos(
+            archivos, tablas, plan['modo'], plan['workers'], directorio_cache, resolver_limite_bloque(limite_bloque), reintentar_cuarentena,
+            resolver_umbral_fragmento(umbral_fragmento), resolver_lectura(lectura), derrame
+        )
         
-        with ThreadPoolExecutor(max_workers=min(10, len(bloques_equipo))) as executor:
-            # Enviar bloques a procesar
-            futures = {executor.submit(procesar_bloque, bloque): i for i, bloque in enumerate(bloques_equipo)}
+        print(describir_plan(plan, time.time() - t_inicio))
+        if acumulado['extractores']:
+            print(describir_estadisticas_extractores(acumulado['extractores']))
+        return _concatenar_acumulado(acumulado, tablas)
+    finally:
+        cerrar_derrame(derrame)
+
+def _acumular_archivos(archivos, tablas, modo, workers, directorio_cache, limite_bloque, reintentar_cuarentena, umbral_fragmento, lectura, derrame):
+    """
+    Procesa los archivos (con la caché, si se indica su directorio) con los extractores de las tablas
+    indicadas y resuelve los bloques en cuarentena.
+    
+    Returns:
+        tuple: (acumulado, procedencia)
+    """
+    avisar_limite_inactivo(limite_bloque, modo, workers)
+    t_inicio = time.time()
+    registro_duplicados = nuevo_registro_duplicados()
+    if directorio_cache:
+        acumulado, procedencia = _procesar_archivos_con_cache(archivos, modo, workers, directorio_cache, registro_duplicados, limite_bloque, umbral_fragmento, lectura, derrame, tablas)
+    else:
+        acumulado, procedencia = _procesar_flujo_archivos(archivos, modo, workers, registro_duplicados, limite_bloque, umbral_fragmento, lectura, derrame, tablas)
+    print(describir_estadisticas_duplicados(estadisticas_duplicados(registro_duplicados, time.time() - t_inicio)))
+    
+    _resolver_cuarentena(acumulado, procedencia, limite_bloque, reintentar_cuarentena, tablas)
+    return acumulado, procedencia
+
+def _procesar_flujo_archivos(archivos, modo, workers, registro_duplicados=None, limite_bloque=None, umbral_fragmento=None, lectura=None, derrame=None, tablas=TABLAS_BLOQUE):
+    """
+    Procesa los bloques de los archivos en modo streaming.
+    Los bloques cuyo cuerpo ya se procesó (exportaciones que se solapan) no se vuelven a procesar
+    y los equipos con secciones muy grandes se procesan por fragmentos. Con registro de derrame,
+    las tablas acumuladas se derraman a disco al superar el presupuesto de memoria.
+    
+    Returns:
+        tuple: (acumulado, procedencia) con los resultados columnares y el índice de procedencia;
+            'bloques' del acumulado tiene el hash del cuerpo y las filas por tabla de cada bloque procesado
+            y 'tablas' las tablas extraídas
+    """
+    procedencia = []
+    hashes_partes = []
+    if registro_duplicados is None:
+        registro_duplicados = nuevo_registro_duplicados()
+    
+    # Registrar la procedencia de cada bloque en el proceso principal y enviar solo el texto de los bloques
+    # correctos y no duplicados a los workers, con su fuente
+    def bloques_archivos():
+        bloques = dividir_bloques_bytes(archivos) if lectura == LECTURA_BYTES else ensamblar_bloques(tokenizar_archivos(archivos))
+        for info, bloque in bloques:
+            entrada = entrada_procedencia(info)
+            entrada['estado_bloque'] = clasificar_bloque(entrada, bloque)
+            procedencia.append(entrada)
+            if entrada['estado_bloque'] == ESTADO_BLOQUE_OK and registrar_bloque(registro_duplicados, entrada, bloque, len(procedencia) - 1):
+                yield etiquetar_fuente(bloque, entrada['fuente'])
+    
+    # Las partes de un bloque (o sus fragmentos) se generan justo después de leerlo: su cuerpo es el del último bloque registrado
+    def partes_archivos():
+        for parte in fragmentar_bloques(bloques_archivos(), umbral_fragmento):
+            hashes_partes.append(procedencia[-1]['hash_cuerpo'])
+            yield parte
+    
+    transferencia = resolver_transferencia() if modo == MODO_PROCESOS else None
+    lotes = crear_lotes(partes_archivos(), aislar=es_fragmento)
+    acumulado = _fusionar_resultados(ejecutar_lotes(partial(procesar_lote, tablas=tablas, limite_bloque=limite_bloque, transferencia=transferencia), lotes, modo, workers), transferencia, derrame)
+    acumulado['bloques'] = _filas_por_bloque(hashes_partes, acumulado.pop('filas_bloque'))
+    acumulado['tablas'] = list(tablas)
+    
+    return acumulado, procedencia
+
+def _filas_por_bloque(hashes_partes, filas_partes):
+    """
+    Agrupa las filas por tabla de cada parte procesada (bloque o fragmento) por bloque de origen.
+    Las partes de un bloque son consecutivas y sus filas también lo son en cada tabla.
+    
+    Args:
+        hashes_partes (list): Hash del cuerpo del bloque de origen de cada parte, en orden
+        filas_partes (list): Filas agregadas por cada parte a cada tabla de TABLAS_BLOQUE, en el mismo orden
+    
+    Returns:
+        list: [hash_cuerpo, filas por tabla] de cada bloque, en orden
+    """
+    bloques = []
+    for hash_cuerpo, filas in zip(hashes_partes, filas_partes):
+        if bloques and bloques[-1][0] == hash_cuerpo:
+            bloques[-1][1] = [previas + nuevas for previas, nuevas in zip(bloques[-1][1], filas)]
+        else:
+            bloques.append([hash_cuerpo, list(filas)])
+    return bloques
+
+def _procesar_archivos_con_cache(archivos, modo, workers, directorio_cache, registro_duplicados=None, limite_bloque=None, umbral_fragmento=None, lectura=None, derrame=None, tablas=TABLAS_BLOQUE):
+    """
+    Procesa los archivos usando la caché por hash de contenido: los archivos sin cambios se
+    leen de la caché y solo se procesan los nuevos o modificados. Los resultados se fusionan
+    en el orden de los archivos, igual que en el procesamiento completo. Cada archivo se procesa
+    (y se guarda en la caché) como única entrada de su lista; sus referencias reciben al fusionarlo
+    la posición del archivo en la lista completa. Los resultados de cada archivo se guardan en la caché
+    completos, por lo que el presupuesto de memoria se aplica al fusionarlos.
+    Cada archivo se deduplica por separado, por lo que al fusionarlo se descartan las filas de sus bloques
+    cuyo cuerpo ya llegó en un archivo anterior; sus entradas se registran en registro_duplicados.
+    Si la entrada de un archivo no tiene todas las tablas indicadas, el archivo se procesa solo con las
+    que faltan y se agregan a la entrada. Los resultados con bloques en cuarentena no se guardan en la caché.
+    
+    Returns:
+        tuple: (acumulado, procedencia)
+    """
+    if registro_duplicados is None:
+        registro_duplicados = nuevo_registro_duplicados()
+    indice = cargar_indice(directorio_cache)
+    
+    acumulado = _crear_acumulado()
+    procedencia = []
+    procesados = 0
+    
+    for id_archivo, archivo in enumerate(archivos):
+        # Los archivos subidos (sin ruta en disco) se procesan siempre
+        if not isinstance(archivo, (str, os.PathLike)):
+            resultado_archivo = _procesar_flujo_archivos([archivo], modo, workers, limite_bloque=limite_bloque, umbral_fragmento=umbral_fragmento, lectura=lectura, tablas=tablas)
+            procesados += 1
+        else:
+            hash_archivo = obtener_hash(archivo, indice)
+            resultado_archivo = leer_resultado(directorio_cache, hash_archivo)
+            faltantes = tablas if resultado_archivo is None else [tabla for tabla in tablas if tabla not in resultado_archivo[0]['tablas']]
             
-            # Recoger resultados a medida que se completan
-            for future in as_completed(futures):
-                resultado = future.result()
-                if resultado:
-                    if resultado['servicios'] is not None:
-                        servicios_list.append(resultado['servicios'])
-                    if resultado['puertos'] is not None:
-                        puertos_list.append(resultado['puertos'])
-                    if resultado['descripciones'] is not None:
-                        descripciones_list.append(resultado['descripciones'])
-                    if resultado['chassis'] is not None:
-                        chassis_list.append(resultado['chassis'])
-                    if resultado['version'] is not None:
-                        versiones_list.append(resultado['version'])
-                    if resultado['mda'] is not None:
-                        mda_list.append(resultado['mda'])
+            if faltantes:
+                resultado_nuevo = _procesar_flujo_archivos([archivo], modo, workers, limite_bloque=limite_bloque, umbral_fragmento=umbral_fragmento, lectura=lectura, tablas=faltantes)
+                resultado_archivo = resultado_nuevo if resultado_archivo is None else _completar_resultado(resultado_archivo, resultado_nuevo)
+                # Los resultados con bloques en cuarentena dependen del límite de tiempo y del reintento, que no forman
+                # parte de la entrada: no se guardan y el archivo se vuelve a procesar en la próxima ejecución
+                if not resultado_archivo[0]['cuarentena']:
+                    guardar_resultado(directorio_cache, hash_archivo, resultado_archivo)
+                procesados += 1
         
-        print(f"Tiempo de procesamiento paralelo: {time.time() - t_inicio:.2f} segundos")
-    else:
-        # Procesamiento secuencial para pocos equipos
-        t_inicio = time.time()
+        acumulado_archivo, procedencia_archivo = resultado_archivo
+        if id_archivo:
+            _asignar_id_archivo(acumulado_archivo, procedencia_archivo, id_archivo)
+        _descartar_bloques(acumulado_archivo, _registrar_procedencia(registro_duplicados, procedencia_archivo, len(procedencia)))
+        _fusionar_acumulado(acumulado, acumulado_archivo)
+        derramar_si_excede(derrame, acumulado, TABLAS_BLOQUE)
+        procedencia.extend(procedencia_archivo)
+    
+    # Conservar solo las entradas de archivos que siguen existiendo
+    indice = {ruta: entrada for ruta, entrada in indice.items() if os.path.exists(ruta)}
+    guardar_indice(directorio_cache, indice)
+    limpiar_cache(directorio_cache, indice)
+    
+    print(f"Archivos procesados: {procesados}; leídos de la caché: {len(archivos) - procesados}")
+    
+    return acumulado, procedencia
+
+def _completar_resultado(resultado, resultado_nuevo):
+    """
+    Agrega a los resultados de un archivo en la caché las tablas de un nuevo procesamiento del mismo
+    archivo con otras tablas. Ambos deduplican los mismos bloques en el mismo orden, por lo que las
+    filas por bloque de las tablas nuevas se suman a las existentes.
+    
+    Args:
+        resultado (tuple): (acumulado, procedencia) leídos de la caché
+        resultado_nuevo (tuple): (acumulado, procedencia) del nuevo procesamiento
+    
+    Returns:
+        tuple: (acumulado, procedencia) con las tablas de ambos
+    """
+    acumulado, procedencia = resultado
+    nuevo = resultado_nuevo[0]
+    
+    for tabla in nuevo['tablas']:
+        acumulado[tabla] = nuevo[tabla]
+    acumulado['tablas'] = acumulado['tablas'] + nuevo['tablas']
+    acumulado['bloques'] = [
+        [hash_cuerpo, [previas + nuevas for previas, nuevas in zip(filas, filas_nuevas)]]
+        for (hash_cuerpo, filas), (_, filas_nuevas) in zip(acumulado['bloques'], nuevo['bloques'])
+    ]
+    acumulado['tipos_chassis'].update(nuevo['tipos_chassis'])
+    en_cuarentena = {registro['hash_cuerpo'] for registro in acumulado['cuarentena']}
+    acumulado['cuarentena'].extend(registro for registro in nuevo['cuarentena'] if registro['hash_cuerpo'] not in en_cuarentena)
+    fusionar_estadisticas(acumulado['extractores'], nuevo['extractores'])
+    
+    return acumulado, procedencia
+
+def _registrar_procedencia(registro_duplicados, procedencia_archivo, posicion_inicial):
+    """
+    Registra las entradas de un archivo en el registro de duplicados de todos los archivos, con su
+    posición en el índice completo ('duplicado_de' se recalcula con esas posiciones).
+    
+    Returns:
+        set: Hashes de los bloques procesados en el archivo que ya se habían procesado en un archivo anterior
+    """
+    previos = set()
+    for posicion, entrada in enumerate(procedencia_archivo, posicion_inicial):
+        if entrada.get('hash_cuerpo') is None:
+            continue
+        procesado = 'duplicado_de' not in entrada
+        if not registrar_entrada(registro_duplicados, entrada, posicion) and procesado:
+            previos.add(entrada['hash_cuerpo'])
+    return previos
+
+def _descartar_bloques(acumulado, hashes):
+    """
+    Elimina de los resultados de un archivo las filas y la cuarentena de los bloques indicados,
+    ubicando las filas de cada bloque con 'bloques' (ver _procesar_flujo_archivos).
+    
+    Args:
+        acumulado (dict): Resultados de un archivo
+        hashes (set): Hashes del cuerpo de los bloques a descartar
+    """
+    if not hashes:
+        return
+    
+    conservar = {tabla: [] for tabla in TABLAS_BLOQUE}
+    for hash_cuerpo, filas in acumulado['bloques']:
+        for tabla, cantidad in zip(TABLAS_BLOQUE, filas):
+            conservar[tabla].extend([hash_cuerpo not in hashes] * cantidad)
+    
+    for tabla in TABLAS_BLOQUE:
+        parcial = acumulado[tabla]
+        mascara = conservar[tabla]
+        if all(mascara):
+            continue
+        posicion = 0
+        segmentos = []
+        for segmento in parcial['segmentos']:
+            segmentos.append(filtrar_filas(segmento, mascara[posicion:posicion + segmento.num_rows]))
+            posicion += segmento.num_rows
+        parcial['segmentos'] = segmentos
+        if parcial['filas']:
+            mascara = mascara[posicion:]
+            parcial['columnas'] = {columna: list(compress(valores, mascara)) for columna, valores in parcial['columnas'].items()}
+            parcial['filas'] = sum(mascara)
+    
+    acumulado['bloques'] = [bloque for bloque in acumulado['bloques'] if bloque[0] not in hashes]
+    acumulado['cuarentena'] = [registro for registro in acumulado['cuarentena'] if registro['hash_cuerpo'] not in hashes]
+
+def _asignar_id_archivo(acumulado, procedencia, id_archivo):
+    """
+    Asigna el índice del archivo a las referencias de los resultados de un solo archivo
+    (procesado como el archivo 0 de su lista, ver referencias_origen).
+    """
+    def asignar(valor):
+        return None if valor is None else id_archivo
+    
+    for tabla in TABLAS_BLOQUE:
+        parcial = acumulado[tabla]
+        if 'id_archivo' in parcial['columnas']:
+            parcial['columnas']['id_archivo'] = [asignar(valor) for valor in parcial['columnas']['id_archivo']]
+        parcial['segmentos'] = [reemplazar_valores(segmento, 'id_archivo', asignar) for segmento in parcial['segmentos']]
+    
+    for entrada in procedencia:
+        if entrada.get('id_archivo') is not None:
+            entrada['id_archivo'] = id_archivo
+        if entrada.get('error') and entrada['error'].get('id_archivo') is not None:
+            entrada['error']['id_archivo'] = id_archivo
+
+def _resolver_cuarentena(acumulado, procedencia, limite_bloque, reintentar=False, tablas=TABLAS_BLOQUE):
+    """
+    Registra en el índice de procedencia los bloques que superaron el tiempo máximo
+    (estado 'cuarentena' y datos de error, para reportarlos con los equipos no leídos).
+    Si se pide, los reintenta en el proceso principal con un límite mayor y sin extraer la versión;
+    las filas de los reintentos correctos se agregan al final de las tablas.
+    Cada bloque se reporta y se reintenta con el límite que superó, guardado en su registro.
+    
+    Args:
+        acumulado (dict): Resultados acumulados, con la lista 'cuarentena' de los workers
+        procedencia (list): Índice de procedencia
+        limite_bloque (float): Tiempo máximo por bloque usado en el procesamiento, para los registros sin límite
+        reintentar (bool): Reintentar los bloques en cuarentena
+        tablas (list): Tablas procesadas
+    """
+    cuarentena = acumulado['cuarentena']
+    if not cuarentena:
+        return
+    
+    # Entradas procesadas (no duplicadas) por hash del cuerpo, para ubicar archivo y offset
+    entradas_por_hash = {}
+    for entrada in procedencia:
+        if entrada.get('hash_cuerpo') and 'duplicado_de' not in entrada:
+            entradas_por_hash.setdefault(entrada['hash_cuerpo'], []).append(entrada)
+    
+    pendientes = []
+    recuperados = 0
+    for registro in cuarentena:
+        limite = registro.get('limite') or limite_bloque
+        if reintentar:
+            acumulado_reintento = _crear_acumulado()
+            limite_reintento = limite * FACTOR_LIMITE_REINTENTO if limite else None
+            if _procesar_bloque_con_limite(registro['bloque'], acumulado_reintento, [tabla for tabla in tablas if tabla in TABLAS_REINTENTO], limite_reintento):
+                _fusionar_acumulado(acumulado, acumulado_reintento)
+                recuperados += 1
+                continue
         
-        for bloque in bloques_equipo:
-            resultado = procesar_bloque(bloque)
-            if resultado:
-                if resultado['servicios'] is not None:
-                    servicios_list.append(resultado['servicios'])
-                if resultado['puertos'] is not None:
-                    puertos_list.append(resultado['puertos'])
-                if resultado['descripciones'] is not None:
-                    descripciones_list.append(resultado['descripciones'])
-                if resultado['chassis'] is not None:
-                    chassis_list.append(resultado['chassis'])
-                if resultado['version'] is not None:
-                    versiones_list.append(resultado['version'])
-                if resultado['mda'] is not None:
-                    mda_list.append(resultado['mda'])
+        entradas = entradas_por_hash.get(registro['hash_cuerpo']) or [{}]
+        entrada = entradas.pop(0) if len(entradas) > 1 else entradas[0]
         
-        print(f"Tiempo de procesamiento secuencial: {time.time() - t_inicio:.2f} segundos")
-    
-    # Concatenar resultados en DataFrames
-    if servicios_list:
-        df_servicios = pd.concat(servicios_list, ignore_index=True)
-    if puertos_list:
-        df_puertos = pd.concat(puertos_list, ignore_index=True)
-    if descripciones_list:
-        df_descripciones = pd.concat(descripciones_list, ignore_index=True)
-    if chassis_list:
-        df_chassis = pd.concat(chassis_list, ignore_index=True)
-    if versiones_list:
-        df_versiones = pd.concat(versiones_list, ignore_index=True)
-    if mda_list:
-        df_mda = pd.concat(mda_list, ignore_index=True)
+        # Varios fragmentos del mismo equipo pueden superar el límite; el bloque se reporta una vez
+        if entrada.get('estado_bloque') == ESTADO_BLOQUE_CUARENTENA:
+            continue
+        entrada['estado_bloque'] = ESTADO_BLOQUE_CUARENTENA
+        entrada['error'] = {
+            'target': registro['target'],
+            'fuente': entrada.get('fuente'),
+            'archivo': entrada.get('archivo'),
+            'error': f"Bloque en cuarentena: el procesamiento superó {limite:g} segundos" if limite else "Bloque en cuarentena: el procesamiento superó el tiempo máximo",
+            'error_detallado': f"Offset {entrada.get('offset')}" if entrada.get('offset') is not None else None,
+            'tipo_error': 'Cuarentena',
+            **entrada_referencia(entrada)
+        }
+        pendientes.append(registro['target'])
+    
+    acumulado['cuarentena'] = []
+    if recuperados:
+        print(f"Bloques recuperados al reintentar (sin versión): {recuperados}")
+    if pendientes:
+        print(f"Bloques en cuarentena por tiempo excedido: {len(pendientes)} ({', '.join(pendientes)})")
+
+def _describir_estados_bloque(procedencia):
+    """
+    Describe el número de bloques por estado para los mensajes de progreso.
+    """
+    conteo = contar_estados_bloque(procedencia)
+    return ', '.join(f"{estado}: {cantidad}" for estado, cantidad in conteo.items())
+
+def _generar_resultados(acumulado, procedencia, tablas=TABLAS_RESULTADO):
+    """
+    Construye las tablas indicadas, el resumen y los equipos no leídos a partir de los
+    resultados acumulados y el índice de procedencia.
+    
+    Returns:
+        tuple: (tablas, resumen, equipos_no_leidos), con las tablas en un diccionario tabla -> DataFrame
+    """
+    from parser.identificar_no_leidos import identificar_equipos_no_leidos_desde_indice, crear_dataframe_equipos_no_leidos
+    
+    df_no_leidos = crear_dataframe_equipos_no_leidos(identificar_equipos_no_leidos_desde_indice(procedencia))
+    targets_con_fuente = targets_con_fuente_desde_indice(procedencia)
+    conteos = _conteos_resumen(acumulado)
+    resultados = _concatenar_acumulado(acumulado, tablas)
     
     # Generar DataFrame de resumen basado en TODOS los targets con fuente
     t_inicio = time.time()
-    df_resumen = generar_resumen_completo_con_fuente(targets_con_fuente, df_servicios, df_puertos, df_chassis, df_versiones, bloques_equipo)
+    df_resumen = generar_resumen_completo_con_fuente(
+        targets_con_fuente, resultados['servicios'], resultados['puertos'], resultados['chassis'], resultados['version'],
+        tipos_chassis=acumulado['tipos_chassis'], procedencia=procedencia, conteos=conteos
+    )
     print(f"Tiempo de generación de resumen: {time.time() - t_inicio:.2f} segundos")
     print(f"Total de equipos en resumen: {len(df_resumen)}")
     
-    return df_servicios, df_puertos, df_chassis, df_versiones, df_mda, df_resumen, df_no_leidos
+    return resultados, df_resumen, df_no_leidos
 
-def extraer_todos_los_targets_con_fuente(contenido):
+def procesar_bloque(bloque, acumulado, tablas=TABLAS_BLOQUE):
     """
-    Extrae todos los targets únicos del contenido, preservando la fuente.
-    ACTUALIZADO: Ahora detecta la fuente NSP19/NSP24 directamente desde la línea 'Saved Result File Name'.
+    Procesa el bloque de texto de un equipo con los extractores de las tablas indicadas.
+    Los comandos del bloque se indexan en una sola pasada y cada extractor recibe solo
+    el texto de su sección; las filas se agregan a los buffers columnares del acumulado,
+    sin crear un DataFrame por bloque.
+    
+    Los bloques en bytes (lectura 'bytes') se procesan sin decodificar; solo se decodifican
+    el target y las secciones pequeñas de chassis, versión y MDA.
+    Los servicios y puertos de los bloques etiquetados con su fuente se extraen con el extractor
+    especializado de la fuente y, si la sección no sigue sus diseños conocidos, con el genérico.
+    Si el bloque tiene línea de origen, cada fila lleva su referencia en el archivo (ver referencias_origen).
     
     Args:
-        contenido (str): Contenido completo de los archivos
+        bloque (str o bytes): Bloque de texto del equipo (comienza con el nombre del target)
+        acumulado (dict): Estructura columnar donde se agregan los resultados (ver _crear_acumulado)
+        tablas (list): Tablas a extraer (por defecto, todas las de TABLAS_BLOQUE)
+    
+    Returns:
+        str: Target del bloque o None si el bloque no tiene target
+    """
+    if not bloque.strip():
+        return None
+    
+    # Extraer el nombre del target - Compatible con ambos formatos
+    target = target_bloque(bloque)
+    if target is None:
+        return None
+    
+    # Procesar cada comando con el texto de su sección
+    secciones = indexar_secciones(bloque)
+    en_bytes = isinstance(bloque, bytes)
+    fuente = fuente_bloque(bloque)
+    localizador = nuevo_localizador(bloque)
+    
+    if 'servicios' in tablas:
+        texto = texto_seccion(bloque, secciones, COMANDO_SERVICIOS)
+        _extraer_referenciado(acumulado['servicios'], localizador, secciones, (COMANDO_SERVICIOS,), texto,
+                              lambda lineas: _extraer_con_fuente(fuente, 'servicios', texto, target, acumulado, extraer_servicios, lineas))
+    if 'puertos' in tablas:
+        texto = texto_seccion(bloque, secciones, COMANDO_PUERTOS)
+        _extraer_referenciado(acumulado['puertos'], localizador, secciones, (COMANDO_PUERTOS,), texto,
+                              lambda lineas: _extraer_con_fuente(fuente, 'puertos', texto, target, acumulado, extraer_puertos, lineas))
+    if 'descripciones' in tablas:
+        texto = texto_seccion(bloque, secciones, COMANDO_DESCRIPCIONES)
+        _extraer_referenciado(acumulado['descripciones'], localizador, secciones, (COMANDO_DESCRIPCIONES,), texto,
+                              lambda lineas: extraer_descripciones_puertos(texto, target, acumulado['descripciones'], lineas))
+    if 'chassis' in tablas:
+        # La sección 'show chassis' se lee una sola vez para los campos del chassis y el tipo de equipo
+        campos_chassis = leer_campos_chassis(_decodificar(texto_seccion(bloque, secciones, COMANDO_CHASSIS), en_bytes))
+        filas_previas = acumulado['chassis']['filas']
+        extraer_chassis(campos_chassis, target, acumulado['chassis'])
+        _referenciar_seccion(acumulado['chassis'], filas_previas, localizador, secciones, COMANDO_CHASSIS)
         
+        # Tipo de equipo de 'show chassis', para no volver a recorrer el bloque en el resumen
+        tipo_equipo_chassis = tipo_equipo_desde_campos(campos_chassis)
+        if tipo_equipo_chassis:
+            acumulado['tipos_chassis'][target] = tipo_equipo_chassis
+    if 'version' in tablas:
+        filas_previas = acumulado['version']['filas']
+        extraer_version(_decodificar(texto_seccion(bloque, secciones, COMANDO_VERSION), en_bytes), target, acumulado['version'])
+        _referenciar_seccion(acumulado['version'], filas_previas, localizador, secciones, COMANDO_VERSION)
+    if 'mda' in tablas:
+        comandos_mda = (COMANDO_CARD_DETAIL, COMANDO_MDA, COMANDO_MDA_DETAIL)
+        texto = texto_seccion(bloque, secciones, *comandos_mda)
+        _extraer_referenciado(acumulado['mda'], localizador, secciones, comandos_mda, texto,
+                              lambda lineas: extraer_mda(_decodificar(texto, en_bytes), target, acumulado['mda'], lineas))
+    
+    return target
+
+def _extraer_referenciado(tabla, localizador, secciones, comandos, texto, extraer):
+    """
+    Ejecuta un extractor de filas y, si el bloque tiene línea de origen, agrega a las filas
+    extraídas la referencia de su línea en el archivo.
+    
+    Args:
+        tabla (dict): Tabla acumulada donde el extractor agrega las filas
+        localizador (dict): Localizador del bloque (ver referencias_origen.nuevo_localizador) o None
+        secciones (dict): Índice de secciones del bloque
+        comandos (tuple): Comandos cuyas secciones forman el texto
+        texto (str o bytes): Texto de las secciones, sin decodificar
+        extraer (callable): Función que extrae las filas; recibe la lista donde el extractor
+            agrega el número de línea de cada fila (None si no se referencian)
+    """
+    if not texto:
+        return
+    if localizador is None:
+        extraer(None)
+        return
+    
+    filas_previas = tabla['filas']
+    lineas = []
+    extraer(lineas)
+    if lineas:
+        _agregar_referencias(tabla, filas_previas, referencias_lineas(localizador, secciones, comandos, texto, lineas))
+
+def _referenciar_seccion(tabla, filas_previas, localizador, secciones, comando):
+    """
+    Agrega la referencia de la sección completa a la fila extraída de ella (chassis, versión).
+    """
+    if localizador is not None and tabla['filas'] > filas_previas:
+        referencia = referencia_seccion(localizador, secciones, comando)
+        _agregar_referencias(tabla, filas_previas, {columna: [valor] for columna, valor in referencia.items()})
+
+def _agregar_referencias(tabla, filas_previas, referencias):
+    """
+    Completa las columnas de referencia de las filas agregadas a una tabla a partir de filas_previas.
+    """
+    columnas = tabla['columnas']
+    for columna, valores in referencias.items():
+        if columna in columnas:
+            # Las filas nuevas se completaron con None al agregarlas
+            del columnas[columna][filas_previas:]
+        else:
+            columnas[columna] = [None] * filas_previas
+        columnas[columna].extend(valores)
+
+def _extraer_con_fuente(fuente, nombre_tabla, seccion, target, acumulado, extractor_generico, lineas=None):
+    """
+    Extrae una sección con el extractor especializado de la fuente o, si no puede, con el genérico,
+    y cuenta cuál se usó en las estadísticas del acumulado.
+    
     Returns:
-        list: Lista de tuplas (target, fuente)
+        int: Número de filas agregadas
+    """
+    if not seccion:
+        return 0
+    
+    columnas = extraer_especializado(fuente, nombre_tabla, seccion, target, lineas)
+    registrar_extraccion(acumulado['extractores'], fuente, nombre_tabla, columnas is not None)
+    if columnas is None:
+        return extractor_generico(seccion, target, acumulado[nombre_tabla], lineas)
+    
+    filas = len(columnas['target'])
+    if filas:
+        _agregar_columnas(acumulado[nombre_tabla], columnas, filas)
+    return filas
+
+def target_bloque(bloque):
+    """
+    Obtiene el nombre del equipo de la primera línea del bloque.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo
+    
+    Returns:
+        str: Target o None si el bloque no comienza con un nombre
+    """
+    if isinstance(bloque, bytes):
+        target_match = PATRON_TARGET_BLOQUE_BYTES.match(bloque)
+        return target_match.group(1).decode('utf-8', errors='ignore') if target_match else None
+    
+    target_match = PATRON_TARGET_BLOQUE.match(bloque)
+    return target_match.group(1) if target_match else None
+
+def _decodificar(texto, en_bytes):
     """
-    # Buscar bloques de script con sus targets
-    bloques_script = re.findall(r'#\s*Script Name:[^\n]+\s+Script Version:[^\n]+\s+Target:([^\s#\n]+)[\s\S]+?Saved Result File Name:[^\n]*?([^\n]*)', contenido)
-    
-    # Crear lista de tuplas (target, fuente)
-    targets_con_fuente = []
-    for target, saved_result in bloques_script:
-        # Determinar la fuente basada en la línea 'Saved Result File Name'
-        if 'NSP19' in saved_result:
-            fuente_normalizada = "NSP19"
-        elif 'NSP24' in saved_result:
-            fuente_normalizada = "NSP24"
-        # Fallback para archivos sin indicación explícita en Saved Result File Name
-        elif 'All_Nokia_Devices_NSP19' in contenido:
-            fuente_normalizada = "NSP19"
-        elif 'All_Nokia_Devices_NSP24' in contenido:
-            fuente_normalizada = "NSP24"
-        elif 'All Nokia devices' in contenido:
-            fuente_normalizada = "NSP24"
+    Decodifica el texto de una sección leída en bytes (las secciones de texto se devuelven sin cambios).
+    """
+    return texto.decode('utf-8', errors='ignore') if en_bytes else texto
+
+def procesar_lote(bloques, tablas=TABLAS_BLOQUE, limite_bloque=None, transferencia=None):
+    """
+    Procesa un lote de bloques. Se ejecuta dentro de los workers (hilos o procesos).
+    Devuelve resultados columnares compactos (listas por columna) en lugar de un
+    DataFrame por bloque, para reducir el costo de serialización entre procesos.
+    
+    Args:
+        bloques (list): Lote de bloques de texto
+        tablas (list): Tablas a extraer (por defecto, todas las de TABLAS_BLOQUE)
+        limite_bloque (float, optional): Tiempo máximo por bloque en segundos. Se aplica en los
+            workers de procesos y en la ejecución secuencial desde el hilo principal (ver ejecutor_bloques).
+        transferencia (str, optional): 'arrow' para escribir las tablas del lote como archivos Arrow
+            en memoria compartida y devolver solo sus rutas (ver transferencia_arrow)
+    
+    Returns:
+        dict: Resultados acumulados del lote (ver _crear_acumulado); los bloques que superan el
+            límite se descartan y se registran en 'cuarentena'
+    """
+    acumulado = _crear_acumulado()
+    for bloque in bloques:
+        filas_previas = [acumulado[tabla]['filas'] for tabla in TABLAS_BLOQUE]
+        if limite_bloque:
+            _procesar_bloque_con_limite(bloque, acumulado, tablas, limite_bloque)
         else:
-            fuente_normalizada = "NSP19"  # Default a NSP19 si no se puede determinar
+            procesar_bloque(bloque, acumulado, tablas)
+        acumulado['filas_bloque'].append([acumulado[tabla]['filas'] - previas for tabla, previas in zip(TABLAS_BLOQUE, filas_previas)])
+    
+    if transferencia == TRANSFERENCIA_ARROW:
+        for tabla in TABLAS_BLOQUE:
+            if acumulado[tabla]['filas']:
+                ruta = exportar_tabla(acumulado[tabla]['columnas'])
+                if ruta:
+                    acumulado[tabla] = {'columnas': {}, 'filas': 0, 'segmentos': [], 'archivo': ruta}
+    return acumulado
+
+def _procesar_bloque_con_limite(bloque, acumulado, tablas, limite_bloque):
+    """
+    Procesa un bloque con un tiempo máximo. Si lo supera, se deshacen las filas que el bloque
+    alcanzó a agregar y el bloque se registra en la cuarentena del acumulado.
+    
+    Returns:
+        bool: True si el bloque se procesó dentro del límite
+    """
+    estado_previo = {tabla: (acumulado[tabla]['filas'], set(acumulado[tabla]['columnas'])) for tabla in TABLAS_BLOQUE}
+    tipos_previos = set(acumulado['tipos_chassis'])
+    t_inicio = time.time()
+    
+    try:
+        with limite_tiempo(limite_bloque):
+            procesar_bloque(bloque, acumulado, tablas)
+        return True
+    except TiempoBloqueExcedido:
+        for tabla, (filas, columnas) in estado_previo.items():
+            columnas_tabla = acumulado[tabla]['columnas']
+            for columna in list(columnas_tabla):
+                if columna in columnas:
+                    del columnas_tabla[columna][filas:]
+                else:
+                    del columnas_tabla[columna]
+            acumulado[tabla]['filas'] = filas
+        for target in set(acumulado['tipos_chassis']) - tipos_previos:
+            del acumulado['tipos_chassis'][target]
         
-        targets_con_fuente.append((target, fuente_normalizada))
+        acumulado['cuarentena'].append({
+            'target': target_bloque(bloque),
+            'hash_cuerpo': hash_bloque_origen(bloque),
+            'segundos': time.time() - t_inicio,
+            'limite': limite_bloque,
+            'bloque': bloque
+        })
+        return False
+
+def procesar_tablas(bloques, tablas, modo=None, workers=None, umbral_fragmento=None):
+    """
+    Procesa los bloques solo con los extractores de las tablas indicadas.
+    Lo usa DatasetDiferido para construir las tablas que no se procesaron de inmediato.
     
-    # Eliminar duplicados exactos (mismo target y misma fuente)
-    targets_con_fuente_unicos = []
-    targets_vistos = set()
+    Args:
+        bloques (list): Bloques de texto de los equipos
+        tablas (list): Tablas a extraer (nombres de TABLAS_BLOQUE)
+        modo (str, optional): Modo de ejecución ('secuencial', 'hilos' o 'procesos')
+        workers (int, optional): Número de workers
+        umbral_fragmento (int, optional): Líneas a partir de las cuales se fragmenta una sección (ver procesar_datos)
+    
+    Returns:
+        dict: tabla -> DataFrame
+    """
+    acumulado, plan = _procesar_planificado(bloques, tablas, modo, workers, umbral_fragmento=resolver_umbral_fragmento(umbral_fragmento))
+    print(describir_plan(plan))
+    if acumulado['extractores']:
+        print(describir_estadisticas_extractores(acumulado['extractores']))
+    
+    return {tabla: _construir_dataframe(tabla, acumulado[tabla]) for tabla in tablas}
+
+def _procesar_planificado(bloques, tablas, modo=None, workers=None, limite_bloque=None, umbral_fragmento=None, derrame=None):
+    """
+    Procesa bloques en memoria según un plan de ejecución: los equipos grandes se fragmentan,
+    se mide la entrada para elegir el modo y los workers (ver planificador_bloques) y los lotes
+    se envían del mayor al menor. Los resultados se fusionan en el orden de los bloques.
+    
+    Returns:
+        tuple: (acumulado, plan)
+    """
+    bloques = list(fragmentar_bloques(bloques, umbral_fragmento))
+    plan = planificar([len(bloque) for bloque in bloques], modo, workers)
+    avisar_limite_inactivo(limite_bloque, plan['modo'], plan['workers'])
+    
+    # Los fragmentos y los bloques que por sí solos son una parte grande del trabajo van en un lote propio
+    bytes_aislar = plan['bytes_aislar']
+    lotes = list(crear_lotes(
+        bloques, plan['tamano_lote'],
+        aislar=lambda bloque: es_fragmento(bloque) or (bytes_aislar is not None and len(bloque) >= bytes_aislar)
+    ))
+    
+    transferencia = resolver_transferencia() if plan['modo'] == MODO_PROCESOS else None
+    funcion = partial(procesar_lote, tablas=tablas, limite_bloque=limite_bloque, transferencia=transferencia)
+    acumulado = _fusionar_resultados(ejecutar_lotes_en_orden(funcion, lotes, orden_lpt(lotes), plan['modo'], plan['workers']), transferencia, derrame)
+    
+    return acumulado, plan
+
+def _tamano_archivos(archivos):
+    """
+    Suma el tamaño de los archivos (rutas en disco o archivos subidos con atributo 'size').
     
-    for target, fuente in targets_con_fuente:
-        clave = f"{target}_{fuente}"
-        if clave not in targets_vistos:
-            targets_vistos.add(clave)
-            targets_con_fuente_unicos.append((target, fuente))
+    Returns:
+        int: Tamaño total en bytes
+    """
+    total = 0
+    for archivo in archivos:
+        if isinstance(archivo, (str, os.PathLike)):
+            total += os.path.getsize(archivo)
+        else:
+            total += getattr(archivo, 'size', 0) or 0
+    return total
+
+def _crear_acumulado():
+    """
+    Crea la estructura columnar donde se acumulan los resultados de los bloques.
+    Cada tabla guarda sus columnas como listas y el número de filas acumuladas en ellas;
+    los lotes recibidos como tablas Arrow se guardan en 'segmentos' y preceden a las listas.
+    'extractores' cuenta las secciones leídas con el extractor especializado o el genérico y
+    'filas_bloque' las filas que agregó cada bloque a cada tabla, en orden.
+    """
+    acumulado = {tabla: {'columnas': {}, 'filas': 0, 'segmentos': []} for tabla in TABLAS_BLOQUE}
+    acumulado['tipos_chassis'] = {}
+    acumulado['cuarentena'] = []
+    acumulado['extractores'] = {}
+    acumulado['filas_bloque'] = []
+    return acumulado
+
+def _agregar_columnas(tabla, columnas, filas):
+    """
+    Agrega columnas (listas de igual longitud) a una tabla acumulada,
+    completando con None las columnas que no existen en uno de los dos lados.
+    """
+    for columna, valores in columnas.items():
+        if columna not in tabla['columnas']:
+            tabla['columnas'][columna] = [None] * tabla['filas']
+        tabla['columnas'][columna].extend(valores)
     
-    return sorted(targets_con_fuente_unicos)
+    tabla['filas'] += filas
+    
+    for valores in tabla['columnas'].values():
+        if len(valores) < tabla['filas']:
+            valores.extend([None] * (tabla['filas'] - len(valores)))
+
+def _agregar_filas(tabla, filas):
+    """
+    Agrega filas (diccionarios columna -> valor) al buffer columnar de una tabla.
+    
+    Args:
+        tabla (dict): Tabla acumulada ({'columnas': {columna: lista}, 'filas': n})
+        filas (list): Filas a agregar
+    
+    Returns:
+        int: Número de filas agregadas
+    """
+    columnas = tabla['columnas']
+    
+    for fila in filas:
+        for columna, valor in fila.items():
+            if columna not in columnas:
+                columnas[columna] = [None] * tabla['filas']
+            columnas[columna].append(valor)
+        
+        tabla['filas'] += 1
+        
+        # Completar con None las columnas que la fila no trae
+        if len(fila) < len(columnas):
+            for valores in columnas.values():
+                if len(valores) < tabla['filas']:
+                    valores.append(None)
+    
+    return len(filas)
+
+def _agregar_segmento(tabla, segmento):
+    """
+    Agrega una tabla Arrow a una tabla acumulada. Las filas pendientes en listas se convierten
+    antes en un segmento, para conservar el orden; si no se pueden convertir, el segmento se
+    agrega a las listas.
+    """
+    if tabla['filas']:
+        pendiente = tabla_desde_columnas(tabla['columnas'])
+        if pendiente is None:
+            _agregar_columnas(tabla, columnas_desde_tabla(segmento), segmento.num_rows)
+            return
+        tabla['segmentos'].append(pendiente)
+        tabla['columnas'] = {}
+        tabla['filas'] = 0
+    
+    tabla['segmentos'].append(segmento)
+
+def _fusionar_acumulado(acumulado, resultado_lote):
+    """
+    Fusiona los resultados de un lote en la estructura acumulada.
+    Los lotes se fusionan en orden, por lo que el resultado es determinista.
+    Las tablas que el worker escribió como archivo Arrow se abren con memory-map, sin copiarlas.
+    """
+    for tabla in TABLAS_BLOQUE:
+        parcial = resultado_lote[tabla]
+        if parcial.get('archivo'):
+            _agregar_segmento(acumulado[tabla], importar_tabla(parcial['archivo']))
+            continue
+        for segmento in parcial['segmentos']:
+            _agregar_segmento(acumulado[tabla], segmento)
+        if parcial['filas']:
+            _agregar_columnas(acumulado[tabla], parcial['columnas'], parcial['filas'])
+    
+    acumulado['tipos_chassis'].update(resultado_lote['tipos_chassis'])
+    acumulado['cuarentena'].extend(resultado_lote['cuarentena'])
+    acumulado['filas_bloque'].extend(resultado_lote.get('filas_bloque', []))
+    fusionar_estadisticas(acumulado['extractores'], resultado_lote.get('extractores', {}))
+
+def _fusionar_resultados(resultados, transferencia=None, derrame=None):
+    """
+    Fusiona en orden los resultados de los lotes y mide el tiempo de la fusión.
+    
+    Args:
+        resultados (iterable): Resultados de procesar_lote, en orden
+        transferencia (str, optional): Modo de transferencia usado por los workers
+        derrame (dict, optional): Registro de derrame; tras cada lote, las tablas se derraman a disco
+            si superan el presupuesto de memoria (ver derrame_resultados)
+    
+    Returns:
+        dict: Resultados acumulados (ver _crear_acumulado)
+    """
+    acumulado = _crear_acumulado()
+    segundos_fusion = 0
+    lotes = 0
+    
+    for resultado_lote in resultados:
+        t_inicio = time.time()
+        _fusionar_acumulado(acumulado, resultado_lote)
+        derramar_si_excede(derrame, acumulado, TABLAS_BLOQUE)
+        segundos_fusion += time.time() - t_inicio
+        lotes += 1
+    
+    if transferencia:
+        print(f"Fusión de resultados ({transferencia}): {lotes} lotes en {segundos_fusion:.2f} segundos")
+    return acumulado
+
+def _concatenar_acumulado(acumulado, tablas=TABLAS_RESULTADO):
+    """
+    Construye un DataFrame por cada tabla indicada a partir de las columnas acumuladas,
+    convirtiendo las columnas numéricas una sola vez.
+    
+    Returns:
+        dict: tabla -> DataFrame
+    """
+    t_inicio = time.time()
+    resultados = {tabla: _construir_dataframe(tabla, acumulado[tabla]) for tabla in tablas}
+    eliminar_archivos_pendientes()
+    
+    memoria = memoria_maxima_mb()
+    descripcion_memoria = f"; memoria máxima del proceso principal: {memoria:.1f} MB" if memoria is not None else ""
+    print(f"Tiempo de construcción de tablas: {time.time() - t_inicio:.2f} segundos{descripcion_memoria}")
+    return resultados
+
+def _construir_dataframe(nombre_tabla, tabla):
+    """
+    Construye el DataFrame de una tabla acumulada y aplica los tipos numéricos.
+    Si la tabla tiene segmentos Arrow, se concatenan en Arrow y se convierten a DataFrame una sola vez;
+    los archivos derramados a disco se abren con memory-map y preceden a los segmentos en memoria.
+    """
+    if not tabla['filas'] and not tabla['segmentos'] and not tabla.get('derramados'):
+        return pd.DataFrame()
+    
+    if tabla.get('derramados'):
+        tabla = dict(tabla, segmentos=abrir_derramados(tabla) + tabla['segmentos'])
+    
+    df = None
+    if tabla['segmentos']:
+        segmentos = list(tabla['segmentos'])
+        pendiente = tabla_desde_columnas(tabla['columnas']) if tabla['filas'] else None
+        if pendiente is not None:
+            segmentos.append(pendiente)
+        if not tabla['filas'] or pendiente is not None:
+            df = concatenar_segmentos(segmentos).to_pandas()
+        else:
+            # Filas que no se pueden convertir a Arrow: se unen todos los segmentos en listas
+            completa = {'columnas': {}, 'filas': 0}
+            for segmento in segmentos:
+                _agregar_columnas(completa, columnas_desde_tabla(segmento), segmento.num_rows)
+            _agregar_columnas(completa, tabla['columnas'], tabla['filas'])
+            tabla = completa
+    
+    if df is None:
+        df = pd.DataFrame(tabla['columnas'])
+    
+    for col in COLUMNAS_NUMERICAS.get(nombre_tabla, []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    return df
+
+def extraer_todos_los_targets_con_fuente(contenido):
+    """
+    Extrae todos los targets únicos del contenido, preservando la fuente.
+    ACTUALIZADO: Usa el índice de procedencia; la fuente se determina por bloque desde la línea
+    'Saved Result File Name' y, si no la indica, una sola vez para todo el contenido.
+    
+    Args:
+        contenido (str): Contenido completo de los archivos
+    
+    Returns:
+        list: Lista de tuplas (target, fuente)
+    """
+    _, procedencia = dividir_bloques_con_procedencia(contenido)
+    return targets_con_fuente_desde_indice(procedencia)
 
 def extraer_todos_los_targets(contenido):
     """
@@ -217,7 +1141,7 @@ def extraer_todos_los_targets(contenido):
     
     Args:
         contenido (str): Contenido completo de los archivos
-        
+    
     Returns:
         list: Lista de targets únicos
     """
@@ -229,9 +1153,12 @@ def extraer_todos_los_targets(contenido):
     
     return targets_unicos
 
-def generar_resumen_completo_con_fuente(targets_con_fuente, df_servicios, df_puertos, df_chassis, df_versiones, bloques_equipo):
+def generar_resumen_completo_con_fuente(targets_con_fuente, df_servicios, df_puertos, df_chassis, df_versiones, bloques_equipo=None, tipos_chassis=None, procedencia=None, conteos=None):
     """
     Genera un DataFrame de resumen basado en TODOS los targets con fuente.
+    Los contadores por equipo se calculan con una sola agrupación por tabla (groupby/value_counts)
+    y se combinan con la lista de targets, en lugar de filtrar cada tabla por cada target.
+    El estado de cada equipo se clasifica con las reglas del archivo de reglas (ver reglas_estado).
     
     Args:
         targets_con_fuente (list): Lista de tuplas (target, fuente)
@@ -239,429 +1166,364 @@ def generar_resumen_completo_con_fuente(targets_con_fuente, df_servicios, df_pue
         df_puertos (DataFrame): DataFrame con información de puertos
         df_chassis (DataFrame): DataFrame con información del chassis
         df_versiones (DataFrame): DataFrame con información de versiones
-        bloques_equipo (list): Lista de bloques de texto por equipo
-        
+        bloques_equipo (list, optional): Lista de bloques de texto por equipo. Solo se usa
+            si no se proporciona tipos_chassis.
+        tipos_chassis (dict, optional): Tipo de equipo extraído de 'show chassis' por target
+            durante el procesamiento de los bloques. Permite liberar los bloques antes del resumen.
+        procedencia (list, optional): Índice de procedencia; agrega archivo, offset, script y status
+            del primer bloque de cada (target, fuente)
+        conteos (dict, optional): Conteos de servicios y puertos por target ya calculados (ver _conteos_resumen);
+            si se indican, no se recorren df_servicios ni df_puertos
+    
     Returns:
         DataFrame: DataFrame con el resumen de cada equipo
     """
-    # Crear DataFrame de resumen
-    resumen_data = []
+    if not targets_con_fuente:
+        return pd.DataFrame()
     
-    # Crear diccionario para acceder rápidamente a los bloques por target
-    bloques_por_target = {}
-    for bloque in bloques_equipo:
-        if not bloque.strip():
-            continue
-        
-        target_match = re.match(r'^([^\s#]+)', bloque)
-        if target_match:
-            target = target_match.group(1)
-            bloques_por_target[target] = bloque
+    df_resumen = pd.DataFrame(targets_con_fuente, columns=['target', 'fuente'])
+    targets = df_resumen['target']
+    df_resumen['target_con_fuente'] = targets + '_' + df_resumen['fuente']
     
-    for target, fuente in targets_con_fuente:
-        # Inicializar datos del equipo
-        equipo_data = {
-            'target': target,
-            'fuente': fuente,
-            'target_con_fuente': f"{target}_{fuente}",
-            'ciudad': None,
-            'ciudad_normalizada': None,
-            'total_servicios': 0,
-            'total_puertos': 0,
-            'puertos_up': 0,
-            'puertos_down': 0,
-            'puertos_unused': 0,
-            'puertos_admin_up_oper_down': 0,  # Nueva columna para puertos con Admin UP pero Port State DOWN
-            'temperature': None,
-            'serial_number': None,
-            'timos_version': None,
-            'main_version': None,
-            'tipo_equipo_nokia': 'No clasificado',
-            'estado': 'Sin datos',
-            'razon_estado': 'Sin datos suficientes'  # Nueva columna para explicar la razón del estado
-        }
-        
-        # Extraer código de ciudad del nombre del equipo usando la nueva función
-        codigo_ciudad = extraer_ciudad_desde_nombre_equipo(target)
-        if codigo_ciudad:
-            equipo_data['ciudad'] = codigo_ciudad
-            # Normalizar el nombre de la ciudad
-            ciudad_normalizada = normalizar_ciudad(codigo_ciudad)
-            equipo_data['ciudad_normalizada'] = ciudad_normalizada
-        
-        # Contar servicios
-        if df_servicios is not None and not df_servicios.empty and 'target' in df_servicios.columns:
-            servicios_equipo = df_servicios[df_servicios['target'] == target]
-            equipo_data['total_servicios'] = len(servicios_equipo)
-        
-        # Contar puertos y su estado
-        if df_puertos is not None and not df_puertos.empty and 'target' in df_puertos.columns:
-            puertos_equipo = df_puertos[df_puertos['target'] == target]
-            equipo_data['total_puertos'] = len(puertos_equipo)
-            
-            # Contar puertos por estado
-            if 'port_state' in puertos_equipo.columns and 'admin_state' in puertos_equipo.columns:
-                equipo_data['puertos_up'] = len(puertos_equipo[puertos_equipo['port_state'] == 'Up'])
-                equipo_data['puertos_down'] = len(puertos_equipo[puertos_equipo['port_state'] == 'Down'])
-                equipo_data['puertos_unused'] = equipo_data['total_puertos'] - equipo_data['puertos_up'] - equipo_data['puertos_down']
-                
-                # Contar puertos con Admin UP pero Port State DOWN (crítico)
-                equipo_data['puertos_admin_up_oper_down'] = len(puertos_equipo[(puertos_equipo['admin_state'] == 'Up') & (puertos_equipo['port_state'] == 'Down')])
-        
-        # Obtener temperatura y serial
-        if df_chassis is not None and not df_chassis.empty and 'target' in df_chassis.columns:
-            chassis_equipo = df_chassis[df_chassis['target'] == target]
-            if not chassis_equipo.empty:
-                if 'temperature' in chassis_equipo.columns:
-                    # Convertir temperatura a float si existe
-                    temp_value = chassis_equipo['temperature'].iloc[0]
-                    if temp_value is not None:
-                        try:
-                            equipo_data['temperature'] = float(temp_value)
-                        except (ValueError, TypeError):
-                            # Si no se puede convertir, dejar como None
-                            equipo_data['temperature'] = None
-                
-                if 'serial_number' in chassis_equipo.columns:
-                    equipo_data['serial_number'] = chassis_equipo['serial_number'].iloc[0]
-                if 'critical_led' in chassis_equipo.columns:
-                    equipo_data['critical_led'] = chassis_equipo['critical_led'].iloc[0]
-                if 'fan_status' in chassis_equipo.columns:
-                    equipo_data['fan_status'] = chassis_equipo['fan_status'].iloc[0]
-        
-        # Obtener versión TiMOS y tipo de equipo
-        if df_versiones is not None and not df_versiones.empty and 'target' in df_versiones.columns:
-            version_equipo = df_versiones[df_versiones['target'] == target]
-            if not version_equipo.empty:
-                if 'timos_version' in version_equipo.columns:
-                    equipo_data['timos_version'] = version_equipo['timos_version'].iloc[0]
-                if 'main_version' in version_equipo.columns:
-                    equipo_data['main_version'] = version_equipo['main_version'].iloc[0]
-                if 'tipo_equipo' in version_equipo.columns:
-                    tipo_equipo = version_equipo['tipo_equipo'].iloc[0]
-                    if validar_tipo_equipo(tipo_equipo):
-                        equipo_data['tipo_equipo_nokia'] = tipo_equipo
-        
-        # Extraer tipo de equipo directamente del bloque 'show chassis'
-        if target in bloques_por_target:
-            bloque = bloques_por_target[target]
-            tipo_equipo_chassis = extraer_tipo_equipo_desde_chassis(bloque)
-            if tipo_equipo_chassis:
-                equipo_data['tipo_equipo_nokia'] = tipo_equipo_chassis
-        
-        # Si aún no se ha asignado un tipo de equipo válido, intentar extraerlo del target
-        if equipo_data['tipo_equipo_nokia'] == 'No clasificado':
-            tipo_equipo_target = extraer_tipo_equipo(target)
-            if tipo_equipo_target != 'No clasificado':
-                equipo_data['tipo_equipo_nokia'] = tipo_equipo_target
-        
-        # Determinar estado del equipo con criterios actualizados y agregar razón
-        if equipo_data['total_puertos'] > 0:
-            # Inicializar variables para la clasificación
-            estado = 'OK'
-            razon = 'Equipo funcionando correctamente'
-            
-            # Verificar puertos con Admin UP pero Port State DOWN (crítico)
-            if equipo_data['puertos_admin_up_oper_down'] > 0:
-                estado = 'Crítico'
-                razon = f"Puertos con Admin UP pero Port State DOWN: {equipo_data['puertos_admin_up_oper_down']} puertos"
-            
-            # Verificar temperatura crítica (>55°C)
-            elif equipo_data['temperature'] is not None and isinstance(equipo_data['temperature'], (int, float)) and equipo_data['temperature'] > 55:
-                estado = 'Crítico'
-                razon = f"Temperatura crítica: {equipo_data['temperature']}°C"
-            
-            # Verificar LED crítico encendido
-            elif 'critical_led' in equipo_data and equipo_data['critical_led'] == 'On':
-                estado = 'Crítico'
-                razon = "LED crítico encendido"
-            
-            # Verificar estado de ventiladores
-            elif 'fan_status' in equipo_data and equipo_data['fan_status'] == 'Failed':
-                estado = 'Crítico'
-                razon = "Ventiladores fallidos"
-            
-            # Verificar porcentaje de puertos caídos (>50% es crítico)
-            elif equipo_data['puertos_down'] > 0:
-                porcentaje_down = (equipo_data['puertos_down'] / (equipo_data['puertos_up'] + equipo_data['puertos_down'])) * 100
-                if porcentaje_down > 50:
-                    estado = 'Crítico'
-                    razon = f"Más del 50% de puertos caídos: {porcentaje_down:.1f}%"
-                elif porcentaje_down > 30:
-                    estado = 'Alerta'
-                    razon = f"Más del 30% de puertos caídos: {porcentaje_down:.1f}%"
-            
-            # Verificar temperatura elevada (45-55°C)
-            elif equipo_data['temperature'] is not None and isinstance(equipo_data['temperature'], (int, float)) and equipo_data['temperature'] > 45:
-                estado = 'Alerta'
-                razon = f"Temperatura elevada: {equipo_data['temperature']}°C"
-            
-            # Asignar estado y razón
-            equipo_data['estado'] = estado
-            equipo_data['razon_estado'] = razon
-        
-        resumen_data.append(equipo_data)
+    # Ciudad: código y nombre categóricos de la dimensión de ciudades, resueltos para todos los targets a la vez
+    ciudades = resolver_ciudades(targets)
+    df_resumen['ciudad'] = ciudades['ciudad']
+    df_resumen['ciudad_normalizada'] = ciudades['ciudad_normalizada']
     
-    # Crear DataFrame de resumen
-    df_resumen = pd.DataFrame(resumen_data)
+    if conteos is not None:
+        conteo_servicios, conteo_puertos = conteos['servicios'], conteos['puertos']
+    else:
+        conteo_servicios = df_servicios['target'].value_counts() if _tiene_columna_target(df_servicios) else None
+        conteo_puertos = _contar_puertos_por_target(df_puertos)
+    
+    # Contar servicios
+    df_resumen['total_servicios'] = 0
+    if conteo_servicios is not None:
+        df_resumen['total_servicios'] = _mapear_conteo(targets, conteo_servicios)
+    
+    # Contar puertos y su estado
+    for columna in COLUMNAS_CONTEO_PUERTOS:
+        df_resumen[columna] = _mapear_conteo(targets, conteo_puertos[columna]) if conteo_puertos is not None else 0
+    
+    # Obtener temperatura y serial de la primera fila de chassis de cada target
+    chassis_por_target = _primera_fila_por_target(df_chassis)
+    df_resumen['temperature'] = _mapear_columna(targets, chassis_por_target, 'temperature').map(_convertir_temperatura).astype(float)
+    df_resumen['serial_number'] = _mapear_columna(targets, chassis_por_target, 'serial_number')
+    
+    # Obtener versión TiMOS y tipo de equipo de la primera fila de versión de cada target
+    version_por_target = _primera_fila_por_target(df_versiones)
+    df_resumen['timos_version'] = _mapear_columna(targets, version_por_target, 'timos_version')
+    df_resumen['main_version'] = _mapear_columna(targets, version_por_target, 'main_version')
+    
+    # Tipo de equipo de 'show chassis': del procesamiento de bloques o, si no se dispone, de los bloques de texto
+    if tipos_chassis is None:
+        tipos_chassis = _tipos_chassis_desde_bloques(bloques_equipo)
+    
+    # Tipo de equipo (chassis, versión válida o, si no, el modelo del target) y modelo canónico categórico,
+    # clasificados para todos los equipos a la vez
+    df_resumen['tipo_equipo_nokia'], df_resumen['modelo_nokia'] = clasificar_tipos_equipo(
+        targets, targets.map(tipos_chassis), _mapear_columna(targets, version_por_target, 'tipo_equipo')
+    )
+    
+    # Columnas opcionales del chassis usadas para determinar el estado
+    columnas_estado_chassis = [columna for columna in ['critical_led', 'fan_status'] if chassis_por_target is not None and columna in chassis_por_target.columns]
+    valores_chassis = {columna: _mapear_columna(targets, chassis_por_target, columna) for columna in columnas_estado_chassis}
+    
+    # Determinar el estado del equipo, su razón y la regla que lo determina, para todos los equipos a la vez
+    clasificacion = clasificar_estados(df_resumen.assign(**valores_chassis))
+    for columna in clasificacion.columns:
+        df_resumen[columna] = clasificacion[columna]
+    
+    for columna in columnas_estado_chassis:
+        df_resumen[columna] = valores_chassis[columna].where(targets.isin(chassis_por_target.index), np.nan)
+    
+    # Agregar la procedencia del equipo (archivo, posición y script de origen)
+    if procedencia:
+        df_procedencia = pd.DataFrame(
+            [{columna: entrada[columna] for columna in ['target', 'fuente'] + COLUMNAS_PROCEDENCIA_RESUMEN} for entrada in procedencia]
+        ).drop_duplicates(['target', 'fuente'], keep='first')
+        df_resumen = df_resumen.merge(df_procedencia, on=['target', 'fuente'], how='left')
     
     return df_resumen
 
-def extraer_servicios(bloque, target):
+def _tiene_columna_target(df):
     """
-    Extrae la información de servicios del bloque de texto.
-    MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
+    Indica si el DataFrame tiene datos y una columna 'target'.
+    """
+    return df is not None and not df.empty and 'target' in df.columns
+
+def _conteos_resumen(acumulado):
+    """
+    Cuenta los servicios y puertos por target de las tablas derramadas a disco sin unirlas: cada parte
+    (archivo derramado, segmento o listas) se lee solo con las columnas de los conteos y sus conteos se suman.
     
     Args:
-        bloque (str): Bloque de texto del equipo
-        target (str): Nombre del equipo
-        
+        acumulado (dict): Resultados acumulados
+    
     Returns:
-        DataFrame: DataFrame con la información de servicios
+        dict: {'servicios': conteo por target, 'puertos': conteos de _contar_puertos_por_target},
+            o None si ninguna de las dos tablas se derramó
     """
-    # MEJORADO: Patrón más flexible para detectar bloques de servicios en todos los formatos
-    servicios_match = re.search(r'show service service-using\s+={3,}[\s\S]+?ServiceId\s+Type\s+Adm\s+Opr\s+CustomerId\s+Service Name[\s\S]+?-{3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-    
-    if not servicios_match:
+    if not acumulado['servicios'].get('derramados') and not acumulado['puertos'].get('derramados'):
         return None
     
-    servicios_text = servicios_match.group(1)
+    conteo_servicios = None
+    if 'target' in columnas_tabla(acumulado['servicios']):
+        for parte in leer_partes(acumulado['servicios'], ['target']):
+            conteo_servicios = _sumar_conteos(conteo_servicios, parte['target'].value_counts())
     
-    # Extraer líneas de servicios
-    lineas = servicios_text.strip().split('\n')
+    conteo_puertos = None
+    columnas_puertos = columnas_tabla(acumulado['puertos'])
+    if 'target' in columnas_puertos:
+        columnas = [columna for columna in ['target', 'port_state', 'admin_state'] if columna in columnas_puertos]
+        for parte in leer_partes(acumulado['puertos'], columnas):
+            conteo_puertos = _sumar_conteos(conteo_puertos, _contar_puertos_por_target(parte))
     
-    # Filtrar líneas vacías y líneas de separación
-    lineas = [linea for linea in lineas if linea.strip() and not linea.strip().startswith('-')]
+    return {'servicios': conteo_servicios, 'puertos': conteo_puertos}
+
+def _sumar_conteos(total, conteo):
+    """
+    Suma los conteos por target de una parte de una tabla a los acumulados (Series o DataFrame).
+    """
+    if conteo is None or total is None:
+        return conteo if total is None else total
+    return total.add(conteo, fill_value=0)
+
+def _mapear_conteo(targets, conteo):
+    """
+    Asigna a cada target su conteo (0 si no aparece).
+    """
+    return targets.map(conteo).fillna(0).astype('int64')
+
+def _contar_puertos_por_target(df_puertos):
+    """
+    Cuenta los puertos de cada target y su estado con una sola agrupación.
     
-    # Eliminar líneas de resumen al final
-    lineas = [linea for linea in lineas if not 'Matching Services' in linea]
+    Args:
+        df_puertos (DataFrame): DataFrame con información de puertos
     
-    # Extraer datos de servicios
-    servicios = []
+    Returns:
+        DataFrame: Índice target y columnas COLUMNAS_CONTEO_PUERTOS, o None si no hay puertos
+    """
+    if not _tiene_columna_target(df_puertos):
+        return None
     
-    for linea in lineas:
-        # Ignorar líneas que no contienen datos de servicios
-        if not linea.strip() or 'ServiceId' in linea or 'Matching Services' in linea or '---------' in linea:
-            continue
-        
-        # Extraer campos usando posiciones fijas - Compatible con ambos formatos
-        try:
-            # Dividir la línea en campos
-            campos = linea.split()
-            
-            if len(campos) >= 5:  # Asegurar que hay suficientes campos
-                service_id = campos[0]
-                service_type = campos[1]
-                admin_state = campos[2]
-                oper_state = campos[3]
-                customer_id = campos[4]
-                
-                # El nombre del servicio puede contener espacios, unir el resto de campos
-                service_name = ' '.join(campos[5:]) if len(campos) > 5 else ''
-                
-                # Eliminar asterisco al final si existe (indica truncamiento)
-                if service_name.endswith('*'):
-                    service_name = service_name[:-1]
-                
-                # Crear diccionario de servicio
-                servicio = {
-                    'target': target,
-                    'service_id': service_id,
-                    'type': service_type,
-                    'admin_state': admin_state,
-                    'oper_state': oper_state,
-                    'customer_id': customer_id,
-                    'service_name': service_name
-                }
-                
-                servicios.append(servicio)
-        except Exception as e:
-            print(f"Error al procesar línea de servicio: {linea} - {str(e)}")
-    
-    # Crear DataFrame
-    if servicios:
-        df = pd.DataFrame(servicios)
+    conteo = pd.DataFrame({'total_puertos': df_puertos['target'].value_counts()})
+    
+    if 'port_state' in df_puertos.columns and 'admin_state' in df_puertos.columns:
+        puerto_up = df_puertos['port_state'] == 'Up'
+        puerto_down = df_puertos['port_state'] == 'Down'
         
-        # Convertir columnas numéricas
-        for col in ['service_id', 'customer_id']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        estados = pd.DataFrame({
+            'puertos_up': puerto_up,
+            'puertos_down': puerto_down,
+            # Puertos con Admin UP pero Port State DOWN (crítico)
+            'puertos_admin_up_oper_down': (df_puertos['admin_state'] == 'Up') & puerto_down
+        }).groupby(df_puertos['target']).sum()
         
-        return df
+        conteo = conteo.join(estados)
+        conteo['puertos_unused'] = conteo['total_puertos'] - conteo['puertos_up'] - conteo['puertos_down']
     else:
-        return None
+        for columna in COLUMNAS_CONTEO_PUERTOS[1:]:
+            conteo[columna] = 0
+    
+    return conteo
 
-def extraer_puertos(bloque, target):
+def _primera_fila_por_target(df):
     """
-    Extrae la información de puertos del bloque de texto.
-    MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
+    Obtiene la primera fila de cada target, indexada por target.
     
     Args:
-        bloque (str): Bloque de texto del equipo
-        target (str): Nombre del equipo
-        
+        df (DataFrame): DataFrame con columna 'target'
+    
     Returns:
-        DataFrame: DataFrame con la información de puertos
+        DataFrame: Primera fila de cada target o None si no hay datos
     """
-    # MEJORADO: Patrón más flexible para detectar bloques de puertos en todos los formatos
-    puertos_match = re.search(r'show port\s+={3,}[\s\S]+?Port\s+Admin\s+Link\s+Port\s+[\s\S]+?-{3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-    
-    if not puertos_match:
+    if not _tiene_columna_target(df):
         return None
     
-    puertos_text = puertos_match.group(1)
+    return df.drop_duplicates('target', keep='first').set_index('target')
+
+def _mapear_columna(targets, df_por_target, columna):
+    """
+    Asigna a cada target el valor de una columna de la tabla indexada por target (None si no existe).
+    """
+    if df_por_target is None or columna not in df_por_target.columns:
+        return pd.Series([None] * len(targets), index=targets.index, dtype=object)
     
-    # Extraer líneas de puertos
-    lineas = puertos_text.strip().split('\n')
+    valores = df_por_target[columna].astype(object)
+    return targets.map(valores).astype(object).where(targets.isin(df_por_target.index), None).infer_objects()
+
+def _convertir_temperatura(valor):
+    """
+    Convierte la temperatura a float; None si no existe o no es numérica.
+    """
+    if valor is None:
+        return None
+    try:
+        return float(valor)
+    except (ValueError, TypeError):
+        return None
+
+def _tipos_chassis_desde_bloques(bloques_equipo):
+    """
+    Extrae el tipo de equipo de 'show chassis' del último bloque de cada target.
+    Solo se usa cuando el tipo no se obtuvo durante el procesamiento de los bloques.
+    """
+    bloques_por_target = {}
+    for bloque in bloques_equipo or []:
+        target_match = re.match(r'^([^\s#]+)', bloque) if bloque.strip() else None
+        if target_match:
+            bloques_por_target[target_match.group(1)] = bloque
+    
+    return {target: extraer_tipo_equipo_desde_chassis(bloque) for target, bloque in bloques_por_target.items()}
+
+def extraer_servicios(bloque, target, tabla, lineas=None):
+    """
+    Extrae la información de servicios del bloque de texto.
+    MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
+    Las columnas se cortan por posición según el encabezado de la tabla, por lo que
+    los nombres de servicio con espacios se conservan completos.
     
-    # Filtrar líneas vacías y líneas de separación
-    lineas = [linea for linea in lineas if linea.strip() and not linea.strip().startswith('-')]
+    Args:
+        bloque (str o bytes): Texto de la sección del comando en el bloque del equipo (ver indice_secciones)
+        target (str): Nombre del equipo
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
     
-    # Extraer datos de puertos
-    puertos = []
+    Returns:
+        int: Número de filas agregadas
+    """
+    servicios = []
+    total_servicios = TOTAL_SERVICIOS.encode() if isinstance(bloque, bytes) else TOTAL_SERVICIOS
     
-    for linea in lineas:
-        # Ignorar líneas que no contienen datos de puertos
-        if not linea.strip() or 'Port' in linea or '---------' in linea:
+    for tabla_servicios in leer_tablas(bloque):
+        inicios = columnas_desde_encabezado(tabla_servicios['encabezado'], tabla_servicios['guiones'], ENCABEZADO_SERVICIOS)
+        if inicios is None:
             continue
         
-        # Extraer campos usando expresiones regulares para mayor flexibilidad
-        try:
-            # Patrón para extraer ID del puerto
-            port_id_match = re.match(r'(\S+)', linea)
-            if port_id_match:
-                port_id = port_id_match.group(1)
-                
-                # Extraer estados administrativo y operativo
-                admin_state = None
-                link = None
-                port_state = None
-                
-                # Buscar estados en la línea
-                admin_match = re.search(r'\s+(Up|Down)\s+', linea)
-                if admin_match:
-                    admin_state = admin_match.group(1)
-                
-                link_match = re.search(r'\s+(Yes|No)\s+', linea)
-                if link_match:
-                    link = link_match.group(1)
-                
-                state_match = re.search(r'\s+(Up|Down)\s+', linea[linea.find(admin_state) + len(admin_state) if admin_state else 0:])
-                if state_match:
-                    port_state = state_match.group(1)
-                
-                # Extraer MTU configurado y operativo
-                cfg_mtu = None
-                oper_mtu = None
-                
-                mtu_match = re.search(r'\s+(\d+)\s+(\d+)\s+', linea)
-                if mtu_match:
-                    cfg_mtu = mtu_match.group(1)
-                    oper_mtu = mtu_match.group(2)
-                
-                # Crear diccionario de puerto
-                puerto = {
-                    'target': target,
-                    'port_id': port_id,
-                    'admin_state': admin_state,
-                    'link': link,
-                    'port_state': port_state,
-                    'cfg_mtu': cfg_mtu,
-                    'oper_mtu': oper_mtu
-                }
-                
-                puertos.append(puerto)
-        except Exception as e:
-            print(f"Error al procesar línea de puerto: {linea} - {str(e)}")
-    
-    # Crear DataFrame
-    if puertos:
-        df = pd.DataFrame(puertos)
-        
-        # Convertir columnas numéricas
-        for col in ['cfg_mtu', 'oper_mtu']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        return df
-    else:
-        return None
+        for indice, linea in enumerate(tabla_servicios['filas']):
+            service_id, service_type, admin_state, oper_state, customer_id, service_name = cortar_fila(linea, inicios)
+            
+            # Ignorar líneas que no contienen datos de servicios
+            if not service_id or total_servicios in linea:
+                continue
+            
+            # Eliminar asterisco al final si existe (indica truncamiento)
+            if service_name.endswith('*'):
+                service_name = service_name[:-1]
+            
+            if lineas is not None:
+                lineas.append(tabla_servicios['linea'] + indice)
+            servicios.append({
+                'target': target,
+                'service_id': service_id,
+                'type': service_type,
+                'admin_state': admin_state,
+                'oper_state': oper_state,
+                'customer_id': customer_id,
+                'service_name': service_name
+            })
+    
+    # Agregar las filas al buffer columnar (la conversión numérica se hace al construir el DataFrame final)
+    return _agregar_filas(tabla, servicios)
 
-def extraer_descripciones_puertos(bloque, target):
+def extraer_puertos(bloque, target, tabla, lineas=None):
     """
-    Extrae las descripciones de los puertos del bloque de texto.
+    Extrae la información de puertos del bloque de texto.
     MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
+    Se leen las tablas de todos los slots y las columnas se cortan por posición según el encabezado.
     
     Args:
-        bloque (str): Bloque de texto del equipo
+        bloque (str o bytes): Texto de la sección del comando en el bloque del equipo (ver indice_secciones)
         target (str): Nombre del equipo
-        
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
+    
     Returns:
-        DataFrame: DataFrame con las descripciones de los puertos
+        int: Número de filas agregadas
     """
-    # MEJORADO: Patrón más flexible para detectar bloques de descripciones en todos los formatos
-    descripciones_match = re.search(r'show port description\s+={3,}[\s\S]+?Port\s+Description[\s\S]+?-{3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-    
-    if not descripciones_match:
-        return None
-    
-    descripciones_text = descripciones_match.group(1)
+    puertos = []
     
-    # Extraer líneas de descripciones
-    lineas = descripciones_text.strip().split('\n')
+    for tabla_puertos in leer_tablas(bloque):
+        inicios = columnas_desde_encabezado(tabla_puertos['encabezado'], tabla_puertos['guiones'], ENCABEZADO_PUERTOS)
+        if inicios is None:
+            continue
+        
+        for indice, linea in enumerate(tabla_puertos['filas']):
+            port_id, admin_state, link, port_state, cfg_mtu, oper_mtu = cortar_fila(linea, inicios)[:6]
+            
+            if not port_id:
+                continue
+            
+            if lineas is not None:
+                lineas.append(tabla_puertos['linea'] + indice)
+            puertos.append({
+                'target': target,
+                'port_id': port_id,
+                'admin_state': admin_state or None,
+                'link': link or None,
+                'port_state': port_state or None,
+                'cfg_mtu': cfg_mtu or None,
+                'oper_mtu': oper_mtu or None
+            })
+    
+    # Agregar las filas al buffer columnar (la conversión numérica se hace al construir el DataFrame final)
+    return _agregar_filas(tabla, puertos)
+
+def extraer_descripciones_puertos(bloque, target, tabla, lineas=None):
+    """
+    Extrae las descripciones de los puertos del bloque de texto.
+    MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
     
-    # Filtrar líneas vacías y líneas de separación
-    lineas = [linea for linea in lineas if linea.strip() and not linea.strip().startswith('-')]
+    Args:
+        bloque (str o bytes): Texto de la sección del comando en el bloque del equipo (ver indice_secciones)
+        target (str): Nombre del equipo
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
     
-    # Extraer datos de descripciones
+    Returns:
+        int: Número de filas agregadas
+    """
     descripciones = []
     
-    for linea in lineas:
-        # Ignorar líneas que no contienen datos de descripciones
-        if not linea.strip() or 'Port' in linea or '---------' in linea:
+    for tabla_descripciones in leer_tablas(bloque):
+        inicios = columnas_desde_encabezado(tabla_descripciones['encabezado'], tabla_descripciones['guiones'], ENCABEZADO_DESCRIPCIONES)
+        if inicios is None:
             continue
         
-        # Extraer campos usando expresiones regulares para mayor flexibilidad
-        try:
-            # Patrón para extraer ID del puerto y descripción
-            desc_match = re.match(r'(\S+)\s+(.*)', linea)
-            if desc_match:
-                port_id = desc_match.group(1)
-                description = desc_match.group(2).strip()
-                
-                # Crear diccionario de descripción
-                descripcion = {
-                    'target': target,
-                    'port_id': port_id,
-                    'description': description
-                }
-                
-                descripciones.append(descripcion)
-        except Exception as e:
-            print(f"Error al procesar línea de descripción: {linea} - {str(e)}")
-    
-    # Crear DataFrame
-    if descripciones:
-        df = pd.DataFrame(descripciones)
-        return df
-    else:
-        return None
+        for indice, linea in enumerate(tabla_descripciones['filas']):
+            port_id, description = cortar_fila(linea, inicios)
+            
+            if not port_id:
+                continue
+            
+            if lineas is not None:
+                lineas.append(tabla_descripciones['linea'] + indice)
+            descripciones.append({
+                'target': target,
+                'port_id': port_id,
+                'description': description
+            })
+    
+    # Agregar las filas al buffer columnar
+    return _agregar_filas(tabla, descripciones)
 
-def extraer_chassis(bloque, target):
+def extraer_chassis(campos, target, tabla):
     """
-    Extrae la información del chassis del bloque de texto.
+    Extrae la información del chassis de los campos de la sección 'show chassis'.
     MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
     
     Args:
-        bloque (str): Bloque de texto del equipo
+        campos (dict): Campos de 'show chassis' del equipo (ver extraer_chassis.leer_campos_chassis)
         target (str): Nombre del equipo
-        
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+    
     Returns:
-        DataFrame: DataFrame con la información del chassis
+        int: Número de filas agregadas
     """
-    # Usar la función especializada para extraer información del chassis
-    # Corregido: Ahora solo pasamos el bloque, no el target
-    chassis_info = extraer_info_chassis(bloque)
+    # Obtener la información del chassis de los campos ya leídos
+    chassis_info = info_chassis_desde_campos(campos)
     
     if chassis_info:
         # Añadir el target al diccionario de información del chassis
@@ -675,23 +1537,23 @@ def extraer_chassis(bloque, target):
                 # Si no se puede convertir, dejar como None
                 chassis_info['temperature'] = None
         
-        # Crear DataFrame con la información del chassis
-        df = pd.DataFrame([chassis_info])
-        return df
+        # Agregar la información del chassis al buffer columnar
+        return _agregar_filas(tabla, [chassis_info])
     else:
-        return None
+        return 0
 
-def extraer_version(bloque, target):
+def extraer_version(bloque, target, tabla):
     """
     Extrae la información de versión del bloque de texto.
     MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
     
     Args:
-        bloque (str): Bloque de texto del equipo
+        bloque (str): Texto de la sección del comando en el bloque del equipo (ver indice_secciones)
         target (str): Nombre del equipo
-        
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+    
     Returns:
-        DataFrame: DataFrame con la información de versión
+        int: Número de filas agregadas
     """
     # Extraer versión TiMOS usando la función especializada
     timos_version, main_version = extraer_version_timos(bloque)
@@ -708,108 +1570,88 @@ def extraer_version(bloque, target):
             'tipo_equipo': tipo_equipo
         }
         
-        # Crear DataFrame con la información de versión
-        df = pd.DataFrame([version_info])
-        return df
+        # Agregar la información de versión al buffer columnar
+        return _agregar_filas(tabla, [version_info])
     else:
-        return None
+        return 0
 
-def extraer_mda(bloque, target):
+def extraer_mda(bloque, target, tabla, lineas=None):
     """
     Extrae la información de MDA del bloque de texto.
     MEJORADO: Compatible con todos los formatos NSP 19 y NSP 24.
+    Lee las tablas de 'show card detail' (Slot, Provisioned, Equipped) y de 'show mda' /
+    'show mda detail' (Slot, Mda, Provisioned Type, Admin, Operational), cortando por posición.
     
     Args:
-        bloque (str): Bloque de texto del equipo
+        bloque (str): Texto de la sección del comando en el bloque del equipo (ver indice_secciones)
         target (str): Nombre del equipo
-        
+        tabla (dict): Buffer columnar donde se agregan las filas (ver _agregar_filas)
+        lineas (list, optional): Lista donde se agrega el número en la sección de cada fila extraída
+    
     Returns:
-        DataFrame: DataFrame con la información de MDA
+        int: Número de filas agregadas
     """
-    # MEJORADO: Patrón más flexible para detectar bloques de MDA en todos los formatos
-    mda_match = re.search(r'show card detail\s+={3,}[\s\S]+?Slot\s+Provisioned\s+Equipped[\s\S]+?-{3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-    
-    if not mda_match:
-        # Intentar con otro formato
-        mda_match = re.search(r'show mda\s+={3,}[\s\S]+?Slot\s+Mda\s+Admin\s+Operational[\s\S]+?-{3,}([\s\S]+?)(?:={3,}|\Z)', bloque)
-        
-        if not mda_match:
-            return None
-    
-    mda_text = mda_match.group(1)
-    
-    # Extraer líneas de MDA
-    lineas = mda_text.strip().split('\n')
-    
-    # Filtrar líneas vacías y líneas de separación
-    lineas = [linea for linea in lineas if linea.strip() and not linea.strip().startswith('-')]
-    
-    # Extraer datos de MDA
     mdas = []
     
-    for linea in lineas:
-        # Ignorar líneas que no contienen datos de MDA
-        if not linea.strip() or 'Slot' in linea or '---------' in linea:
+    for tabla_mda in leer_tablas(bloque):
+        inicios_mda = columnas_desde_encabezado(tabla_mda['encabezado'], tabla_mda['guiones'], ENCABEZADO_MDA)
+        inicios_card = None if inicios_mda else columnas_desde_encabezado(tabla_mda['encabezado'], tabla_mda['guiones'], ENCABEZADO_CARD)
+        
+        if inicios_mda is None and inicios_card is None:
             continue
         
-        # Extraer campos usando expresiones regulares para mayor flexibilidad
-        try:
-            # Dividir la línea en campos
-            campos = linea.split()
+        filas_tabla = 0
+        
+        for indice, linea in enumerate(tabla_mda['filas']):
+            campos = cortar_fila(linea, inicios_mda or inicios_card)
             
-            if len(campos) >= 3:  # Asegurar que hay suficientes campos
-                slot = campos[0]
-                
-                # Determinar el tipo de MDA según el formato
-                mda_type = None
-                provisioned_type = None
+            # Línea de continuación con el tipo equipado (si es diferente del provisionado)
+            if not campos[0]:
+                if filas_tabla and inicios_mda and campos[2]:
+                    mdas[-1]['equipped_type'] = campos[2]
+                continue
+            
+            # La tabla termina en la primera línea que no es una fila (ej: 'MDA Specific Data' en 'show mda detail')
+            if not PATRON_SLOT.match(campos[0]) or not PATRON_ESTADO_MDA.match(campos[3]):
+                break
+            
+            filas_tabla += 1
+            
+            if inicios_mda:
+                slot, mda, provisioned_type, admin_state, oper_state = campos
+                mda_type = provisioned_type
                 equipped_type = None
-                admin_state = None
-                oper_state = None
-                
-                if len(campos) >= 4 and ('up' in campos[2].lower() or 'down' in campos[2].lower()):
-                    # Formato show mda
-                    mda_type = campos[1]
-                    admin_state = campos[2]
-                    oper_state = campos[3]
-                else:
-                    # Formato show card detail
-                    provisioned_type = campos[1]
-                    equipped_type = campos[2]
-                
-                # Extraer información de puertos si está disponible
-                ports_up = 0
-                ports_down = 0
-                ports_unused = 0
-                
-                # Buscar información de puertos en la línea
-                ports_match = re.search(r'(\d+)/(\d+)/(\d+)', linea)
-                if ports_match:
-                    ports_up = int(ports_match.group(1))
-                    ports_down = int(ports_match.group(2))
-                    ports_unused = int(ports_match.group(3))
-                
-                # Crear diccionario de MDA
-                mda = {
-                    'target': target,
-                    'slot': slot,
-                    'mda_type': mda_type,
-                    'provisioned_type': provisioned_type,
-                    'equipped_type': equipped_type,
-                    'admin_state': admin_state,
-                    'oper_state': oper_state,
-                    'ports_up': ports_up,
-                    'ports_down': ports_down,
-                    'ports_unused': ports_unused
-                }
-                
-                mdas.append(mda)
-        except Exception as e:
-            print(f"Error al procesar línea de MDA: {linea} - {str(e)}")
-    
-    # Crear DataFrame
-    if mdas:
-        df = pd.DataFrame(mdas)
-        return df
-    else:
-        return None
+            else:
+                slot, provisioned_type, equipped_type, admin_state, oper_state = campos
+                mda = None
+                mda_type = None
+            
+            # Extraer información de puertos si está disponible
+            ports_up = 0
+            ports_down = 0
+            ports_unused = 0
+            
+            ports_match = re.search(r'(\d+)/(\d+)/(\d+)', linea)
+            if ports_match:
+                ports_up = int(ports_match.group(1))
+                ports_down = int(ports_match.group(2))
+                ports_unused = int(ports_match.group(3))
+            
+            if lineas is not None:
+                lineas.append(tabla_mda['linea'] + indice)
+            mdas.append({
+                'target': target,
+                'slot': slot,
+                'mda': mda,
+                'mda_type': mda_type,
+                'provisioned_type': provisioned_type or None,
+                'equipped_type': equipped_type or None,
+                'admin_state': admin_state or None,
+                'oper_state': oper_state or None,
+                'ports_up': ports_up,
+                'ports_down': ports_down,
+                'ports_unused': ports_unused
+            })
+    
+    # Agregar las filas al buffer columnar
+    return _agregar_filas(tabla, mdas)
@@ -0,0 +1,397 @@
+"""
+Módulo de referencias al texto de origen de los registros.
+Cada fila de las tablas (servicios, puertos, descripciones, chassis, versión, MDA) y cada equipo
+no leído lleva una referencia compacta a su texto en el archivo: el índice del archivo en la lista
+procesada, el offset en bytes y la longitud en bytes. El texto de los bloques no se conserva después
+de procesarlos; cuando se necesita (ej: "ver la salida original" de un servicio) se vuelve a leer
+del disco con leer_origen.
+
+Los workers solo reciben el texto de los bloques: la posición en el archivo viaja en una línea
+'#Origen' a continuación del target, con anclas que relacionan líneas del bloque con offsets del
+archivo. Las filas de una tabla son líneas del bloque, por lo que su offset se calcula desde el
+ancla anterior sumando la longitud en bytes del texto intermedio.
+"""
+
+import os
+from bisect import bisect_right
+from itertools import accumulate
+
+import pandas as pd
+
+# Línea de origen del bloque: '#Origen <id_archivo> <retornos> <línea>:<offset> ...'.
+# Cada ancla indica que la línea número <línea> después de la línea de origen (1 es la siguiente)
+# comienza en el byte <offset> del archivo, y que el texto que le sigue es continuo en el archivo,
+# con <retornos> caracteres '\r' antes de cada salto de línea (0 o 1; el bloque no los conserva)
+MARCA_ORIGEN = '#Origen'
+
+# Columnas de referencia de cada registro
+COLUMNAS_REFERENCIA = ['id_archivo', 'offset_origen', 'longitud_origen']
+
+# Codificación de los archivos, para medir en bytes el texto de los bloques decodificados
+CODIFICACION = 'utf-8'
+
+def retornos_cuerpo(cuerpo):
+    """
+    Determina cuántos '\\r' preceden a cada salto de línea en el cuerpo de un bloque, antes de eliminarlos.
+    
+    Args:
+        cuerpo (bytes): Cuerpo del bloque tal como está en el archivo
+    
+    Returns:
+        int: 0 o 1, o None si no es igual en todas las líneas (el bloque no lleva referencias)
+    """
+    retornos = cuerpo.count(b'\r\n')
+    if not retornos:
+        return 0
+    if retornos == cuerpo.count(b'\n') and b'\r\r\n' not in cuerpo:
+        return 1
+    return None
+
+def linea_origen(id_archivo, retornos, anclas):
+    """
+    Construye la línea de origen de un bloque o fragmento.
+    
+    Args:
+        id_archivo (int): Índice del archivo en la lista procesada
+        retornos (int): '\\r' antes de cada salto de línea en el archivo
+        anclas (list): Tuplas (línea después de la línea de origen, offset en el archivo)
+    
+    Returns:
+        str: Línea de origen (sin salto de línea)
+    """
+    return f"{MARCA_ORIGEN} {id_archivo} {retornos} " + ' '.join(f"{linea}:{offset}" for linea, offset in anclas)
+
+def etiquetar_origen(bloque, id_archivo, offset_cuerpo, retornos, inicio_cuerpo):
+    """
+    Agrega la línea de origen a continuación del target del bloque.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto del equipo (target, líneas de encabezado y cuerpo)
+        id_archivo (int): Índice del archivo en la lista procesada
+        offset_cuerpo (int): Offset en el archivo de la primera línea del cuerpo
+        retornos (int): '\\r' antes de cada salto de línea del cuerpo (ver retornos_cuerpo)
+        inicio_cuerpo (int): Posición de la primera línea del cuerpo en el bloque
+    
+    Returns:
+        str o bytes: Bloque con la línea de origen, o el mismo bloque si no se puede referenciar
+    """
+    if id_archivo is None or offset_cuerpo is None or retornos is None:
+        return bloque
+    
+    salto = b'\n' if isinstance(bloque, bytes) else '\n'
+    fin_target = bloque.find(salto)
+    if fin_target == -1 or inicio_cuerpo <= fin_target:
+        return bloque
+    
+    # La línea del cuerpo se cuenta desde la línea de origen, que queda justo después del target
+    anclas = [(bloque.count(salto, fin_target, inicio_cuerpo), offset_cuerpo)]
+    linea = '\n' + linea_origen(id_archivo, retornos, anclas)
+    if isinstance(bloque, bytes):
+        linea = linea.encode(CODIFICACION)
+    return bloque[:fin_target] + linea + bloque[fin_target:]
+
+def quitar_origen(bloque):
+    """
+    Elimina la línea de origen de un bloque (ej: cuando su texto ya no coincide con el del archivo).
+    
+    Returns:
+        str o bytes: Bloque sin la línea de origen
+    """
+    ubicacion = _ubicar_linea_origen(bloque)
+    if ubicacion is None:
+        return bloque
+    inicio, fin = ubicacion
+    return bloque[:inicio] + bloque[fin + 1:]
+
+def _ubicar_linea_origen(bloque):
+    """
+    Busca la línea de origen entre las líneas '#' que siguen al target.
+    
+    Returns:
+        tuple: (inicio, fin) de la línea en el bloque, sin el salto de línea, o None
+    """
+    if isinstance(bloque, bytes):
+        marca, salto = MARCA_ORIGEN.encode(CODIFICACION), b'\n'
+    else:
+        marca, salto = MARCA_ORIGEN, '\n'
+    
+    posicion = bloque.find(salto) + 1
+    while 0 < posicion < len(bloque) and bloque.startswith(marca[:1], posicion):
+        fin_linea = bloque.find(salto, posicion)
+        if fin_linea == -1:
+            fin_linea = len(bloque)
+        if bloque.startswith(marca, posicion):
+            return posicion, fin_linea
+        posicion = fin_linea + 1
+    
+    return None
+
+def nuevo_localizador(bloque):
+    """
+    Lee la línea de origen de un bloque y prepara la conversión de posiciones del bloque a offsets del archivo.
+    
+    Args:
+        bloque (str o bytes): Bloque de texto o fragmento
+    
+    Returns:
+        dict: Localizador (ver ubicar) o None si el bloque no tiene línea de origen
+    """
+    ubicacion = _ubicar_linea_origen(bloque)
+    if ubicacion is None:
+        return None
+    inicio, fin = ubicacion
+    
+    linea = bloque[inicio:fin]
+    if isinstance(linea, bytes):
+        linea = linea.decode(CODIFICACION, errors='ignore')
+    partes = linea.split()
+    id_archivo, retornos = int(partes[1]), int(partes[2])
+    
+    # Posición en el bloque de la línea de cada ancla
+    salto = b'\n' if isinstance(bloque, bytes) else '\n'
+    posiciones = []
+    offsets = []
+    posicion = fin + 1
+    linea_actual = 1
+    for ancla in partes[3:]:
+        numero, offset = (int(valor) for valor in ancla.split(':'))
+        while linea_actual < numero and posicion:
+            posicion = bloque.find(salto, posicion) + 1
+            linea_actual += 1
+        if not posicion:
+            break
+        posiciones.append(posicion)
+        offsets.append(offset)
+    
+    return {
+        'bloque': bloque,
+        'id_archivo': id_archivo,
+        'retornos': retornos,
+        'salto': salto,
+        # En bytes (o texto ASCII) la longitud en bytes es la diferencia de posiciones
+        'medir_bytes': not isinstance(bloque, bytes) and not bloque.isascii(),
+        'posiciones': posiciones,
+        'offsets': offsets,
+        # Último punto ubicado: (ancla, posición, offset), para avanzar sin volver a medir desde el ancla
+        'cursor': None
+    }
+
+def ubicar(localizador, posicion):
+    """
+    Convierte una posición del bloque (inicio de una línea) en el offset del archivo.
+    Las posiciones crecientes se miden desde la anterior, por lo que recorrer las filas en orden
+    mide cada parte del bloque una sola vez.
+    
+    Args:
+        localizador (dict): Localizador del bloque (ver nuevo_localizador)
+        posicion (int): Posición en el bloque
+    
+    Returns:
+        int: Offset en el archivo o None si la posición está antes de la primera ancla
+    """
+    ancla = bisect_right(localizador['posiciones'], posicion) - 1
+    if ancla < 0:
+        return None
+    
+    cursor = localizador['cursor']
+    if cursor is None or cursor[0] != ancla or cursor[1] > posicion:
+        cursor = (ancla, localizador['posiciones'][ancla], localizador['offsets'][ancla])
+    _, desde, offset = cursor
+    
+    bloque = localizador['bloque']
+    if localizador['medir_bytes']:
+        offset += len(bloque[desde:posicion].encode(CODIFICACION))
+    else:
+        offset += posicion - desde
+    if localizador['retornos']:
+        offset += localizador['retornos'] * bloque.count(localizador['salto'], desde, posicion)
+    
+    localizador['cursor'] = (ancla, posicion, offset)
+    return offset
+
+def longitud_bytes(localizador, texto):
+    """
+    Returns:
+        int: Longitud en bytes que ocupa en el archivo un texto del bloque
+    """
+    longitud = len(texto.encode(CODIFICACION)) if localizador['medir_bytes'] else len(texto)
+    if localizador['retornos']:
+        longitud += localizador['retornos'] * texto.count(localizador['salto'])
+    return longitud
+
+def referencias_lineas(localizador, secciones, comandos, texto, indices):
+    """
+    Obtiene la referencia de cada línea indicada del texto de unas secciones (el que recibe un extractor).
+    
+    Args:
+        localizador (dict): Localizador del bloque (ver nuevo_localizador)
+        secciones (dict): Índice de secciones del bloque (ver indice_secciones.indexar_secciones)
+        comandos (tuple): Comandos cuyas secciones forman el texto, en el mismo orden
+        texto (str o bytes): Texto de las secciones (ver indice_secciones.texto_seccion)
+        indices (list): Número de cada línea en el texto, en orden creciente
+    
+    Returns:
+        dict: columna de referencia -> lista de valores (None en las líneas sin referencia)
+    """
+    lineas = texto.split(localizador['salto'])
+    # Inicio de cada línea en el texto: longitud de las anteriores más sus saltos de línea
+    inicios_lineas = list(accumulate(map(len, lineas), initial=0))
+    
+    # Cada sección del texto es un tramo continuo del bloque
+    inicios_texto = []
+    inicios_bloque = []
+    posicion_texto = 0
+    for comando in comandos:
+        if comando in secciones:
+            inicio, fin = secciones[comando]
+            inicios_texto.append(posicion_texto)
+            inicios_bloque.append(inicio)
+            posicion_texto += fin - inicio
+    
+    offsets = []
+    longitudes = []
+    for indice in indices:
+        posicion = inicios_lineas[indice] + indice
+        tramo = bisect_right(inicios_texto, posicion) - 1
+        offset = ubicar(localizador, inicios_bloque[tramo] + posicion - inicios_texto[tramo])
+        offsets.append(offset)
+        longitudes.append(None if offset is None else longitud_bytes(localizador, lineas[indice]))
+    
+    return {
+        'id_archivo': [localizador['id_archivo'] if offset is not None else None for offset in offsets],
+        'offset_origen': offsets,
+        'longitud_origen': longitudes
+    }
+
+def referencia_seccion(localizador, secciones, comando):
+    """
+    Obtiene la referencia de una sección completa (ej: 'show chassis', de la que sale un solo registro).
+    
+    Returns:
+        dict: columna de referencia -> valor (None si la sección no existe o no tiene referencia)
+    """
+    referencia = dict.fromkeys(COLUMNAS_REFERENCIA)
+    if comando not in secciones:
+        return referencia
+    
+    inicio, fin = secciones[comando]
+    offset = ubicar(localizador, inicio)
+    if offset is not None:
+        texto = localizador['bloque'][inicio:fin].rstrip()
+        referencia.update(id_archivo=localizador['id_archivo'], offset_origen=offset, longitud_origen=longitud_bytes(localizador, texto))
+    return referencia
+
+def anclas_tramos(localizador, tramos):
+    """
+    Calcula las anclas de un bloque armado con tramos de otro (ver fragmentar_bloques).
+    
+    Args:
+        localizador (dict): Localizador del bloque original
+        tramos (list): Tuplas (línea del tramo después de la línea de origen del nuevo bloque,
+            inicio del tramo en el bloque original, fin del tramo en el bloque original)
+    
+    Returns:
+        list: Anclas (línea, offset) del nuevo bloque
+    """
+    bloque = localizador['bloque']
+    salto = localizador['salto']
+    anclas = []
+    for linea, inicio, fin in tramos:
+        offset = ubicar(localizador, inicio)
+        if offset is not None:
+            anclas.append((linea, offset))
+        # Anclas del bloque original dentro del tramo (el texto deja de ser continuo en ellas)
+        for posicion, offset_ancla in zip(localizador['posiciones'], localizador['offsets']):
+            if inicio < posicion < fin:
+                anclas.append((linea + bloque.count(salto, inicio, posicion), offset_ancla))
+    return anclas
+
+def entrada_referencia(entrada):
+    """
+    Obtiene la referencia del bloque completo de una entrada de procedencia (para los equipos no leídos).
+    
+    Args:
+        entrada (dict): Entrada de procedencia o encabezado del bloque
+    
+    Returns:
+        dict: columna de referencia -> valor, o {} si el bloque no se leyó de un archivo
+    """
+    if entrada.get('id_archivo') is None or entrada.get('longitud') is None:
+        return {}
+    return {'id_archivo': entrada['id_archivo'], 'offset_origen': entrada['offset'], 'longitud_origen': entrada['longitud']}
+
+def leer_origen(archivos, id_archivo, offset, longitud):
+    """
+    Lee del disco el texto original de un registro, con un seek a su posición.
+    
+    Args:
+        archivos (list): Lista de archivos procesada (rutas o archivos binarios), en el mismo orden
+        id_archivo (int): Índice del archivo en la lista
+        offset (int): Offset en bytes
+        longitud (int): Longitud en bytes
+    
+    Returns:
+        str: Texto del registro, con saltos de línea '\\n'
+    """
+    archivo = archivos[int(id_archivo)]
+    if isinstance(archivo, (str, os.PathLike)):
+        with open(archivo, 'rb') as f:
+            f.seek(int(offset))
+            datos = f.read(int(longitud))
+    else:
+        # Archivo subido: se restaura su posición para no afectar otras lecturas
+        posicion_inicial = archivo.tell()
+        archivo.seek(int(offset))
+        datos = archivo.read(int(longitud))
+        archivo.seek(posicion_inicial)
+    
+    return datos.decode(CODIFICACION, errors='ignore').replace('\r\n', '\n')
+
+def leer_origen_registro(archivos, registro):
+    """
+    Lee el texto original de una fila de las tablas o de los equipos no leídos.
+    
+    Args:
+        archivos (list): Lista de archivos procesada
+        registro (dict o Series): Fila con las columnas de referencia
+    
+    Returns:
+        str: Texto del registro o None si la fila no tiene referencia
+    """
+    valores = [registro.get(columna) for columna in COLUMNAS_REFERENCIA]
+    if any(valor is None or pd.isna(valor) for valor in valores):
+        return None
+    return leer_origen(archivos, *valores)
+
+def leer_origenes(archivos, df):
+    """
+    Lee el texto original de todas las filas de un DataFrame, abriendo cada archivo una sola vez
+    y leyendo en orden de offset.
+    
+    Args:
+        archivos (list): Lista de archivos procesada
+        df (DataFrame): Filas con las columnas de referencia
+    
+    Returns:
+        Series: Texto de cada fila (None en las filas sin referencia), con el índice del DataFrame
+    """
+    textos = pd.Series(None, index=df.index, dtype=object)
+    if df.empty or not set(COLUMNAS_REFERENCIA).issubset(df.columns):
+        return textos
+    
+    referencias = df[COLUMNAS_REFERENCIA].dropna()
+    for id_archivo, grupo in referencias.groupby('id_archivo'):
+        archivo = archivos[int(id_archivo)]
+        f = open(archivo, 'rb') if isinstance(archivo, (str, os.PathLike)) else archivo
+        posicion_inicial = None if f is not archivo else archivo.tell()
+        try:
+            for indice, (offset, longitud) in grupo.sort_values('offset_origen')[['offset_origen', 'longitud_origen']].iterrows():
+                f.seek(int(offset))
+                textos[indice] = f.read(int(longitud)).decode(CODIFICACION, errors='ignore').replace('\r\n', '\n')
+        finally:
+            if posicion_inicial is None:
+                f.close()
+            else:
+                f.seek(posicion_inicial)
+    
+    return textos
@@ -0,0 +1,212 @@
+"""
+Módulo para clasificar el estado de los equipos con reglas configurables.
+Las reglas se leen de un archivo JSON (reglas_estado.json por defecto) y se evalúan en orden sobre
+las columnas del resumen para todos los equipos a la vez con np.select: cada equipo recibe el estado,
+la razón y el nombre de la primera regla que cumple. Cambiar un umbral solo requiere volver a
+clasificar el resumen, sin procesar de nuevo los archivos.
+"""
+
+import os
+import json
+import string
+
+import numpy as np
+import pandas as pd
+
+# Variable de entorno con la ruta de un archivo de reglas propio
+VARIABLE_REGLAS_ESTADO = 'NSP_REGLAS_ESTADO'
+
+# Archivo de reglas por defecto, junto a este módulo
+RUTA_REGLAS_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reglas_estado.json')
+
+# Operadores de comparación de las condiciones
+OPERADORES = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+# Columnas calculadas a partir de las columnas del resumen, disponibles para las condiciones y razones
+COLUMNAS_DERIVADAS = {
+    'porcentaje_down': lambda df: df['puertos_down'] / (df['puertos_up'] + df['puertos_down']) * 100
+}
+
+def resolver_ruta_reglas(ruta=None):
+    """
+    Determina el archivo de reglas. El parámetro tiene prioridad sobre la variable de entorno;
+    por defecto se usa reglas_estado.json.
+    
+    Args:
+        ruta (str, optional): Ruta del archivo de reglas
+    
+    Returns:
+        str: Ruta del archivo de reglas
+    """
+    return ruta or os.environ.get(VARIABLE_REGLAS_ESTADO) or RUTA_REGLAS_DEFECTO
+
+def cargar_reglas(ruta=None):
+    """
+    Lee y valida el archivo de reglas.
+    
+    Args:
+        ruta (str, optional): Ruta del archivo de reglas (ver resolver_ruta_reglas)
+    
+    Returns:
+        dict: {'reglas': lista de reglas, 'regla_defecto', 'estado_defecto', 'razon_defecto'}
+    """
+    ruta = resolver_ruta_reglas(ruta)
+    with open(ruta, 'r', encoding='utf-8') as f:
+        reglas = json.load(f)
+    
+    validar_reglas(reglas, ruta)
+    return reglas
+
+def validar_reglas(reglas, origen='reglas'):
+    """
+    Verifica que las reglas tengan los campos y operadores esperados.
+    
+    Args:
+        reglas (dict): Reglas leídas del archivo
+        origen (str): Nombre del origen de las reglas, para los mensajes de error
+    """
+    for campo in ['regla_defecto', 'estado_defecto', 'razon_defecto', 'reglas']:
+        if campo not in reglas:
+            raise ValueError(f"Falta el campo '{campo}' en {origen}")
+    
+    for posicion, regla in enumerate(reglas['reglas']):
+        for campo in ['nombre', 'estado', 'razon', 'condiciones']:
+            if campo not in regla:
+                raise ValueError(f"Falta el campo '{campo}' en la regla {posicion} de {origen}")
+        if not regla['condiciones']:
+            raise ValueError(f"La regla '{regla['nombre']}' de {origen} no tiene condiciones")
+        for condicion in regla['condiciones']:
+            if condicion.get('operador') not in OPERADORES:
+                raise ValueError(
+                    f"Operador no válido en la regla '{regla['nombre']}' de {origen}: {condicion.get('operador')}. "
+                    f"Opciones: {', '.join(OPERADORES)}"
+                )
+            if 'columna' not in condicion or 'valor' not in condicion:
+                raise ValueError(f"Condición sin columna o valor en la regla '{regla['nombre']}' de {origen}")
+
+def clasificar_estados(df, reglas=None):
+    """
+    Clasifica todos los equipos del resumen con las reglas, en orden: cada equipo recibe la primera regla
+    que cumple (o la regla por defecto). Una regla se cumple si se cumplen todas sus condiciones; las
+    columnas que el resumen no tiene y los valores nulos no cumplen ninguna condición.
+    
+    Args:
+        df (DataFrame): Resumen con las columnas usadas por las reglas
+        reglas (dict, optional): Reglas de cargar_reglas; por defecto se leen del archivo de reglas
+    
+    Returns:
+        DataFrame: Columnas 'estado', 'razon_estado' y 'regla_estado', con el índice de df
+    """
+    if reglas is None:
+        reglas = cargar_reglas()
+    
+    lista_reglas = reglas['reglas']
+    columnas = _columnas_reglas(df, lista_reglas)
+    
+    # Índice de la regla ganadora de cada equipo (len(lista_reglas) para la regla por defecto)
+    condiciones = [_evaluar_regla(columnas, regla, len(df)) for regla in lista_reglas]
+    ganadora = np.select(condiciones, np.arange(len(lista_reglas)), default=len(lista_reglas)) if condiciones else np.full(len(df), 0)
+    
+    nombres = np.array([regla['nombre'] for regla in lista_reglas] + [reglas['regla_defecto']], dtype=object)
+    estados = np.array([regla['estado'] for regla in lista_reglas] + [reglas['estado_defecto']], dtype=object)
+    razones = np.array([regla['razon'] for regla in lista_reglas] + [reglas['razon_defecto']], dtype=object)[ganadora]
+    
+    # Las razones con campos ({columna}) se formatean solo para los equipos de su regla, una vez por combinación de valores
+    for posicion, regla in enumerate(lista_reglas):
+        campos = _campos_plantilla(regla['razon'])
+        filas = np.flatnonzero(ganadora == posicion) if campos else []
+        if len(filas):
+            formateadas = {}
+            for fila, valores in zip(filas, zip(*(_valores_columna(columnas, campo, len(df))[filas] for campo in campos))):
+                if valores not in formateadas:
+                    formateadas[valores] = regla['razon'].format(**dict(zip(campos, valores)))
+                razones[fila] = formateadas[valores]
+    
+    return pd.DataFrame({
+        'estado': estados[ganadora],
+        'razon_estado': razones,
+        'regla_estado': nombres[ganadora]
+    }, index=df.index)
+
+def reclasificar_resumen(df_resumen, reglas=None):
+    """
+    Vuelve a clasificar un resumen ya generado (ej: tras cambiar un umbral en el archivo de reglas).
+    
+    Args:
+        df_resumen (DataFrame): Resumen de generar_resumen_completo_con_fuente
+        reglas (dict, optional): Reglas de cargar_reglas; por defecto se leen del archivo de reglas
+    
+    Returns:
+        DataFrame: Copia del resumen con 'estado', 'razon_estado' y 'regla_estado' reemplazados
+    """
+    df_resumen = df_resumen.copy()
+    if df_resumen.empty:
+        return df_resumen
+    
+    clasificacion = clasificar_estados(df_resumen, reglas)
+    for columna in clasificacion.columns:
+        df_resumen[columna] = clasificacion[columna]
+    return df_resumen
+
+def _columnas_reglas(df, lista_reglas):
+    """
+    Obtiene como arrays las columnas del resumen y las derivadas que usan las reglas.
+    
+    Returns:
+        dict: columna -> array (solo las columnas que existen o se pueden calcular)
+    """
+    usadas = set()
+    for regla in lista_reglas:
+        usadas.update(condicion['columna'] for condicion in regla['condiciones'])
+        usadas.update(_campos_plantilla(regla['razon']))
+    
+    columnas = {}
+    for columna in usadas:
+        if columna in df.columns:
+            columnas[columna] = df[columna].to_numpy()
+        elif columna in COLUMNAS_DERIVADAS:
+            try:
+                columnas[columna] = COLUMNAS_DERIVADAS[columna](df).to_numpy(dtype=float, na_value=np.nan)
+            except KeyError:
+                # El resumen no tiene las columnas de las que se calcula
+                pass
+    return columnas
+
+def _valores_columna(columnas, columna, filas):
+    """
+    Devuelve los valores de una columna, o nulos si el resumen no la tiene.
+    """
+    if columna in columnas:
+        return columnas[columna]
+    return np.full(filas, None, dtype=object)
+
+def _evaluar_regla(columnas, regla, filas):
+    """
+    Evalúa las condiciones de una regla para todos los equipos.
+    
+    Returns:
+        ndarray: Máscara booleana de los equipos que cumplen la regla
+    """
+    cumple = np.ones(filas, dtype=bool)
+    for condicion in regla['condiciones']:
+        if condicion['columna'] not in columnas:
+            return np.zeros(filas, dtype=bool)
+        valores = columnas[condicion['columna']]
+        presentes = ~pd.isna(valores)
+        comparacion = np.zeros(filas, dtype=bool)
+        comparacion[presentes] = OPERADORES[condicion['operador']](valores[presentes], condicion['valor'])
+        cumple &= comparacion
+    return cumple
+
+def _campos_plantilla(plantilla):
+    """
+    Obtiene los nombres de los campos de la plantilla de una razón ('{temperature}°C' -> ['temperature']).
+    """
+    return [campo for _, campo, _, _ in string.Formatter().parse(plantilla) if campo]
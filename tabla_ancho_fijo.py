@@ -0,0 +1,196 @@
+"""
+Módulo para leer las tablas de ancho fijo de la salida de comandos SR OS.
+Los límites de las columnas se obtienen del encabezado de cada tabla (o de la línea de
+guiones, si separa las columnas) y cada línea se corta por posición, en lugar de dividirla
+por espacios o buscar cada campo con una expresión regular.
+Las secciones pueden leerse como bytes sin decodificar: solo se decodifican los valores de los campos.
+"""
+
+import re
+import pandas as pd
+
+# Líneas delimitadoras de las tablas SR OS
+PATRON_LINEA_GUIONES = re.compile(r'^-{3,}[- ]*$')
+PATRON_LINEA_IGUALES = re.compile(r'^={3,}\s*$')
+PATRON_SEGMENTO_GUIONES = re.compile(r'-+')
+PATRON_PALABRA = re.compile(r'\S+')
+
+# Mismos patrones para las secciones en bytes
+PATRON_LINEA_GUIONES_BYTES = re.compile(rb'^-{3,}[- ]*$')
+PATRON_LINEA_IGUALES_BYTES = re.compile(rb'^={3,}\s*$')
+PATRON_SEGMENTO_GUIONES_BYTES = re.compile(rb'-+')
+PATRON_PALABRA_BYTES = re.compile(rb'\S+')
+
+# Codificación de la salida de los equipos
+CODIFICACION = 'utf-8'
+
+def leer_tablas(texto):
+    """
+    Encuentra las tablas de una sección: líneas de encabezado, línea de guiones y filas de datos.
+    El encabezado son las líneas entre el último delimitador ('===' o fin de la tabla anterior)
+    y la línea de guiones; las filas terminan en la siguiente línea vacía, de guiones o de '='.
+    
+    Args:
+        texto (str o bytes): Texto de la sección del comando
+    
+    Yields:
+        dict: {'encabezado': lista de líneas, 'guiones': línea de guiones, 'filas': lista de líneas,
+            'linea': número de la primera fila en el texto}, líneas del mismo tipo que el texto
+    """
+    if isinstance(texto, bytes):
+        patron_guiones, patron_iguales = PATRON_LINEA_GUIONES_BYTES, PATRON_LINEA_IGUALES_BYTES
+        lineas = texto.split(b'\n')
+    else:
+        patron_guiones, patron_iguales = PATRON_LINEA_GUIONES, PATRON_LINEA_IGUALES
+        lineas = texto.split('\n')
+    inicio_encabezado = 0
+    i = 0
+    
+    while i < len(lineas):
+        linea = lineas[i].rstrip()
+        
+        if patron_iguales.match(linea):
+            inicio_encabezado = i + 1
+        elif patron_guiones.match(linea) and i > inicio_encabezado:
+            encabezado = [linea_encabezado.rstrip() for linea_encabezado in lineas[inicio_encabezado:i] if linea_encabezado.strip()]
+            
+            filas = []
+            j = i + 1
+            while j < len(lineas):
+                fila = lineas[j].rstrip()
+                if not fila.strip() or patron_guiones.match(fila) or patron_iguales.match(fila):
+                    break
+                filas.append(fila)
+                j += 1
+            
+            if encabezado and filas:
+                yield {'encabezado': encabezado, 'guiones': linea, 'filas': filas, 'linea': i + 1}
+            
+            # Lo que sigue a las filas no puede ser encabezado de esta tabla
+            inicio_encabezado = j
+            i = j
+            continue
+        
+        i += 1
+
+def columnas_desde_encabezado(encabezado, linea_guiones='', nombres=None):
+    """
+    Obtiene la posición de inicio de cada columna de una tabla.
+    Si la línea de guiones está separada por espacios, cada segmento es una columna.
+    Si no, las columnas se toman de la primera línea del encabezado: la posición de cada
+    nombre indicado (buscados en orden, pueden contener espacios) o de cada palabra.
+    
+    Args:
+        encabezado (list): Líneas del encabezado de la tabla (str o bytes)
+        linea_guiones (str o bytes, optional): Línea de guiones bajo el encabezado
+        nombres (list, optional): Nombres de las columnas tal como aparecen en el encabezado
+    
+    Returns:
+        list: Posiciones de inicio de las columnas o None si el encabezado no contiene los nombres
+    """
+    en_bytes = isinstance(encabezado[0], bytes)
+    if en_bytes and isinstance(linea_guiones, str):
+        linea_guiones = linea_guiones.encode(CODIFICACION)
+    if en_bytes and not all(linea.isascii() for linea in encabezado):
+        # Las posiciones deben ser de caracteres, igual que al cortar las filas no ASCII
+        return columnas_desde_encabezado(
+            [linea.decode(CODIFICACION, errors='ignore') for linea in encabezado],
+            linea_guiones.decode(CODIFICACION, errors='ignore'), nombres
+        )
+    patron_segmento = PATRON_SEGMENTO_GUIONES_BYTES if en_bytes else PATRON_SEGMENTO_GUIONES
+    
+    segmentos = [match.start() for match in patron_segmento.finditer(linea_guiones)]
+    if len(segmentos) > 1 and (nombres is None or len(segmentos) == len(nombres)):
+        return segmentos
+    
+    linea = encabezado[0]
+    
+    if nombres is None:
+        return [match.start() for match in (PATRON_PALABRA_BYTES if en_bytes else PATRON_PALABRA).finditer(linea)]
+    
+    inicios = []
+    posicion = 0
+    for nombre in nombres:
+        if en_bytes:
+            nombre = nombre.encode(CODIFICACION)
+        posicion = linea.find(nombre, posicion)
+        if posicion == -1:
+            return None
+        inicios.append(posicion)
+        posicion += len(nombre)
+    
+    return inicios
+
+def cortar_fila(fila, inicios):
+    """
+    Corta una fila en columnas según las posiciones de inicio; la última columna llega hasta el final.
+    Si un valor invade la columna siguiente (la fila no está alineada con el encabezado),
+    la fila se divide por espacios, con el resto de la línea en la última columna.
+    
+    Las filas en bytes se decodifican una a una justo antes de cortarlas: el resto de la sección
+    (encabezados, separadores y líneas que no son filas) nunca se decodifica. Las posiciones del
+    encabezado son de caracteres, por lo que las filas no ASCII se cortan igual que en texto.
+    
+    Args:
+        fila (str o bytes): Línea de datos
+        inicios (list): Posiciones de inicio de las columnas
+    
+    Returns:
+        list: Valor de cada columna como str ('' si está vacía)
+    """
+    if isinstance(fila, bytes):
+        fila = fila.decode(CODIFICACION, errors='ignore')
+    
+    for inicio in inicios[1:]:
+        if inicio < len(fila) and fila[inicio - 1] != ' ' and fila[inicio] != ' ':
+            campos = fila.split(None, len(inicios) - 1)
+            return campos + [''] * (len(inicios) - len(campos))
+    
+    limites = zip(inicios, inicios[1:] + [None])
+    return [fila[inicio:fin].strip() for inicio, fin in limites]
+
+def tabla_a_dataframe(filas, inicios, nombres):
+    """
+    Convierte las filas de una tabla en un DataFrame cortando todas las líneas a la vez
+    por posición (Series.str.slice).
+    
+    Args:
+        filas (list): Líneas de datos de la tabla
+        inicios (list): Posiciones de inicio de las columnas
+        nombres (list): Nombre de cada columna en el DataFrame
+    
+    Returns:
+        DataFrame: Una columna por posición, con los valores sin espacios en los extremos
+    """
+    lineas = pd.Series(filas, dtype=object)
+    limites = zip(inicios, inicios[1:] + [None])
+    
+    return pd.DataFrame({
+        nombre: lineas.str.slice(inicio, fin).str.strip()
+        for nombre, (inicio, fin) in zip(nombres, limites)
+    })
+
+def leer_seccion_dataframe(texto, nombres_encabezado, nombres=None):
+    """
+    Lee todas las tablas de una sección con el encabezado indicado en un solo DataFrame.
+    
+    Args:
+        texto (str): Texto de la sección del comando
+        nombres_encabezado (list): Nombres de las columnas tal como aparecen en el encabezado
+        nombres (list, optional): Nombres de las columnas en el DataFrame (por defecto, los del encabezado)
+    
+    Returns:
+        DataFrame: Filas de todas las tablas de la sección (vacío si no hay ninguna)
+    """
+    nombres = nombres or nombres_encabezado
+    
+    tablas = []
+    for tabla in leer_tablas(texto):
+        inicios = columnas_desde_encabezado(tabla['encabezado'], tabla['guiones'], nombres_encabezado)
+        if inicios is not None:
+            tablas.append(tabla_a_dataframe(tabla['filas'], inicios, nombres))
+    
+    if not tablas:
+        return pd.DataFrame(columns=nombres)
+    
+    return pd.concat(tablas, ignore_index=True)
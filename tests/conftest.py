@@ -0,0 +1,27 @@
+"""
+Configuración de las pruebas: los módulos se importan como paquete 'parser' (igual que en la
+aplicación), aunque el directorio del repositorio tenga otro nombre.
+"""
+
+import os
+import sys
+import importlib.util
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos')
+
+if 'parser' not in sys.modules:
+    especificacion = importlib.util.spec_from_file_location('parser', os.path.join(RAIZ, '__init__.py'), submodule_search_locations=[RAIZ])
+    paquete = importlib.util.module_from_spec(especificacion)
+    sys.modules['parser'] = paquete
+    especificacion.loader.exec_module(paquete)
+
+@pytest.fixture
+def exportacion_nsp():
+    """
+    Ruta de una exportación NSP19 de ejemplo: tres equipos leídos (uno con el LED crítico en rojo y
+    otro con un ventilador fallido) y uno no alcanzable.
+    """
+    return os.path.join(DIRECTORIO_DATOS, 'exportacion_nsp.txt')
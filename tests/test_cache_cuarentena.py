@@ -0,0 +1,40 @@
+from parser.procesar_datos_optimizado import procesar_archivos
+
+# Límite tan bajo que todos los bloques superan el tiempo máximo
+LIMITE_MINIMO = 1e-6
+
+def test_cache_no_guarda_bloques_en_cuarentena(tmp_path, exportacion_nsp, capsys):
+    directorio_cache = str(tmp_path / 'cache')
+    esperado = procesar_archivos([exportacion_nsp], modo='secuencial')
+    
+    procesar_archivos([exportacion_nsp], modo='secuencial', directorio_cache=directorio_cache, limite_bloque=LIMITE_MINIMO)
+    assert 'Bloques en cuarentena por tiempo excedido: 3' in capsys.readouterr().out
+    
+    # Con un límite mayor, el archivo se vuelve a procesar y sus bloques se leen
+    resultados = procesar_archivos([exportacion_nsp], modo='secuencial', directorio_cache=directorio_cache, limite_bloque=60)
+    salida = capsys.readouterr().out
+    assert 'Archivos procesados: 1; leídos de la caché: 0' in salida
+    assert 'cuarentena' not in salida
+    for df_esperado, df in zip(esperado, resultados):
+        assert df.reset_index(drop=True).equals(df_esperado.reset_index(drop=True))
+
+def test_cache_cuarentena_sin_limite_en_la_siguiente_ejecucion(tmp_path, exportacion_nsp, capsys):
+    directorio_cache = str(tmp_path / 'cache')
+    procesar_archivos([exportacion_nsp], modo='secuencial', directorio_cache=directorio_cache, limite_bloque=LIMITE_MINIMO)
+    capsys.readouterr()
+    
+    # limite_bloque=0 desactiva el límite: ningún bloque queda en cuarentena
+    resultados = procesar_archivos([exportacion_nsp], modo='secuencial', directorio_cache=directorio_cache, limite_bloque=0)
+    assert 'cuarentena' not in capsys.readouterr().out
+    assert len(resultados[6]) == 1
+
+def test_cuarentena_reporta_el_limite_del_registro(tmp_path, exportacion_nsp):
+    from parser.procesar_datos_optimizado import _procesar_flujo_archivos, _resolver_cuarentena
+    from parser.indice_procedencia import ESTADO_BLOQUE_CUARENTENA
+    
+    acumulado, procedencia = _procesar_flujo_archivos([exportacion_nsp], 'secuencial', 1, limite_bloque=LIMITE_MINIMO)
+    assert all(registro['limite'] == LIMITE_MINIMO for registro in acumulado['cuarentena'])
+    
+    _resolver_cuarentena(acumulado, procedencia, None)
+    errores = [entrada['error']['error'] for entrada in procedencia if entrada.get('estado_bloque') == ESTADO_BLOQUE_CUARENTENA]
+    assert errores == [f"Bloque en cuarentena: el procesamiento superó {LIMITE_MINIMO:g} segundos"] * 3
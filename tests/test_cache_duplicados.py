@@ -0,0 +1,45 @@
+import shutil
+
+from parser.procesar_datos_optimizado import procesar_archivos
+
+def test_cache_deduplica_entre_archivos(tmp_path, exportacion_nsp, capsys):
+    # La misma exportación en dos rutas (ej: corridas que se solapan)
+    archivos = []
+    for carpeta in ['a', 'b']:
+        (tmp_path / carpeta).mkdir()
+        archivos.append(str(tmp_path / carpeta / 'exportacion.txt'))
+        shutil.copy(exportacion_nsp, archivos[-1])
+    
+    un_archivo = procesar_archivos(archivos[:1], modo='secuencial')
+    capsys.readouterr()
+    
+    # La primera vez se procesa un archivo; la segunda, los dos se leen de la caché
+    for _ in range(2):
+        resultados = procesar_archivos(archivos, modo='secuencial', directorio_cache=str(tmp_path / 'cache'))
+        assert 'Bloques duplicados: 3 de 6' in capsys.readouterr().out
+        
+        for df_esperado, df in zip(un_archivo[:5], resultados[:5]):
+            assert len(df) == len(df_esperado)
+        assert len(resultados[5]) == len(un_archivo[5])
+        assert resultados[0]['id_archivo'].eq(0).all()
+
+def test_cache_registra_origen_de_duplicados(tmp_path, exportacion_nsp):
+    from parser.procesar_datos_optimizado import _procesar_archivos_con_cache
+    from parser.deduplicar_bloques import nuevo_registro_duplicados, fuentes_duplicadas
+    
+    archivos = []
+    for carpeta in ['a', 'b']:
+        (tmp_path / carpeta).mkdir()
+        archivos.append(str(tmp_path / carpeta / 'exportacion.txt'))
+        shutil.copy(exportacion_nsp, archivos[-1])
+    
+    registro = nuevo_registro_duplicados()
+    _, procedencia = _procesar_archivos_con_cache(archivos, 'secuencial', 1, str(tmp_path / 'cache'), registro)
+    
+    # Cada bloque del segundo archivo apunta a su posición en el primero
+    mitad = len(procedencia) // 2
+    for posicion, entrada in enumerate(procedencia[mitad:]):
+        if entrada.get('hash_cuerpo'):
+            assert entrada['duplicado_de'] == posicion
+            assert 'duplicado_de' not in procedencia[posicion]
+    assert len(fuentes_duplicadas(registro)) == 3
@@ -0,0 +1,33 @@
+import shutil
+
+from parser.procesar_datos_optimizado import procesar_archivos
+
+def _iguales(esperados, resultados):
+    return all(a.reset_index(drop=True).equals(b.reset_index(drop=True)) for a, b in zip(esperados, resultados))
+
+def test_archivos_diferido_igual_al_inmediato(exportacion_nsp):
+    inmediato = procesar_archivos([exportacion_nsp], modo='secuencial')
+    dataset = procesar_archivos([exportacion_nsp], modo='secuencial', diferido=True)
+    
+    # Solo las tablas del resumen se construyen de inmediato
+    assert dataset.pendientes() == ['descripciones', 'mda']
+    assert _iguales(inmediato, dataset.como_tupla())
+    assert dataset.pendientes() == ['descripciones']
+
+def test_cache_diferido_completa_las_entradas(tmp_path, exportacion_nsp, capsys):
+    archivos = []
+    for carpeta in ['a', 'b']:
+        (tmp_path / carpeta).mkdir()
+        archivos.append(str(tmp_path / carpeta / 'exportacion.txt'))
+        shutil.copy(exportacion_nsp, archivos[-1])
+    directorio_cache = str(tmp_path / 'cache')
+    
+    inmediato = procesar_archivos(archivos, modo='secuencial')
+    dataset = procesar_archivos(archivos, modo='secuencial', directorio_cache=directorio_cache, diferido=True)
+    assert _iguales(inmediato, dataset.como_tupla())
+    capsys.readouterr()
+    
+    # Las entradas de la caché ya tienen MDA: el procesamiento inmediato no vuelve a procesar los archivos
+    resultados = procesar_archivos(archivos, modo='secuencial', directorio_cache=directorio_cache)
+    assert 'Archivos procesados: 0; leídos de la caché: 2' in capsys.readouterr().out
+    assert _iguales(inmediato, resultados)
@@ -0,0 +1,30 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from parser import instantanea_resultados
+from parser.instantanea_resultados import guardar_instantanea_en_segundo_plano, listar_instantaneas
+
+class _DatasetFijo:
+    def como_tupla(self):
+        return tuple(pd.DataFrame({'target': ['EQUIPO_01']}) for _ in instantanea_resultados.TABLAS_INSTANTANEA)
+
+def _fallar_conversion(df, ruta_base, formato):
+    raise pa.ArrowTypeError("Expected bytes, got a 'int' object")
+
+def test_guardado_en_segundo_plano_reporta_errores_de_arrow(tmp_path, exportacion_nsp, capsys, monkeypatch):
+    monkeypatch.setattr(instantanea_resultados, '_escribir_tabla', _fallar_conversion)
+    directorio = str(tmp_path / 'instantaneas')
+    
+    guardar_instantanea_en_segundo_plano(_DatasetFijo(), [exportacion_nsp], directorio).join()
+    
+    # El error se reporta sin interrumpir el hilo y no queda una instantánea a medio escribir
+    assert 'No se pudo guardar la instantánea de los datos: Expected bytes' in capsys.readouterr().out
+    assert listar_instantaneas(directorio) == []
+    assert os.listdir(directorio) == []
+
+def test_guardado_en_segundo_plano(tmp_path, exportacion_nsp):
+    directorio = str(tmp_path / 'instantaneas')
+    guardar_instantanea_en_segundo_plano(_DatasetFijo(), [exportacion_nsp], directorio).join()
+    assert len(listar_instantaneas(directorio)) == 1
@@ -0,0 +1,29 @@
+import threading
+
+from parser import ejecutor_bloques
+from parser.procesar_datos_optimizado import procesar_archivos
+
+def test_aviso_limite_inactivo_en_hilos(exportacion_nsp, capsys, monkeypatch):
+    monkeypatch.setattr(ejecutor_bloques, '_avisos_limite_inactivo', set())
+    
+    # En modo hilos el límite no interrumpe los bloques: se avisa una sola vez y nada queda en cuarentena
+    for _ in range(2):
+        procesar_archivos([exportacion_nsp], modo='hilos', workers=2, limite_bloque=1e-6)
+    salida = capsys.readouterr().out
+    assert salida.count("no se aplica en modo 'hilos'") == 1
+    assert 'cuarentena' not in salida
+
+def test_aviso_limite_inactivo_fuera_del_hilo_principal(exportacion_nsp, capsys, monkeypatch):
+    monkeypatch.setattr(ejecutor_bloques, '_avisos_limite_inactivo', set())
+    
+    # Como en la aplicación Streamlit, que ejecuta el script en un hilo secundario
+    hilo = threading.Thread(target=procesar_archivos, args=([exportacion_nsp],), kwargs={'modo': 'secuencial', 'limite_bloque': 1e-6})
+    hilo.start()
+    hilo.join()
+    assert "no se aplica en modo 'secuencial'" in capsys.readouterr().out
+    
+    # Desde el hilo principal el límite sí se aplica
+    procesar_archivos([exportacion_nsp], modo='secuencial', limite_bloque=1e-6)
+    salida = capsys.readouterr().out
+    assert 'no se aplica' not in salida
+    assert 'Bloques en cuarentena por tiempo excedido: 3' in salida
@@ -0,0 +1,14 @@
+from parser.procesar_datos_optimizado import procesar_archivos
+from parser.reglas_estado import clasificar_estados
+
+def test_reglas_de_chassis_con_valores_reales(exportacion_nsp):
+    df_chassis = procesar_archivos([exportacion_nsp], modo='secuencial')[2]
+    
+    # El chassis solo tiene las columnas de hardware: las reglas de puertos no se cumplen
+    estados = clasificar_estados(df_chassis).set_index(df_chassis['target'])
+    
+    assert estados.loc['BAQ_CENTRO_7210_02', 'regla_estado'] == 'led_critico'
+    assert estados.loc['BAQ_CENTRO_7210_02', 'estado'] == 'Crítico'
+    assert estados.loc['CTG_SUR_7210_03', 'regla_estado'] == 'ventiladores_fallidos'
+    assert estados.loc['CTG_SUR_7210_03', 'estado'] == 'Crítico'
+    assert estados.loc['CAL_NORTE_7210_01', 'estado'] == 'OK'
@@ -0,0 +1,626 @@
+"""
+Módulo para tokenizar archivos de comandos NSP línea por línea.
+Emite eventos (inicio de bloque, inicio de sección, línea de datos, fin de bloque o error)
+sin cargar el contenido completo en memoria.
+También divide los archivos en bloques sin decodificarlos (modo bytes): solo se decodifican
+las líneas de encabezado, y el cuerpo de cada bloque se entrega como bytes a los extractores.
+"""
+
+import mmap
+import os
+import re
+
+from parser.identificar_no_leidos import clasificar_tipo_error
+from parser.referencias_origen import etiquetar_origen, retornos_cuerpo, entrada_referencia
+
+# Tipos de evento emitidos por el tokenizador
+EVENTO_INICIO_BLOQUE = 'inicio_bloque'
+EVENTO_INICIO_SECCION = 'inicio_seccion'
+EVENTO_LINEA = 'linea'
+EVENTO_FIN_BLOQUE = 'fin_bloque'
+EVENTO_ERROR = 'error'
+
+# Patrones del encabezado de cada bloque de equipo
+PATRON_SCRIPT_NAME = re.compile(r'#\s*Script Name:\s*([^\t\n]*?)\s*(?:\t|\n|$)')
+PATRON_SCRIPT_VERSION = re.compile(r'Script Version:\s*([^\t\n]*?)\s*(?:\t|\n|$)')
+PATRON_TARGET = re.compile(r'Target:([^\s#]+)')
+PATRON_STATUS = re.compile(r'#\s*Status:\s*([^\t\n]*?)\s*(?:\t|$)')
+PATRON_SAVED_RESULT = re.compile(r'#\s*Saved Result File Name:\s*(.*)')
+PATRON_SECCION = re.compile(r'show\s+\S')
+PATRON_DETALLE_ERROR = re.compile(r'Unknown exception: (.+)')
+
+# Inicio de un bloque en el contenido sin decodificar (misma condición que tokenizar_lineas)
+PATRON_SCRIPT_NAME_BYTES = re.compile(rb'^#[ \t\r\f\v]*Script Name:', re.MULTILINE)
+
+# Retornos de carro al final de línea, que tokenizar_lineas elimina de cada línea
+PATRON_RETORNO_CARRO_BYTES = re.compile(rb'\r+(?=\n|\Z)')
+
+# Modos de lectura de los archivos y variable de entorno para seleccionarlo
+LECTURA_TEXTO = 'texto'
+LECTURA_BYTES = 'bytes'
+MODOS_LECTURA = [LECTURA_TEXTO, LECTURA_BYTES]
+VARIABLE_LECTURA = 'NSP_LECTURA'
+
+# Estado de los bloques leídos correctamente; cualquier otro estado con detalle de error
+# (Unknown, Login Failed, Execution Not Attempted) identifica un equipo no leído
+STATUS_EXITOSO = 'Successful'
+
+# Caracteres revisados después del error para buscar el detalle (igual que identificar_no_leidos)
+LIMITE_DETALLE_ERROR = 500
+
+# Retornos de carro de un bloque antes de leer su primera línea completa (ver tokenizar_lineas)
+RETORNOS_PENDIENTES = -1
+
+# Tamaño de lectura para la detección de fuente por archivo
+TAMANO_LECTURA = 1024 * 1024
+
+# Marcadores de nombre de script que indican la fuente por defecto, en orden de prioridad
+MARCADORES_FUENTE = [
+    ('All_Nokia_Devices_NSP19', "NSP19"),
+    ('All_Nokia_Devices_NSP24', "NSP24"),
+    ('All Nokia devices', "NSP24"),
+]
+
+def detectar_fuente_archivo(archivo):
+    """
+    Determina la fuente (NSP19/NSP24) por defecto de un archivo buscando los marcadores
+    de nombre de script. Se usa cuando la línea 'Saved Result File Name' no indica la fuente.
+    
+    Args:
+        archivo (str o file): Ruta al archivo o archivo binario con soporte de seek
+    
+    Returns:
+        str: Fuente por defecto del archivo ("NSP19" o "NSP24")
+    """
+    marcadores = [(marcador.encode('utf-8'), fuente) for marcador, fuente in MARCADORES_FUENTE]
+    encontrados = set()
+    solape = max(len(marcador) for marcador, _ in marcadores)
+    
+    f, cerrar = _abrir_binario(archivo)
+    try:
+        posicion_inicial = f.tell()
+        cola = b''
+        while True:
+            trozo = f.read(TAMANO_LECTURA)
+            if not trozo:
+                break
+            ventana = cola + trozo
+            for marcador, _ in marcadores:
+                if marcador in ventana:
+                    encontrados.add(marcador)
+            # El primer marcador tiene prioridad, no es necesario seguir leyendo
+            if marcadores[0][0] in encontrados:
+                break
+            cola = ventana[-solape:]
+        f.seek(posicion_inicial)
+    finally:
+        if cerrar:
+            f.close()
+    
+    for marcador, fuente in marcadores:
+        if marcador in encontrados:
+            return fuente
+    
+    return "NSP19"  # Default a NSP19 si no se puede determinar
+
+def detectar_fuente_contenido(contenido):
+    """
+    Determina la fuente (NSP19/NSP24) por defecto de un contenido ya cargado en memoria.
+    Se calcula una sola vez por contenido, no por cada target.
+    
+    Args:
+        contenido (str): Contenido de uno o varios archivos
+    
+    Returns:
+        str: Fuente por defecto del contenido ("NSP19" o "NSP24")
+    """
+    for marcador, fuente in MARCADORES_FUENTE:
+        if marcador in contenido:
+            return fuente
+    
+    return "NSP19"  # Default a NSP19 si no se puede determinar
+
+def determinar_fuente(saved_result, fuente_archivo):
+    """
+    Determina la fuente de un bloque a partir de la línea 'Saved Result File Name'.
+    
+    Args:
+        saved_result (str): Valor de la línea 'Saved Result File Name'
+        fuente_archivo (str): Fuente por defecto del archivo
+    
+    Returns:
+        str: Fuente normalizada ("NSP19" o "NSP24")
+    """
+    if saved_result:
+        if 'NSP19' in saved_result:
+            return "NSP19"
+        if 'NSP24' in saved_result:
+            return "NSP24"
+    
+    return fuente_archivo
+
+def tokenizar_lineas(lineas, archivo=None, fuente_archivo="NSP19", id_archivo=None):
+    """
+    Tokeniza un iterable de líneas en bytes y emite eventos por bloque de equipo.
+    
+    Eventos emitidos (tipo, datos):
+        ('inicio_bloque', dict): target, fuente, archivo, offset, script_name, script_version, status,
+            saved_result y lineas_encabezado (líneas '#' posteriores a '#Script Name')
+        ('inicio_seccion', str): comando 'show ...' que abre la sección
+        ('linea', str): línea de datos (sin salto de línea)
+        ('fin_bloque', dict): información del bloque terminado, con su longitud en el archivo y los '\r'
+            eliminados antes de cada salto de línea (None si no son iguales en todas las líneas)
+        ('error', dict): cierra un bloque con estado de error (target, error, error_detallado, tipo_error
+            y la referencia del bloque en el archivo)
+    
+    Args:
+        lineas (iterable): Líneas en bytes (por ejemplo, un archivo abierto en modo binario)
+        archivo (str, optional): Nombre del archivo de origen
+        fuente_archivo (str, optional): Fuente por defecto del archivo
+        id_archivo (int, optional): Índice del archivo en la lista procesada (ver referencias_origen)
+    
+    Yields:
+        tuple: (tipo_evento, datos)
+    """
+    offset = 0
+    encabezado = None  # Encabezado en construcción (aún no emitido)
+    bloque = None  # Bloque emitido y abierto
+    
+    for linea_bytes in lineas:
+        offset_linea = offset
+        offset += len(linea_bytes)
+        linea = linea_bytes.decode('utf-8', errors='ignore').rstrip('\r\n')
+        
+        if linea.startswith('#'):
+            if 'Script Name:' in linea and PATRON_SCRIPT_NAME.match(linea):
+                # Nuevo bloque: cerrar el anterior
+                if encabezado is not None:
+                    yield from _emitir_encabezado(encabezado, fuente_archivo)
+                    bloque = encabezado
+                if bloque is not None:
+                    yield _cerrar_bloque(bloque, offset_linea)
+                bloque = None
+                encabezado = nuevo_encabezado(linea, archivo, offset_linea, id_archivo)
+                continue
+            
+            if encabezado is not None:
+                actualizar_encabezado(encabezado, linea)
+                continue
+        
+        if encabezado is not None and encabezado['target'] is None and linea.strip():
+            # Encabezado en varias líneas: 'Script Version' y 'Target' pueden venir sin '#'
+            actualizar_encabezado(encabezado, linea)
+            if encabezado['target'] is not None:
+                continue
+        
+        if encabezado is not None:
+            # Primera línea del cuerpo: emitir el inicio del bloque
+            if encabezado['target'] is None:
+                # Encabezado incompleto, se descarta como en la división por expresión regular
+                encabezado = None
+                continue
+            encabezado['offset_cuerpo'] = offset_linea
+            yield from _emitir_encabezado(encabezado, fuente_archivo)
+            bloque = encabezado
+            encabezado = None
+        
+        if bloque is None:
+            continue
+        
+        # Comprobar que la línea ocupa en el archivo lo mismo que su texto más los '\r' eliminados,
+        # igual en todas las líneas, para poder calcular los offsets de las filas (ver referencias_origen)
+        retornos = bloque['retornos']
+        if retornos is not None:
+            contenido = linea_bytes.rstrip(b'\r\n')
+            if not linea_bytes.isascii() and len(linea.encode('utf-8')) != len(contenido):
+                bloque['retornos'] = None
+            elif linea_bytes.endswith(b'\n'):
+                retornos_linea = len(linea_bytes) - len(contenido) - 1
+                if retornos == RETORNOS_PENDIENTES and retornos_linea <= 1:
+                    bloque['retornos'] = retornos_linea
+                elif retornos_linea != retornos:
+                    bloque['retornos'] = None
+        
+        if status_con_error(bloque['status']):
+            _acumular_texto_error(bloque, linea)
+        
+        if PATRON_SECCION.match(linea):
+            yield (EVENTO_INICIO_SECCION, linea.strip())
+        else:
+            yield (EVENTO_LINEA, linea)
+    
+    # Cerrar el último bloque del archivo
+    if encabezado is not None and encabezado['target'] is not None:
+        yield from _emitir_encabezado(encabezado, fuente_archivo)
+        bloque = encabezado
+    if bloque is not None:
+        yield _cerrar_bloque(bloque, offset)
+
+def tokenizar_archivo(archivo, nombre=None, id_archivo=None):
+    """
+    Tokeniza un archivo NSP leyendo línea por línea.
+    
+    Args:
+        archivo (str o file): Ruta al archivo o archivo binario (por ejemplo, st.file_uploader)
+        nombre (str, optional): Nombre a registrar como archivo de origen
+        id_archivo (int, optional): Índice del archivo en la lista procesada
+    
+    Yields:
+        tuple: (tipo_evento, datos)
+    """
+    if nombre is None:
+        nombre = os.path.basename(archivo) if isinstance(archivo, str) else getattr(archivo, 'name', None)
+    
+    fuente_archivo = detectar_fuente_archivo(archivo)
+    
+    f, cerrar = _abrir_binario(archivo)
+    try:
+        yield from tokenizar_lineas(f, archivo=nombre, fuente_archivo=fuente_archivo, id_archivo=id_archivo)
+    finally:
+        if cerrar:
+            f.close()
+
+def tokenizar_archivos(archivos):
+    """
+    Tokeniza varios archivos NSP de forma secuencial. Cada archivo se identifica en las referencias
+    de los registros por su posición en la lista.
+    
+    Args:
+        archivos (list): Rutas o archivos binarios
+    
+    Yields:
+        tuple: (tipo_evento, datos)
+    """
+    for id_archivo, archivo in enumerate(archivos):
+        yield from tokenizar_archivo(archivo, id_archivo=id_archivo)
+
+def ensamblar_bloques(eventos):
+    """
+    Agrupa los eventos del tokenizador en bloques de texto, uno a la vez.
+    El texto de cada bloque tiene el mismo formato que produce la división por
+    expresión regular (comienza con el nombre del target), por lo que es compatible
+    con los extractores existentes. Solo un bloque vive en memoria a la vez.
+    Los bloques de archivos llevan la línea de origen a continuación del target (ver referencias_origen).
+    
+    Args:
+        eventos (iterable): Eventos emitidos por el tokenizador
+    
+    Yields:
+        tuple: (info_bloque, texto_bloque); info_bloque incluye 'error' si el bloque es de un equipo no leído
+    """
+    info = None
+    lineas = []
+    inicio_cuerpo = 0
+    
+    for tipo, datos in eventos:
+        if tipo == EVENTO_INICIO_BLOQUE:
+            info = dict(datos)
+            lineas = [datos['target']] + datos['lineas_encabezado']
+            inicio_cuerpo = sum(len(linea) + 1 for linea in lineas)
+        elif tipo == EVENTO_INICIO_SECCION or tipo == EVENTO_LINEA:
+            lineas.append(datos)
+        elif tipo == EVENTO_FIN_BLOQUE:
+            info.update(longitud=datos['longitud'], retornos=datos['retornos'])
+            texto = etiquetar_origen('\n'.join(lineas), info['id_archivo'], info['offset_cuerpo'], info['retornos'], inicio_cuerpo)
+            yield info, texto
+            info = None
+            lineas = []
+        elif tipo == EVENTO_ERROR:
+            info['error'] = datos
+            yield info, '\n'.join(lineas)
+            info = None
+            lineas = []
+
+def resolver_lectura(lectura=None):
+    """
+    Determina el modo de lectura de los archivos. El parámetro tiene prioridad sobre la variable de entorno.
+    
+    Args:
+        lectura (str, optional): 'texto' (bloques decodificados línea por línea) o 'bytes'
+    
+    Returns:
+        str: Modo de lectura (por defecto, 'texto')
+    """
+    if lectura is None:
+        lectura = os.environ.get(VARIABLE_LECTURA) or LECTURA_TEXTO
+    
+    lectura = lectura.strip().lower()
+    if lectura not in MODOS_LECTURA:
+        raise ValueError(f"Modo de lectura no válido: {lectura}. Opciones: {', '.join(MODOS_LECTURA)}")
+    return lectura
+
+def dividir_bloques_bytes(archivos):
+    """
+    Divide varios archivos NSP en bloques sin decodificar su contenido.
+    Produce los mismos bloques que ensamblar_bloques(tokenizar_archivos(archivos)), pero en bytes:
+    cada archivo se mapea en memoria, los inicios de bloque se buscan sobre los bytes y solo se
+    decodifican las líneas de encabezado. Los extractores decodifican únicamente los campos que leen.
+    
+    Args:
+        archivos (list): Rutas o archivos binarios
+    
+    Yields:
+        tuple: (info_bloque, bloque_bytes); info_bloque igual que en ensamblar_bloques
+    """
+    for id_archivo, archivo in enumerate(archivos):
+        nombre = os.path.basename(archivo) if isinstance(archivo, (str, os.PathLike)) else getattr(archivo, 'name', None)
+        
+        datos, liberar = _leer_bytes(archivo)
+        try:
+            yield from _dividir_contenido_bytes(datos, nombre, id_archivo)
+        finally:
+            liberar()
+
+def _leer_bytes(archivo):
+    """
+    Obtiene el contenido binario de un archivo: mapeado en memoria si es una ruta, o leído
+    completo si es un archivo ya abierto (ej: st.file_uploader), sin mover su posición.
+    
+    Returns:
+        tuple: (contenido, función que libera el contenido)
+    """
+    if isinstance(archivo, (str, os.PathLike)):
+        with open(archivo, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b'', lambda: None
+            mapeo = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapeo, mapeo.close
+    
+    posicion_inicial = archivo.tell()
+    datos = archivo.read()
+    archivo.seek(posicion_inicial)
+    return datos, lambda: None
+
+def _dividir_contenido_bytes(datos, archivo, id_archivo=None):
+    """
+    Divide el contenido binario de un archivo en bloques (ver dividir_bloques_bytes).
+    El encabezado de cada bloque se interpreta igual que en tokenizar_lineas.
+    """
+    fuente_archivo = "NSP19"  # Default a NSP19 si no se puede determinar
+    for marcador, fuente in MARCADORES_FUENTE:
+        if datos.find(marcador.encode('utf-8')) != -1:
+            fuente_archivo = fuente
+            break
+    
+    inicios = [match.start() for match in PATRON_SCRIPT_NAME_BYTES.finditer(datos)]
+    
+    for i, inicio in enumerate(inicios):
+        fin = inicios[i + 1] if i + 1 < len(inicios) else len(datos)
+        
+        # Encabezado: línea '#Script Name' y siguientes, hasta la primera línea del cuerpo
+        encabezado = None
+        posicion = inicio
+        while posicion < fin:
+            fin_linea = datos.find(b'\n', posicion, fin)
+            siguiente = fin if fin_linea == -1 else fin_linea + 1
+            linea = datos[posicion:siguiente].decode('utf-8', errors='ignore').rstrip('\r\n')
+            
+            if encabezado is None:
+                encabezado = nuevo_encabezado(linea, archivo, inicio, id_archivo)
+            elif linea.startswith('#'):
+                actualizar_encabezado(encabezado, linea)
+            elif encabezado['target'] is None and linea.strip():
+                # Encabezado en varias líneas: 'Script Version' y 'Target' pueden venir sin '#'
+                actualizar_encabezado(encabezado, linea)
+                if encabezado['target'] is None:
+                    break
+            else:
+                break
+            posicion = siguiente
+        
+        if encabezado['target'] is None:
+            # Encabezado incompleto, se descarta como en la división por expresión regular
+            continue
+        
+        encabezado['longitud'] = fin - inicio
+        partes = [encabezado['target'].encode('utf-8')]
+        partes.extend(linea.encode('utf-8') for linea in encabezado['lineas_encabezado'])
+        inicio_cuerpo = sum(len(parte) + 1 for parte in partes)
+        if posicion < fin:
+            cuerpo = datos[posicion:fin]
+            encabezado['offset_cuerpo'] = posicion
+            encabezado['retornos'] = retornos_cuerpo(cuerpo)
+            if cuerpo.endswith(b'\n'):
+                cuerpo = cuerpo[:-1]
+            if b'\r' in cuerpo:
+                cuerpo = PATRON_RETORNO_CARRO_BYTES.sub(b'', cuerpo)
+            partes.append(cuerpo)
+        
+        info = next(_emitir_encabezado(encabezado, fuente_archivo))[1]
+        
+        if status_con_error(encabezado['status']):
+            texto_error = encabezado['texto_error']
+            if posicion < fin:
+                # Solo se decodifica el inicio del cuerpo, donde se busca el detalle del error
+                texto_error += '\n' + partes[-1][:4 * LIMITE_DETALLE_ERROR].decode('utf-8', errors='ignore')
+            error = datos_error(encabezado, texto_error)
+            if error:
+                error.update(entrada_referencia(encabezado))
+                info['error'] = error
+                yield info, b'\n'.join(partes)
+                continue
+        
+        yield info, etiquetar_origen(b'\n'.join(partes), id_archivo, info['offset_cuerpo'], info['retornos'], inicio_cuerpo)
+
+def _abrir_binario(archivo):
+    """
+    Abre un archivo en modo binario si se recibe una ruta.
+    
+    Returns:
+        tuple: (archivo_binario, debe_cerrarse)
+    """
+    if isinstance(archivo, (str, os.PathLike)):
+        return open(archivo, 'rb'), True
+    return archivo, False
+
+def nuevo_encabezado(linea, archivo, offset, id_archivo=None):
+    """
+    Crea el diccionario de encabezado a partir de la línea '#Script Name'.
+    
+    Args:
+        linea (str): Línea '#Script Name: ... Script Version: ... Target:...'
+        archivo (str): Nombre del archivo de origen
+        offset (int): Posición del encabezado en el archivo
+        id_archivo (int, optional): Índice del archivo en la lista procesada
+    
+    Returns:
+        dict: Encabezado en construcción
+    """
+    script_name = PATRON_SCRIPT_NAME.match(linea)
+    script_version = PATRON_SCRIPT_VERSION.search(linea)
+    target = PATRON_TARGET.search(linea)
+    
+    return {
+        'target': target.group(1) if target else None,
+        'fuente': None,
+        'archivo': archivo,
+        'offset': offset,
+        'id_archivo': id_archivo,
+        'offset_cuerpo': None,
+        'longitud': None,
+        'retornos': RETORNOS_PENDIENTES,
+        'script_name': script_name.group(1) if script_name else None,
+        'script_version': script_version.group(1) if script_version else None,
+        'status': None,
+        'saved_result': None,
+        'lineas_encabezado': [],
+        'lineas_error': [],
+        'en_error': False,
+    }
+
+def actualizar_encabezado(encabezado, linea):
+    """
+    Actualiza el encabezado con una línea '#...' adicional.
+    Soporta encabezados en una línea (separados por tabuladores) o en varias líneas.
+    
+    Args:
+        encabezado (dict): Encabezado en construcción
+        linea (str): Línea del encabezado
+    """
+    encabezado['lineas_encabezado'].append(linea)
+    
+    if encabezado['script_version'] is None:
+        script_version = PATRON_SCRIPT_VERSION.search(linea)
+        if script_version:
+            encabezado['script_version'] = script_version.group(1)
+    
+    if encabezado['target'] is None:
+        target = PATRON_TARGET.search(linea)
+        if target:
+            encabezado['target'] = target.group(1)
+            return
+    
+    status = PATRON_STATUS.match(linea)
+    if status:
+        encabezado['status'] = status.group(1)
+        return
+    
+    if 'Detailed Status/Error:' in linea:
+        encabezado['en_error'] = True
+        return
+    
+    saved_result = PATRON_SAVED_RESULT.match(linea)
+    if saved_result:
+        encabezado['saved_result'] = saved_result.group(1).strip()
+        encabezado['en_error'] = False
+        return
+    
+    if encabezado['en_error']:
+        texto = linea.lstrip('#').strip()
+        if texto:
+            encabezado['lineas_error'].append(texto)
+
+def _emitir_encabezado(encabezado, fuente_archivo):
+    """
+    Completa la fuente del bloque y emite el evento de inicio.
+    """
+    encabezado['fuente'] = determinar_fuente(encabezado['saved_result'], fuente_archivo)
+    if status_con_error(encabezado['status']):
+        encabezado['texto_error'] = '\n'.join(encabezado['lineas_error'][1:])
+    
+    yield (EVENTO_INICIO_BLOQUE, _datos_bloque(encabezado))
+
+def _acumular_texto_error(bloque, linea):
+    """
+    Guarda texto del cuerpo de un bloque con error, hasta el límite usado para buscar el detalle.
+    """
+    if len(bloque['texto_error']) < LIMITE_DETALLE_ERROR:
+        bloque['texto_error'] += '\n' + linea
+
+def status_con_error(status):
+    """
+    Indica si el estado '#Status' de un bloque corresponde a un equipo no leído.
+    
+    Args:
+        status (str): Estado del encabezado (ej: 'Successful', 'Unknown', 'Login Failed')
+    
+    Returns:
+        bool: True si hay estado y es distinto de 'Successful'
+    """
+    return bool(status) and status != STATUS_EXITOSO
+
+def datos_error(encabezado, texto_posterior):
+    """
+    Construye la información de equipo no leído de un bloque con estado de error.
+    
+    Args:
+        encabezado (dict): Encabezado del bloque (ver nuevo_encabezado)
+        texto_posterior (str): Texto que sigue a la línea de error, donde se busca el detalle
+    
+    Returns:
+        dict: target, fuente, archivo, error, error_detallado y tipo_error, o None si el bloque no tiene error
+    """
+    if not status_con_error(encabezado['status']) or not encabezado['lineas_error']:
+        return None
+    
+    error = encabezado['lineas_error'][0]
+    error_detallado = None
+    detalle_match = PATRON_DETALLE_ERROR.search(texto_posterior[:LIMITE_DETALLE_ERROR])
+    if detalle_match:
+        error_detallado = detalle_match.group(1).strip()
+    
+    return {
+        'target': encabezado['target'],
+        'fuente': encabezado['fuente'],
+        'archivo': encabezado['archivo'],
+        'error': error,
+        'error_detallado': error_detallado,
+        'tipo_error': clasificar_tipo_error(error, error_detallado)
+    }
+
+def _cerrar_bloque(bloque, offset_fin):
+    """
+    Genera el evento que cierra el bloque: 'error' para bloques con estado de error, 'fin_bloque' en otro caso.
+    El bloque ocupa el archivo hasta offset_fin (inicio del bloque siguiente o fin del archivo).
+    """
+    bloque['longitud'] = offset_fin - bloque['offset']
+    if bloque['retornos'] == RETORNOS_PENDIENTES:
+        # Ninguna línea del cuerpo terminó en salto de línea
+        bloque['retornos'] = 0
+    
+    error = datos_error(bloque, bloque.get('texto_error', ''))
+    if error:
+        error.update(entrada_referencia(bloque))
+        return (EVENTO_ERROR, error)
+    
+    return (EVENTO_FIN_BLOQUE, _datos_bloque(bloque))
+
+def _datos_bloque(bloque):
+    """
+    Devuelve la información pública del bloque (sin campos internos del tokenizador).
+    """
+    return {
+        'target': bloque['target'],
+        'fuente': bloque['fuente'],
+        'archivo': bloque['archivo'],
+        'offset': bloque['offset'],
+        'id_archivo': bloque['id_archivo'],
+        'offset_cuerpo': bloque['offset_cuerpo'],
+        'longitud': bloque['longitud'],
+        'retornos': bloque['retornos'],
+        'script_name': bloque['script_name'],
+        'script_version': bloque['script_version'],
+        'status': bloque['status'],
+        'saved_result': bloque['saved_result'],
+        'lineas_encabezado': bloque['lineas_encabezado'],
+    }
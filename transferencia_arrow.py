@@ -0,0 +1,218 @@
+"""
+Módulo para transferir los resultados de los workers de procesos al proceso principal sin pickle.
+Cada worker escribe las tablas de su lote como archivos IPC de Arrow en un directorio en memoria
+(/dev/shm si existe) y devuelve solo sus rutas; el proceso principal los abre con memory-map,
+de forma que las columnas no se copian al recibirlas. Las tablas finales se ensamblan en Arrow
+y se convierten a DataFrame una sola vez.
+"""
+
+import os
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Modos de transferencia de resultados desde los workers de procesos
+TRANSFERENCIA_ARROW = 'arrow'
+TRANSFERENCIA_PICKLE = 'pickle'
+MODOS_TRANSFERENCIA = [TRANSFERENCIA_ARROW, TRANSFERENCIA_PICKLE]
+
+# Variables de entorno para seleccionar el modo de transferencia y el directorio de los archivos
+VARIABLE_TRANSFERENCIA = 'NSP_TRANSFERENCIA'
+VARIABLE_DIRECTORIO_TRANSFERENCIA = 'NSP_DIRECTORIO_TRANSFERENCIA'
+
+# Directorio en memoria compartida de Linux; en otros sistemas se usa el directorio temporal
+DIRECTORIO_MEMORIA_COMPARTIDA = '/dev/shm'
+
+# Prefijo de los archivos de cada tabla de un lote
+PREFIJO_ARCHIVO = 'nsp_lote_'
+
+# Archivos ya leídos que el sistema no permitió eliminar al abrirlos
+_archivos_pendientes = []
+
+def resolver_transferencia(transferencia=None):
+    """
+    Determina el modo de transferencia. El parámetro tiene prioridad sobre la variable de entorno.
+    Por defecto se usa Arrow si pyarrow está instalado.
+    
+    Args:
+        transferencia (str, optional): 'arrow' o 'pickle'
+    
+    Returns:
+        str: Modo de transferencia
+    """
+    if transferencia is None:
+        transferencia = os.environ.get(VARIABLE_TRANSFERENCIA) or None
+    
+    if transferencia is None:
+        return TRANSFERENCIA_ARROW if PYARROW_DISPONIBLE else TRANSFERENCIA_PICKLE
+    
+    transferencia = transferencia.strip().lower()
+    if transferencia not in MODOS_TRANSFERENCIA:
+        raise ValueError(f"Modo de transferencia no válido: {transferencia}. Opciones: {', '.join(MODOS_TRANSFERENCIA)}")
+    
+    if transferencia == TRANSFERENCIA_ARROW and not PYARROW_DISPONIBLE:
+        print("pyarrow no está instalado; los resultados se transfieren con pickle")
+        return TRANSFERENCIA_PICKLE
+    
+    return transferencia
+
+def directorio_transferencia():
+    """
+    Returns:
+        str: Directorio donde los workers escriben las tablas de sus lotes
+    """
+    directorio = os.environ.get(VARIABLE_DIRECTORIO_TRANSFERENCIA)
+    if directorio:
+        return directorio
+    if os.path.isdir(DIRECTORIO_MEMORIA_COMPARTIDA) and os.access(DIRECTORIO_MEMORIA_COMPARTIDA, os.W_OK):
+        return DIRECTORIO_MEMORIA_COMPARTIDA
+    return tempfile.gettempdir()
+
+def exportar_tabla(columnas):
+    """
+    Escribe las columnas de una tabla como archivo IPC de Arrow. Se ejecuta en el worker.
+    
+    Args:
+        columnas (dict): columna -> lista de valores (todas de igual longitud)
+    
+    Returns:
+        str: Ruta del archivo o None si las columnas no se pueden convertir a Arrow
+            (ej: tipos mezclados en una columna); en ese caso la tabla se envía con pickle
+    """
+    try:
+        tabla = pa.table(columnas)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    
+    descriptor, ruta = tempfile.mkstemp(prefix=PREFIJO_ARCHIVO, suffix='.arrow', dir=directorio_transferencia())
+    os.close(descriptor)
+    with pa.OSFile(ruta, 'wb') as archivo:
+        with pa.ipc.new_file(archivo, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    return ruta
+
+def importar_tabla(ruta):
+    """
+    Abre con memory-map la tabla escrita por un worker. Las columnas quedan respaldadas por el
+    archivo mapeado, sin copiarse; el archivo se elimina del directorio de inmediato (el mapeo
+    sigue siendo válido hasta que se libera la tabla).
+    
+    Args:
+        ruta (str): Ruta del archivo IPC de Arrow
+    
+    Returns:
+        pyarrow.Table: Tabla del lote
+    """
+    tabla = pa.ipc.open_file(pa.memory_map(ruta, 'r')).read_all()
+    try:
+        os.remove(ruta)
+    except OSError:
+        # En Windows un archivo mapeado no se puede eliminar; se elimina después (ver eliminar_archivos_pendientes)
+        _archivos_pendientes.append(ruta)
+    return tabla
+
+def tabla_desde_columnas(columnas):
+    """
+    Convierte columnas (listas) en una tabla de Arrow.
+    
+    Returns:
+        pyarrow.Table: Tabla o None si las columnas no se pueden convertir
+    """
+    try:
+        return pa.table(columnas)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+def columnas_desde_tabla(tabla):
+    """
+    Convierte una tabla de Arrow en columnas (listas), para fusionarla con filas que no se
+    pudieron convertir a Arrow.
+    
+    Returns:
+        dict: columna -> lista de valores
+    """
+    return tabla.to_pydict()
+
+def concatenar_segmentos(segmentos):
+    """
+    Concatena las tablas de los lotes, unificando columnas ausentes y tipos nulos.
+    
+    Args:
+        segmentos (list): Tablas de Arrow en orden
+    
+    Returns:
+        pyarrow.Table: Tabla completa
+    """
+    return pa.concat_tables(segmentos, promote_options='permissive')
+
+def reemplazar_valores(tabla, columna, funcion):
+    """
+    Reemplaza los valores de una columna de una tabla de Arrow aplicando una función a cada valor.
+    
+    Args:
+        tabla (pyarrow.Table): Tabla
+        columna (str): Nombre de la columna
+        funcion (callable): Recibe un valor y devuelve el nuevo
+    
+    Returns:
+        pyarrow.Table: Tabla con la columna reemplazada (la misma tabla si no tiene la columna)
+    """
+    indice = tabla.schema.get_field_index(columna)
+    if indice == -1:
+        return tabla
+    valores = pa.array([funcion(valor) for valor in tabla.column(indice).to_pylist()], type=tabla.schema.field(indice).type)
+    return tabla.set_column(indice, columna, valores)
+
+def filtrar_filas(tabla, conservar):
+    """
+    Conserva las filas de una tabla de Arrow indicadas por una máscara.
+    
+    Args:
+        tabla (pyarrow.Table): Tabla
+        conservar (list): Un booleano por fila
+    
+    Returns:
+        pyarrow.Table: Tabla con las filas conservadas
+    """
+    return tabla.filter(pa.array(conservar, type=pa.bool_()))
+
+def eliminar_archivos_pendientes():
+    """
+    Elimina los archivos de lotes que no se pudieron eliminar al abrirlos (Windows no permite
+    eliminar un archivo mapeado); se llama cuando las tablas ya se convirtieron a DataFrame.
+    
+    Returns:
+        int: Número de archivos eliminados
+    """
+    eliminados = 0
+    for ruta in list(_archivos_pendientes):
+        try:
+            os.remove(ruta)
+            _archivos_pendientes.remove(ruta)
+            eliminados += 1
+        except OSError:
+            pass
+    return eliminados
+
+def memoria_maxima_mb():
+    """
+    Obtiene la memoria residente máxima del proceso actual.
+    
+    Returns:
+        float: Memoria máxima en MB o None si no se puede medir en la plataforma
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if os.uname().sysname == 'Darwin' else maximo / 1024